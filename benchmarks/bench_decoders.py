@@ -0,0 +1,56 @@
+"""
+Microbenchmark of real-time frame decoding.
+
+Compares the stdlib json.loads baseline used before (full decode to dicts) with the
+selected fast decoder and the selective decode-to-Tick/Bar path.
+
+Run from the project root:
+    python -m benchmarks.bench_decoders [--frames 200000]
+"""
+import argparse
+import json
+import time
+from real_time_data import decoders
+
+COINBASE_TICKER = json.dumps({
+    "type": "ticker", "sequence": 37475248783, "product_id": "BTC-USD", "price": "67234.51",
+    "open_24h": "66100.00", "volume_24h": "12654.86", "low_24h": "65900.01", "high_24h": "67500.00",
+    "volume_30d": "412512.10", "best_bid": "67234.50", "best_bid_size": "0.25", "best_ask": "67234.51",
+    "best_ask_size": "0.10", "side": "buy", "time": "2024-05-24T13:30:00.123456Z", "trade_id": 654321987,
+    "last_size": "0.0012"
+})
+
+ALPACA_BARS = json.dumps([
+    {"T": "b", "S": symbol, "o": 189.5, "h": 189.9, "l": 189.4, "c": 189.8, "v": 12500,
+     "t": "2024-05-24T13:30:00Z", "n": 130, "vw": 189.71}
+    for symbol in ("AAPL", "MSFT", "NVDA", "AMZN")
+])
+
+
+def _measure(label, func, frame, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        func(frame)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<45} {frames / elapsed:>12,.0f} frames/s")
+    return frames / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark real-time JSON decoding")
+    parser.add_argument('--frames', type=int, default=200000)
+    args = parser.parse_args()
+
+    print(f"Selected decoder: {decoders.DECODER_NAME}")
+    for name, frame, decode in (
+        ('coinbase ticker', COINBASE_TICKER, decoders.decode_coinbase),
+        ('alpaca bars (4 per frame)', ALPACA_BARS, decoders.decode_alpaca),
+    ):
+        before = _measure(f"{name}: json.loads (before)", json.loads, frame, args.frames)
+        _measure(f"{name}: {decoders.DECODER_NAME}.loads", decoders.loads, frame, args.frames)
+        after = _measure(f"{name}: selective decode to records", decode, frame, args.frames)
+        print(f"{name}: {after / before:.2f}x frames/s vs json.loads baseline\n")
+
+
+if __name__ == "__main__":
+    main()
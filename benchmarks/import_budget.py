@@ -0,0 +1,93 @@
+"""
+Measure the startup cost of the CLI and the DI container in fresh interpreters and
+check it against an import-time budget.
+
+Each case runs in a new `python -X importtime` process, so module caches of earlier
+cases do not hide any cost. Besides the wall time, the case fails if a heavy SDK of a
+provider that is not selected (alpaca_trade_api, ib_insync, pandas, ...) was imported.
+
+Run from the project root:
+    python -m benchmarks.import_budget [--budget-ms 400] [--repeat 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that only the providers using them may import
+HEAVY_MODULES = ['alpaca_trade_api', 'ib_insync', 'pandas', 'websocket', 'aiohttp']
+
+_BUILD_HISTORICAL = """
+from injector import Injector
+from di_module import Config, HistoricalDataProviderModule
+from historical_data.base_historical_provider import BaseHistoricalDataProvider
+config = Config('coinbase_pro', historical_config={{
+    'symbol': 'BTC-USD', 'granularity': 60, 'url': 'http://127.0.0.1:1',
+    'api_key_env': 'COINBASE_PRO_API_KEY', 'secret_key_env': 'COINBASE_PRO_SECRET_KEY'}})
+Injector([HistoricalDataProviderModule(config)]){get}
+"""
+
+CASES = {
+    # Importing the CLI must not import any provider
+    'import main': ('import main', HEAVY_MODULES),
+    # Configuring the container must not construct or import the provider
+    'configure injector': (_BUILD_HISTORICAL.format(get=''), HEAVY_MODULES),
+    # A Coinbase backfill worker only pays for the Coinbase provider
+    'build coinbase_pro historical': (_BUILD_HISTORICAL.format(get='.get(BaseHistoricalDataProvider)'),
+                                      HEAVY_MODULES)
+}
+
+_REPORT = """
+import sys, time
+started = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - started
+print('ELAPSED', elapsed)
+print('LOADED', ','.join(name for name in {heavy!r} if name in sys.modules))
+"""
+
+
+def _run_case(code, heavy):
+    env = dict(os.environ, LOG_LEVEL='ERROR')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _REPORT.format(code=code, heavy=heavy)],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else 'failed')
+    values = dict(line.split(' ', 1) for line in result.stdout.splitlines()
+                  if line.startswith(('ELAPSED', 'LOADED')))
+    slowest = sorted(
+        (line.split('|') for line in result.stderr.splitlines() if line.startswith('import time:') and '|' in line),
+        key=lambda fields: -int(fields[1]) if fields[1].strip().isdigit() else 0
+    )[:3]
+    loaded = [name for name in values.get('LOADED', '').strip().split(',') if name]
+    return float(values['ELAPSED']) * 1000, loaded, [fields[2].strip() for fields in slowest]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=400.0, help="Maximum median milliseconds per case")
+    parser.add_argument('--repeat', type=int, default=5, help="Fresh interpreters per case")
+    args = parser.parse_args()
+
+    failures = []
+    for name, (code, heavy) in CASES.items():
+        runs = [_run_case(code, heavy) for _ in range(args.repeat)]
+        median = sorted(run[0] for run in runs)[len(runs) // 2]
+        loaded = runs[0][1]
+        status = 'ok'
+        if median > args.budget_ms:
+            status = f"over budget ({args.budget_ms:.0f} ms)"
+        if loaded:
+            status = f"imported {', '.join(loaded)}"
+        if status != 'ok':
+            failures.append(name)
+        print(f"{name:<32} {median:8.1f} ms  {status:<28} slowest: {', '.join(runs[0][2])}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Generate deterministic synthetic fixtures for the replay benchmarks.
+
+Recorded captures can replace these files as long as they keep the same layout:
+*_stream.jsonl holds one raw WebSocket frame per line. Historical cases are served
+by mock_exchange and need no fixtures.
+
+Run from the project root:
+    python -m benchmarks.make_fixtures
+"""
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+START = datetime(2024, 5, 24, 13, 30, tzinfo=timezone.utc)
+
+
+def _walk(rng, price, steps):
+    for _ in range(steps):
+        price = max(1.0, price * (1 + rng.gauss(0, 0.001)))
+        yield round(price, 2)
+
+
+def _iso(dt, micros=True):
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.%fZ' if micros else '%Y-%m-%dT%H:%M:%SZ')
+
+
+def alpaca_stream(rng, frames=500):
+    symbols = ['AAPL', 'MSFT', 'NVDA', 'AMZN', 'GOOG', 'META', 'TSLA', 'AMD']
+    lines = [json.dumps([{"T": "success", "msg": "authenticated"}]),
+             json.dumps([{"T": "subscription", "trades": [], "quotes": [], "bars": symbols}])]
+    prices = {symbol: rng.uniform(50, 500) for symbol in symbols}
+    for i in range(frames):
+        ts = START + timedelta(minutes=i // 4)
+        batch = []
+        for symbol in rng.sample(symbols, rng.randint(1, 4)):
+            o = prices[symbol]
+            c = next(_walk(rng, o, 1))
+            prices[symbol] = c
+            batch.append({"T": "b", "S": symbol, "o": o, "h": round(max(o, c) * 1.0005, 2),
+                          "l": round(min(o, c) * 0.9995, 2), "c": c, "v": rng.randint(100, 50000),
+                          "t": _iso(ts, micros=False), "n": rng.randint(1, 500), "vw": round((o + c) / 2, 2)})
+        lines.append(json.dumps(batch))
+    return lines
+
+
+def coinbase_stream(rng, frames=500):
+    lines = [json.dumps({"type": "subscriptions", "channels": [{"name": "ticker", "product_ids": ["BTC-USD", "ETH-USD"]}]})]
+    prices = {'BTC-USD': 67000.0, 'ETH-USD': 3700.0}
+    for i in range(frames):
+        product = 'BTC-USD' if i % 3 else 'ETH-USD'
+        price = prices[product] = next(_walk(rng, prices[product], 1))
+        if i % 100 == 99:
+            lines.append(json.dumps({"type": "heartbeat", "sequence": i, "last_trade_id": i, "product_id": product,
+                                     "time": _iso(START + timedelta(milliseconds=37 * i))}))
+            continue
+        lines.append(json.dumps({
+            "type": "ticker", "sequence": 37475248783 + i, "product_id": product, "price": f"{price:.2f}",
+            "open_24h": "66100.00", "volume_24h": "12654.86", "low_24h": "65900.01", "high_24h": "67500.00",
+            "volume_30d": "412512.10", "best_bid": f"{price - 0.01:.2f}", "best_bid_size": "0.25",
+            "best_ask": f"{price:.2f}", "best_ask_size": "0.10", "side": rng.choice(["buy", "sell"]),
+            "time": _iso(START + timedelta(milliseconds=37 * i)), "trade_id": 654321987 + i,
+            "last_size": f"{rng.uniform(0.0001, 2):.8f}"
+        }))
+    return lines
+
+
+def main():
+    rng = random.Random(42)
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name, lines in (('alpaca_stream.jsonl', alpaca_stream(rng)), ('coinbase_stream.jsonl', coinbase_stream(rng))):
+        with open(os.path.join(FIXTURES_DIR, name), 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+    print(f"Fixtures written to {FIXTURES_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Replay recorded WebSocket frames and REST responses through the provider classes
+without any network access and report throughput, latency, allocations and peak RSS.
+
+Real-time cases feed every fixture frame to provider.on_message(), which covers the
+on_message -> decode -> process path. Historical cases call get_historical_data against
+a mock_exchange REST server on the loopback interface.
+
+Run from the project root:
+    python -m benchmarks.run_benchmarks [--repeat 20] [--output bench_results.json] [--only coinbase]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def _fixture_lines(name):
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return [line.rstrip('\n') for line in f if line.strip()]
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _measure(name, handler, inputs, repeat, unit):
+    """
+    Time handler(item) for every input item, then measure the traced memory peak and the
+    net retained blocks in a separate pass so that tracemalloc overhead does not skew
+    the latency figures.
+    """
+    latencies = []
+    handler(inputs[0])  # warm up caches and lazy imports
+    gc.collect()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in inputs:
+            t0 = time.perf_counter_ns()
+            handler(item)
+            latencies.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    for item in inputs:
+        handler(item)
+    after = tracemalloc.take_snapshot()
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    retained_blocks = sum(max(stat.count_diff, 0) for stat in stats)
+
+    latencies.sort()
+    count = len(latencies)
+    result = {
+        'name': name,
+        'unit': unit,
+        'count': count,
+        'throughput_per_sec': count / elapsed if elapsed else 0.0,
+        'latency_ns': {
+            'p50': _percentile(latencies, 0.50),
+            'p99': _percentile(latencies, 0.99),
+            'max': latencies[-1] if latencies else 0,
+        },
+        # Blocks still alive after the pass, i.e. growth such as caches or leaks, not total allocations
+        'net_retained_blocks_per_item': retained_blocks / len(inputs),
+        'traced_peak_bytes': traced_peak,
+    }
+    print(f"{name:<46} {result['throughput_per_sec']:>12,.0f} {unit}/s  "
+          f"p50 {result['latency_ns']['p50'] / 1000:>8.1f}us  p99 {result['latency_ns']['p99'] / 1000:>8.1f}us  "
+          f"peak traced {traced_peak / 1024:>8.0f} KiB")
+    return result
+
+
+def _realtime_cases():
+    """
+    Build (name, handler, inputs, unit) tuples replaying stream fixtures through on_message.
+    """
+    from real_time_data.providers.alpaca_realtime_provider import AlpacaRealTimeProvider
+    from real_time_data.providers.coinbase_pro_realtime_provider import CoinbaseProRealTimeProvider
+
+    alpaca = AlpacaRealTimeProvider(api_key_env='ALPACA_API_KEY', secret_key_env='ALPACA_SECRET_KEY',
+                                    url='wss://localhost/v2/{feed}', symbol='AAPL')
+    coinbase = CoinbaseProRealTimeProvider(url='wss://localhost', symbol='BTC-USD')
+    return [
+        ('realtime.alpaca.on_message', lambda frame: alpaca.on_message(None, frame),
+         _fixture_lines('alpaca_stream.jsonl'), 'msgs'),
+        ('realtime.coinbase_pro.on_message', lambda frame: coinbase.on_message(None, frame),
+         _fixture_lines('coinbase_stream.jsonl'), 'msgs'),
+    ]
+
+
+def _historical_cases(mock_url):
+    """
+    Build cases calling each REST historical provider's get_historical_data against the
+    local mock exchange, which covers the request, transport and parse path of a fetch.
+
+    Rate limits are raised so that the token buckets do not dominate the timings. The
+    Interactive Brokers provider talks to TWS rather than REST and is not covered.
+    """
+    from historical_data.providers.alpaca_historical_provider import AlpacaHistoricalProvider
+    from historical_data.providers.alpha_vantage_historical_provider import AlphaVantageHistoricalProvider
+    from historical_data.providers.coinbase_pro_historical_provider import CoinbaseProHistoricalProvider
+
+    for name in ('ALPACA_API_KEY', 'ALPACA_SECRET_KEY', 'ALPHA_VANTAGE_API_KEY'):
+        os.environ.setdefault(name, 'benchmark')
+    # The Alpaca SDK reads its data endpoint from the environment
+    os.environ['APCA_API_DATA_URL'] = mock_url
+    alpaca = AlpacaHistoricalProvider(api_key_env='ALPACA_API_KEY', secret_key_env='ALPACA_SECRET_KEY',
+                                      symbol='AAPL', timeframe='1Min', url=mock_url, data_url=f"{mock_url}/v2",
+                                      requests_per_minute=600000)
+    alpha_vantage = AlphaVantageHistoricalProvider(api_key_env='ALPHA_VANTAGE_API_KEY', symbol='AAPL',
+                                                   function='TIME_SERIES_DAILY', url=f"{mock_url}/query",
+                                                   requests_per_minute=600000)
+    coinbase = CoinbaseProHistoricalProvider(api_key_env='COINBASE_PRO_API_KEY', secret_key_env='COINBASE_PRO_SECRET_KEY',
+                                             symbol='BTC-USD', granularity=60, url=mock_url, requests_per_second=10000)
+
+    # Fixed ranges ending in the past, so that no watermark or cache serves a repeat from memory
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    day = [(now - timedelta(days=2), now - timedelta(days=1))]
+    return [
+        ('historical.alpaca.get_historical_data', lambda r: alpaca.get_historical_data(*r), day, 'requests'),
+        ('historical.alpha_vantage.get_historical_data', lambda r: alpha_vantage.get_historical_data(*r),
+         [(now - timedelta(days=60), now - timedelta(days=2))], 'requests'),
+        ('historical.coinbase_pro.get_historical_data', lambda r: coinbase.get_historical_data(*r), day, 'requests'),
+    ]
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded feeds through the providers and report performance")
+    parser.add_argument('--repeat', type=int, default=20, help="Number of passes over each fixture")
+    parser.add_argument('--output', type=str, default='bench_results.json', help="Machine-readable results file")
+    parser.add_argument('--only', type=str, default=None, help="Only run cases whose name contains this string")
+    args = parser.parse_args()
+
+    # Keep the benchmark from measuring log file writes
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    from mock_exchange.rest import MockRestServer
+    mock = MockRestServer().start()
+    results = []
+    try:
+        for name, handler, inputs, unit in _realtime_cases() + _historical_cases(f"http://{mock.host}:{mock.port}"):
+            if args.only and args.only not in name:
+                continue
+            results.append(_measure(name, handler, inputs, args.repeat, unit))
+    finally:
+        mock.stop()
+
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'peak_rss_bytes': _peak_rss_bytes(),
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Peak RSS {report['peak_rss_bytes'] / (1024 * 1024):.1f} MiB, results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,48 @@
-from injector import Module, Binder, singleton
+import importlib
+from injector import Module, Binder, CallableProvider, singleton
 from real_time_data.base_realtime_provider import BaseRealTimeDataProvider
-from real_time_data.providers.alpaca_realtime_provider import AlpacaRealTimeProvider
-from real_time_data.providers.alpha_vantage_realtime_provider import AlphaVantageRealTimeProvider
-from real_time_data.providers.interactive_brokers_realtime_provider import InteractiveBrokersRealTimeProvider
-from real_time_data.providers.coinbase_pro_realtime_provider import CoinbaseProRealTimeProvider
+from real_time_data.realtime_engine import RealTimeEngine
+from real_time_data.publisher import Publisher, build_publisher
+from real_time_data.bar_aggregator import build_aggregator
 from historical_data.base_historical_provider import BaseHistoricalDataProvider
-from historical_data.providers.alpaca_historical_provider import AlpacaHistoricalProvider
-from historical_data.providers.alpha_vantage_historical_provider import AlphaVantageHistoricalProvider
-from historical_data.providers.interactive_brokers_historical_provider import InteractiveBrokersHistoricalProvider
-from historical_data.providers.coinbase_pro_historical_provider import CoinbaseProHistoricalProvider
+from historical_data.cached_historical_provider import CachedHistoricalDataProvider
 from utils.logging_wrapper import LoggingWrapper
 
 logger = LoggingWrapper(__name__)
 
+# Providers are registered as 'module:Class' and imported only when selected, so that
+# a process never pays for the SDKs (alpaca_trade_api, ib_insync, ...) of the others
+REALTIME_PROVIDER_MAP = {
+    'alpaca': 'real_time_data.providers.alpaca_realtime_provider:AlpacaRealTimeProvider',
+    'alpha_vantage': 'real_time_data.providers.alpha_vantage_realtime_provider:AlphaVantageRealTimeProvider',
+    'interactive_brokers': 'real_time_data.providers.interactive_brokers_realtime_provider:InteractiveBrokersRealTimeProvider',
+    'coinbase_pro': 'real_time_data.providers.coinbase_pro_realtime_provider:CoinbaseProRealTimeProvider'
+}
+
+ASYNC_REALTIME_PROVIDER_MAP = {
+    'alpaca': 'real_time_data.providers.async_alpaca_realtime_provider:AsyncAlpacaRealTimeProvider',
+    'coinbase_pro': 'real_time_data.providers.async_coinbase_pro_realtime_provider:AsyncCoinbaseProRealTimeProvider'
+}
+
+HISTORICAL_PROVIDER_MAP = {
+    'alpaca': 'historical_data.providers.alpaca_historical_provider:AlpacaHistoricalProvider',
+    'alpha_vantage': 'historical_data.providers.alpha_vantage_historical_provider:AlphaVantageHistoricalProvider',
+    'interactive_brokers': 'historical_data.providers.interactive_brokers_historical_provider:InteractiveBrokersHistoricalProvider',
+    'coinbase_pro': 'historical_data.providers.coinbase_pro_historical_provider:CoinbaseProHistoricalProvider'
+}
+
+def load_provider_class(provider_map, name, kind):
+    """
+    Import and return the provider class registered under `name`.
+
+    :param kind: Description used in the error message, e.g. 'historical'.
+    """
+    path = provider_map.get(name)
+    if not path:
+        raise ValueError(f"Unsupported {kind} provider type: {name}")
+    module_name, class_name = path.split(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
 class Config:
     def __init__(self, provider, realtime_config=None, historical_config=None):
         self.provider = provider
@@ -24,33 +54,74 @@ class RealTimeDataProviderModule(Module):
         self.config = config
 
     def configure(self, binder: Binder):
-        provider_map = {
-            'alpaca': AlpacaRealTimeProvider,
-            'alpha_vantage': AlphaVantageRealTimeProvider,
-            'interactive_brokers': InteractiveBrokersRealTimeProvider,
-            'coinbase_pro': CoinbaseProRealTimeProvider
-        }
-        provider_class = provider_map.get(self.config.provider)
-        if provider_class:
-            binder.bind(BaseRealTimeDataProvider, to=provider_class(**self.config.realtime_config), scope=singleton)
-            logger.info(f"Configured {self.config.provider} provider for real-time data")
-        else:
+        if self.config.provider not in REALTIME_PROVIDER_MAP:
             raise ValueError(f"Unsupported real-time provider type: {self.config.provider}")
+        # Built on the first injector.get, not while the injector is configured
+        binder.bind(BaseRealTimeDataProvider, to=CallableProvider(self.build_provider), scope=singleton)
+        logger.info(f"Configured {self.config.provider} provider for real-time data")
+
+    def build_provider(self):
+        provider_class = load_provider_class(REALTIME_PROVIDER_MAP, self.config.provider, 'real-time')
+        realtime_config = dict(self.config.realtime_config)
+        realtime_config.pop('supervise', None)
+        publisher = build_publisher(realtime_config.pop('publish', None))
+        aggregator = build_aggregator(realtime_config.pop('aggregate', None))
+        provider = provider_class(**realtime_config)
+        provider.publisher = publisher
+        provider.aggregator = aggregator
+        return provider
+
+class AsyncRealTimeEngineModule(Module):
+    def __init__(self, configs):
+        self.configs = configs
+
+    def configure(self, binder: Binder):
+        for config in self.configs:
+            if config.provider not in ASYNC_REALTIME_PROVIDER_MAP:
+                raise ValueError(f"Unsupported async real-time provider type: {config.provider}")
+        binder.bind(RealTimeEngine, to=CallableProvider(self.build_engine), scope=singleton)
+
+    def build_engine(self):
+        engine = RealTimeEngine()
+        sinks = []
+        for config in self.configs:
+            provider_class = load_provider_class(ASYNC_REALTIME_PROVIDER_MAP, config.provider, 'async real-time')
+            realtime_config = dict(config.realtime_config)
+            supervise = realtime_config.pop('supervise', None) or {}
+            publisher = build_publisher(realtime_config.pop('publish', None))
+            if publisher is not None:
+                sinks.extend(publisher.sinks)
+            aggregator = build_aggregator(realtime_config.pop('aggregate', None))
+            historical_provider = None
+            if supervise.get('backfill', True) and config.historical_config:
+                historical_provider = build_historical_provider(config)
+            engine.add_provider(provider_class(**realtime_config), historical_provider=historical_provider,
+                                bar_interval=supervise.get('bar_interval', 60), aggregator=aggregator)
+            logger.info(f"Configured {config.provider} provider for the async real-time engine")
+        if sinks:
+            engine.publisher = Publisher(sinks)
+        return engine
+
+def build_historical_provider(config):
+    """
+    Construct the historical provider described by `config`, wrapped in the on-disk cache when enabled.
+    """
+    provider_class = load_provider_class(HISTORICAL_PROVIDER_MAP, config.provider, 'historical')
+    historical_config = dict(config.historical_config)
+    cache_config = historical_config.pop('cache', None) or {}
+    provider = provider_class(**historical_config)
+    if cache_config.get('enabled', False):
+        provider = CachedHistoricalDataProvider(provider, config.provider, path=cache_config.get('path', 'cache'))
+        logger.info(f"Enabled on-disk cache for {config.provider} historical data")
+    return provider
 
 class HistoricalDataProviderModule(Module):
     def __init__(self, config):
         self.config = config
 
     def configure(self, binder: Binder):
-        provider_map = {
-            'alpaca': AlpacaHistoricalProvider,
-            'alpha_vantage': AlphaVantageHistoricalProvider,
-            'interactive_brokers': InteractiveBrokersHistoricalProvider,
-            'coinbase_pro': CoinbaseProHistoricalProvider
-        }
-        provider_class = provider_map.get(self.config.provider)
-        if provider_class:
-            binder.bind(BaseHistoricalDataProvider, to=provider_class(**self.config.historical_config), scope=singleton)
-            logger.info(f"Configured {self.config.provider} provider for historical data")
-        else:
+        if self.config.provider not in HISTORICAL_PROVIDER_MAP:
             raise ValueError(f"Unsupported historical provider type: {self.config.provider}")
+        binder.bind(BaseHistoricalDataProvider, to=CallableProvider(lambda: build_historical_provider(self.config)),
+                    scope=singleton)
+        logger.info(f"Configured {self.config.provider} provider for historical data")
@@ -1,9 +1,115 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+import numpy as np
+from historical_data.chunked_fetcher import ChunkedFetcher
+from models import BarBatch
+from utils.date_utils import DateUtils
+from utils.logging_wrapper import LoggingWrapper
+from utils.rate_limiter import PRIORITY_BULK, request_priority
+
+logger = LoggingWrapper(__name__)
 
 class BaseHistoricalDataProvider(ABC):
+    # Number of symbols get_historical_data_batch fetches at the same time
+    batch_max_workers = 4
+    # Time span of the batches yielded by iter_historical_data
+    default_chunk = timedelta(days=1)
+
     @abstractmethod
-    def get_historical_data(self, symbol, start=None, end=None, timeframe='1Min'):
+    def get_historical_data(self, start=None, end=None, symbol=None):
         """
-        Fetch historical data for the given symbol.
+        Fetch historical data for `symbol`, or for the configured symbol when it is None.
+
+        :return: models.BarBatch of the bars in the range.
         """
         pass
+
+    def iter_historical_data(self, start=None, end=None, chunk=None, symbol=None):
+        """
+        Fetch a range piece by piece, yielding each piece as soon as it is available.
+
+        Batches are time ordered, do not overlap and each covers at most `chunk`, aligned
+        on multiples of `chunk` since the epoch (UTC midnights for one day), so memory
+        use does not grow with the length of the range. This default fetches one chunk
+        at a time through get_historical_data; providers override it to stream their
+        upstream pages directly.
+
+        :param chunk: timedelta spanned by one batch, defaults to `default_chunk`.
+        :return: Generator of non-empty BarBatch.
+        """
+        start, end = DateUtils.validate_dates(start, end)
+        chunk = chunk or self.default_chunk
+        windows = ChunkedFetcher.split_range(start, end, chunk)
+        yield from self._rechunk(
+            (self.get_historical_data(start=window_start, end=window_end, symbol=symbol)
+             for window_start, window_end in windows),
+            chunk
+        )
+
+    @staticmethod
+    def _rechunk(batches, chunk):
+        """
+        Regroup time-ordered, non-overlapping batches into batches spanning at most `chunk`,
+        aligned on multiples of `chunk` since the epoch. At most one chunk is buffered.
+        """
+        span = int(chunk.total_seconds() * 1_000_000_000)
+        pending = []
+        boundary = None
+        for batch in batches:
+            while len(batch):
+                if boundary is None:
+                    first = int(batch.timestamp[0])
+                    boundary = first - first % span + span
+                cut = int(np.searchsorted(batch.timestamp, boundary, side='left'))
+                if cut:
+                    pending.append(batch[:cut])
+                if cut == len(batch):
+                    break
+                if pending:
+                    yield BarBatch.concat(pending).normalized()
+                    pending = []
+                batch = batch[cut:]
+                boundary = None
+        if pending:
+            yield BarBatch.concat(pending).normalized()
+
+    def get_historical_data_batch(self, symbols, start=None, end=None, max_workers=None):
+        """
+        Fetch many symbols over the same range and yield each result as soon as it is ready.
+
+        Symbols are fetched concurrently on up to `max_workers` threads; every request still
+        goes through the provider's own rate limiting, at bulk priority so that live-gap
+        repairs are served first. A failure for one symbol does not stop the others: its
+        exception is yielded in place of the data.
+
+        :param symbols: Symbols to fetch.
+        :param max_workers: Concurrent symbols, defaults to `batch_max_workers`.
+        :return: Generator of (symbol, BarBatch or Exception) pairs in completion order.
+        """
+        symbols = list(symbols)
+        workers = min(max_workers or self.batch_max_workers, len(symbols))
+        if workers <= 1:
+            # Providers with a thread-bound client (e.g. ib_insync) fetch in the calling thread
+            for symbol in symbols:
+                yield symbol, self._fetch_for_batch(symbol, start, end)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = {executor.submit(self._fetch_for_batch, symbol, start, end): symbol for symbol in symbols}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # Stop queued symbols if the caller abandons the generator
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _fetch_for_batch(self, symbol, start, end):
+        try:
+            with request_priority(PRIORITY_BULK):
+                return self.get_historical_data(start=start, end=end, symbol=symbol)
+        except Exception as e:
+            logger.error(f"Batch fetch failed for {symbol}: {e}")
+            return e
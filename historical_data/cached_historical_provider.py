@@ -0,0 +1,160 @@
+import os
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from historical_data.base_historical_provider import BaseHistoricalDataProvider
+from models import BarBatch
+from utils.date_utils import DateUtils
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+
+class BarCache:
+    """
+    Columnar on-disk bar store partitioned as one .npz file per (provider, symbol, timeframe, day).
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _partition_path(self, provider, symbol, timeframe, day):
+        safe = lambda value: str(value).replace('/', '_').replace(' ', '')
+        return os.path.join(self.path, safe(provider), safe(symbol), safe(timeframe), f"{day.isoformat()}.npz")
+
+    def is_complete(self, provider, symbol, timeframe, day):
+        """
+        Check whether a day has been stored after it was fully in the past.
+        """
+        path = self._partition_path(provider, symbol, timeframe, day)
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as partition:
+            return bool(partition['complete'])
+
+    def read(self, provider, symbol, timeframe, day):
+        """
+        Load one day of bars as a BarBatch, or None if the day is not cached.
+        """
+        path = self._partition_path(provider, symbol, timeframe, day)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as partition:
+            return BarBatch(partition['timestamp'], partition['values'], symbol=symbol)
+
+    def write(self, provider, symbol, timeframe, day, batch, complete):
+        """
+        Atomically write one day of bars.
+
+        :param batch: BarBatch holding the bars of that day.
+        :param complete: Whether the day is fully in the past and will not change anymore.
+        """
+        path = self._partition_path(provider, symbol, timeframe, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, complete=np.array(complete), timestamp=batch.timestamp, values=batch.values)
+        os.replace(tmp_path, path)
+
+
+class CachedHistoricalDataProvider(BaseHistoricalDataProvider):
+    """
+    Caching decorator around a BaseHistoricalDataProvider.
+
+    Bars are stored per day in a BarCache and only days missing from the cache are
+    requested from the wrapped provider.
+    """
+
+    def __init__(self, provider, provider_name, path='cache'):
+        """
+        :param provider: The wrapped historical data provider.
+        :param provider_name: Name used to key the cache (e.g. 'alpaca').
+        :param path: Root directory of the on-disk cache.
+        """
+        self.provider = provider
+        self.provider_name = provider_name
+        self.symbol = provider.symbol
+        self.batch_max_workers = provider.batch_max_workers
+        self.timeframe = self._timeframe_key(provider)
+        self.cache = BarCache(path)
+        logger.info("CachedHistoricalDataProvider initialized for %s at %s", provider_name, path)
+
+    def __getattr__(self, name):
+        # Delegate provider-specific helpers such as is_market_open
+        if name == 'provider':
+            raise AttributeError(name)
+        return getattr(self.provider, name)
+
+    @staticmethod
+    def _timeframe_key(provider):
+        for attribute in ('timeframe', 'granularity', 'bar_size', 'interval', 'function'):
+            value = getattr(provider, attribute, None)
+            if value:
+                return value
+        return 'default'
+
+    @staticmethod
+    def _days(start, end):
+        day = start.date()
+        last = (end - timedelta(microseconds=1)).date()
+        while day <= last:
+            yield day
+            day += timedelta(days=1)
+
+    @staticmethod
+    def _missing_ranges(missing_days):
+        """
+        Group missing days into contiguous [first, last] ranges so that each gap costs one upstream call.
+        """
+        ranges = []
+        for day in missing_days:
+            if ranges and ranges[-1][1] + timedelta(days=1) == day:
+                ranges[-1][1] = day
+            else:
+                ranges.append([day, day])
+        return ranges
+
+    def _fill_gap(self, symbol, first_day, last_day, now):
+        gap_start = datetime(first_day.year, first_day.month, first_day.day, tzinfo=timezone.utc)
+        gap_end = datetime(last_day.year, last_day.month, last_day.day, tzinfo=timezone.utc) + timedelta(days=1)
+        logger.debug(f"Cache miss for {symbol} from {gap_start} to {gap_end}")
+        batch = self.provider.get_historical_data(start=gap_start, end=min(gap_end, now), symbol=symbol)
+
+        day = first_day
+        while day <= last_day:
+            day_start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            day_end = day_start + timedelta(days=1)
+            self.cache.write(self.provider_name, symbol, self.timeframe, day,
+                             batch.between(day_start, day_end), complete=day_end <= now)
+            day += timedelta(days=1)
+
+    def get_historical_data(self, start=None, end=None, symbol=None):
+        """
+        Fetch historical data for `symbol` (or the configured symbol), serving cached days from disk.
+
+        :param start: The start date for the data.
+        :param end: The end date for the data.
+        :param symbol: Symbol to fetch, defaults to the configured symbol.
+        :return: BarBatch of the bars in [start, end).
+        """
+        try:
+            start, end = DateUtils.validate_dates(start, end)
+            symbol = symbol or self.symbol
+            start = start.astimezone(timezone.utc)
+            end = end.astimezone(timezone.utc)
+            now = datetime.now(timezone.utc)
+
+            days = list(self._days(start, end))
+            missing = [day for day in days if not self.cache.is_complete(self.provider_name, symbol, self.timeframe, day)]
+            for first_day, last_day in self._missing_ranges(missing):
+                self._fill_gap(symbol, first_day, last_day, now)
+
+            batch = BarBatch.concat(
+                [self.cache.read(self.provider_name, symbol, self.timeframe, day) for day in days],
+                symbol=symbol
+            )
+
+            logger.info(f"Served historical data for {symbol} ({len(missing)} of {len(days)} days fetched upstream)")
+            return batch.between(start, end)
+        except Exception as e:
+            logger.error(f"Error serving cached historical data for {symbol}: {e}")
+            raise
@@ -0,0 +1,91 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from utils.logging_wrapper import LoggingWrapper
+from utils.rate_limiter import current_priority, request_priority
+
+logger = LoggingWrapper(__name__)
+
+class ChunkedFetcher:
+    """
+    Split a [start, end) range into fixed-size windows and fetch them concurrently
+    on a bounded worker pool.
+    """
+
+    def __init__(self, fetch_window, max_workers=4, rate_limiter=None):
+        """
+        :param fetch_window: Callable taking (start, end, *args) and returning the data for that window.
+        :param max_workers: Maximum number of windows fetched at the same time.
+        :param rate_limiter: Optional RateLimiter acquired before every window request.
+        """
+        self.fetch_window = fetch_window
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter
+
+    @staticmethod
+    def split_range(start, end, window):
+        """
+        Split [start, end) into consecutive windows no longer than `window`.
+
+        :param start: Start datetime of the range.
+        :param end: End datetime of the range.
+        :param window: Maximum length of one window as a timedelta.
+        :return: List of (window_start, window_end) tuples.
+        """
+        if window.total_seconds() <= 0:
+            raise ValueError(f"Window must be positive, got {window}")
+        windows = []
+        cursor = start
+        while cursor < end:
+            window_end = min(cursor + window, end)
+            windows.append((cursor, window_end))
+            cursor = window_end
+        return windows
+
+    def _fetch(self, window, args, priority):
+        # Worker threads do not inherit the caller's request priority
+        with request_priority(priority):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            return self.fetch_window(*window, *args)
+
+    def fetch(self, start, end, window, *args):
+        """
+        Fetch every window of [start, end).
+
+        :param args: Extra arguments passed to fetch_window after the window bounds (e.g. the symbol).
+        :return: List of per-window results, in window order.
+        """
+        windows = self.split_range(start, end, window)
+        logger.debug("Fetching %d windows with %d workers", len(windows), self.max_workers)
+        priority = current_priority()
+        if len(windows) <= 1:
+            return [self._fetch(w, args, priority) for w in windows]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(windows))) as executor:
+            return list(executor.map(self._fetch, windows, [args] * len(windows), [priority] * len(windows)))
+
+    def iter_fetch(self, start, end, window, *args):
+        """
+        Fetch the windows of [start, end) and yield each result in window order as soon as
+        it and every earlier window are done. At most `max_workers` windows are in flight,
+        so results are not accumulated however long the range is.
+
+        :return: Generator of ((window_start, window_end), result).
+        """
+        windows = self.split_range(start, end, window)
+        priority = current_priority()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        in_flight = deque()
+        try:
+            for w in windows:
+                in_flight.append((w, executor.submit(self._fetch, w, args, priority)))
+                if len(in_flight) >= self.max_workers:
+                    w, future = in_flight.popleft()
+                    yield w, future.result()
+            while in_flight:
+                w, future = in_flight.popleft()
+                yield w, future.result()
+        finally:
+            # Stop queued windows if the caller abandons the generator
+            for _, future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False)
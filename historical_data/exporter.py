@@ -0,0 +1,159 @@
+import gzip
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+import numpy as np
+from models import OHLCV
+from utils.rate_limiter import PRIORITY_BULK, request_priority
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+# File extension per export format
+EXPORT_FORMATS = {'parquet': 'parquet', 'arrow': 'arrow', 'csv': 'csv.gz'}
+
+
+def _require_pyarrow(export_format):
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError as e:
+        raise RuntimeError(f"The {export_format} export format requires pyarrow (pip install pyarrow)") from e
+
+
+def _to_arrow_table(batch):
+    pa = _require_pyarrow('arrow')
+    # The NumPy columns are wrapped without copying
+    columns = {'timestamp': pa.array(batch.timestamp.view('datetime64[ns]')).cast(pa.timestamp('ns', tz='UTC'))}
+    for i, name in enumerate(OHLCV):
+        columns[name] = pa.array(batch.values[i])
+    return pa.table(columns)
+
+
+def write_parquet(batch, path, compression='zstd'):
+    _require_pyarrow('parquet')
+    import pyarrow.parquet as pq
+    pq.write_table(_to_arrow_table(batch), path, compression=compression)
+
+
+def write_arrow(batch, path, compression='lz4'):
+    pa = _require_pyarrow('arrow')
+    table = _to_arrow_table(batch)
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+
+
+def write_csv(batch, path, compression=6):
+    # Timestamps stay integer epoch nanoseconds, so no per-row datetime formatting is needed.
+    # A structured array keeps them int64: through float64 they would lose precision past 2**53.
+    # '%.17g' round-trips every float64 value exactly.
+    rows = np.empty(len(batch), dtype=[('timestamp', np.int64)] + [(name, np.float64) for name in OHLCV])
+    rows['timestamp'] = batch.timestamp
+    for i, name in enumerate(OHLCV):
+        rows[name] = batch.values[i]
+    with gzip.open(path, 'wt', compresslevel=compression, newline='') as f:
+        f.write('timestamp,' + ','.join(OHLCV) + '\n')
+        np.savetxt(f, rows, fmt=['%d'] + ['%.17g'] * len(OHLCV), delimiter=',')
+
+
+WRITERS = {'parquet': write_parquet, 'arrow': write_arrow, 'csv': write_csv}
+
+
+class HistoricalExporter:
+    """
+    Export the historical bars of many symbols to files partitioned by symbol and date:
+    `<path>/symbol=<SYMBOL>/date=<YYYY-MM-DD>/bars.<ext>`.
+
+    Symbols are fetched concurrently (up to the provider's batch_max_workers) through
+    iter_historical_data, one UTC day at a time, and every day is handed to a pool of
+    writer threads as soon as it arrives. Encoding and compression in pyarrow and zlib
+    release the GIL, so fetching, conversion and writing overlap. At most `max_pending`
+    days wait for a writer, which bounds memory regardless of the range length.
+    """
+
+    def __init__(self, provider, path, export_format='parquet', writers=4, max_pending=None, compression=None):
+        """
+        :param provider: Historical provider to fetch from.
+        :param path: Root directory of the export.
+        :param export_format: 'parquet', 'arrow' (IPC file) or 'csv' (gzip compressed).
+        :param writers: Writer threads.
+        :param max_pending: Days fetched but not yet written, defaults to 2 * writers.
+        :param compression: Codec for parquet/arrow or gzip level for csv, defaults per format.
+        """
+        if export_format not in WRITERS:
+            raise ValueError(f"Unsupported export format: {export_format}. Supported values are {set(WRITERS)}.")
+        if export_format != 'csv':
+            _require_pyarrow(export_format)
+        self.provider = provider
+        self.path = path
+        self.export_format = export_format
+        self.writers = writers
+        self.compression = compression
+        self._pending = threading.BoundedSemaphore(max_pending or 2 * writers)
+
+    def partition_path(self, symbol, date):
+        return os.path.join(self.path, f"symbol={symbol}", f"date={date}", f"bars.{EXPORT_FORMATS[self.export_format]}")
+
+    def _write(self, batch, path):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write next to the target and rename, so readers never see partial files
+            partial = path + '.partial'
+            writer = WRITERS[self.export_format]
+            if self.compression is None:
+                writer(batch, partial)
+            else:
+                writer(batch, partial, self.compression)
+            os.replace(partial, path)
+            return len(batch)
+        finally:
+            self._pending.release()
+
+    def _export_symbol(self, symbol, start, end, write_pool):
+        futures = []
+        with request_priority(PRIORITY_BULK):
+            for batch in self.provider.iter_historical_data(start=start, end=end, chunk=timedelta(days=1),
+                                                            symbol=symbol):
+                date = str(batch.timestamp[0].astype('datetime64[ns]').astype('datetime64[D]'))
+                self._pending.acquire()
+                futures.append(write_pool.submit(self._write, batch, self.partition_path(symbol, date)))
+        return {'bars': sum(future.result() for future in futures), 'files': len(futures)}
+
+    def export(self, symbols, start=None, end=None, max_workers=None):
+        """
+        Export every symbol over [start, end).
+
+        A failure for one symbol does not stop the others.
+
+        :return: Dict of symbol -> {'bars': n, 'files': n}, or the Exception for failed symbols.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        results = {}
+        fetchers = max(1, min(max_workers or self.provider.batch_max_workers, len(symbols)))
+        logger.info(f"Exporting {len(symbols)} symbols as {self.export_format} to {self.path}")
+        with ThreadPoolExecutor(max_workers=self.writers, thread_name_prefix='export-write') as write_pool:
+            if fetchers == 1:
+                # Providers with a thread-bound client (e.g. ib_insync) fetch in the calling thread
+                for symbol in symbols:
+                    results[symbol] = self._export_one(symbol, start, end, write_pool)
+            else:
+                with ThreadPoolExecutor(max_workers=fetchers, thread_name_prefix='export-fetch') as fetch_pool:
+                    futures = {fetch_pool.submit(self._export_one, symbol, start, end, write_pool): symbol
+                               for symbol in symbols}
+                    for future in as_completed(futures):
+                        results[futures[future]] = future.result()
+        exported = [result for result in results.values() if not isinstance(result, Exception)]
+        logger.info(f"Exported {sum(r['bars'] for r in exported)} bars in {sum(r['files'] for r in exported)} files, "
+                    f"{len(results) - len(exported)} symbols failed")
+        return results
+
+    def _export_one(self, symbol, start, end, write_pool):
+        try:
+            result = self._export_symbol(symbol, start, end, write_pool)
+            logger.debug(f"Exported {symbol}: {result}")
+            return result
+        except Exception as e:
+            logger.error(f"Export failed for {symbol}: {e}")
+            return e
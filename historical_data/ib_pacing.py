@@ -0,0 +1,139 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+# Seconds per IB bar size setting
+BAR_SIZE_SECONDS = {
+    '1 secs': 1, '5 secs': 5, '10 secs': 10, '15 secs': 15, '30 secs': 30,
+    '1 min': 60, '2 mins': 120, '3 mins': 180, '5 mins': 300, '10 mins': 600, '15 mins': 900,
+    '20 mins': 1200, '30 mins': 1800, '1 hour': 3600, '2 hours': 7200, '3 hours': 10800,
+    '4 hours': 14400, '8 hours': 28800, '1 day': 86400, '1 week': 7 * 86400, '1 month': 31 * 86400
+}
+
+# IB's step sizes: (longest duration in seconds, smallest bar size allowed with it)
+_STEP_SIZES = [
+    (365 * 86400, 86400),
+    (31 * 86400, 1800),
+    (7 * 86400, 180),
+    (2 * 86400, 120),
+    (86400, 60),
+    (28800, 30),
+    (14400, 10),
+    (3600, 5),
+    (1800, 1)
+]
+
+
+def max_window(bar_size):
+    """
+    Longest request duration IB accepts for `bar_size`.
+
+    :return: timedelta.
+    """
+    if bar_size not in BAR_SIZE_SECONDS:
+        raise ValueError(f"Unknown IB bar size: {bar_size}")
+    seconds = BAR_SIZE_SECONDS[bar_size]
+    return timedelta(seconds=next(duration for duration, smallest in _STEP_SIZES if seconds >= smallest))
+
+
+def duration_string(window):
+    """
+    IB durationStr covering `window`: seconds below a day, whole days above.
+    """
+    seconds = math.ceil(window.total_seconds())
+    if seconds < 86400:
+        return f"{max(seconds, 30)} S"
+    return f"{math.ceil(seconds / 86400)} D"
+
+
+def plan_requests(start, end, bar_size):
+    """
+    Map [start, end) onto request windows valid for `bar_size`, newest first.
+
+    :return: List of (end_datetime, durationStr) pairs, one per reqHistoricalData call.
+    """
+    window = max_window(bar_size)
+    requests = []
+    cursor = end
+    while cursor > start:
+        request_start = max(start, cursor - window)
+        requests.append((cursor, duration_string(cursor - request_start)))
+        cursor = request_start
+    return requests
+
+
+class HistoricalPacer:
+    """
+    Spaces IB historical data requests to stay within TWS pacing limits:
+    no identical request within 15 seconds, at most 6 requests for the same contract
+    within 2 seconds, and at most 60 requests within any 10 minutes.
+
+    `reserve` books the earliest slot that keeps every limit and returns the delay
+    until it, so concurrent requests are paced without a lock held across awaits.
+    """
+
+    def __init__(self, max_requests=60, period=600.0, max_per_contract=5, contract_period=2.0,
+                 identical_period=15.0):
+        """
+        :param max_requests: Requests allowed within `period` seconds.
+        :param max_per_contract: Requests for one contract allowed within `contract_period` seconds.
+        :param identical_period: Seconds before an identical request may be repeated.
+        """
+        self.max_requests = max_requests
+        self.period = period
+        self.max_per_contract = max_per_contract
+        self.contract_period = contract_period
+        self.identical_period = identical_period
+        self._sent = deque()
+        self._per_contract = {}
+        self._identical = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, contract_key, request_key):
+        """
+        Book a slot for one request.
+
+        :param contract_key: Hashable identifying the contract (and exchange/data type).
+        :param request_key: Hashable identifying the whole request.
+        :return: Seconds to wait before sending it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            while self._sent and self._sent[0] <= now - self.period:
+                self._sent.popleft()
+            per_contract = self._per_contract.setdefault(contract_key, deque())
+            while per_contract and per_contract[0] <= now - self.contract_period:
+                per_contract.popleft()
+
+            # Slots are handed out in order, so every history stays sorted
+            slot = max(now, self._sent[-1] if self._sent else now)
+            if len(self._sent) >= self.max_requests:
+                slot = max(slot, self._sent[-self.max_requests] + self.period)
+            if len(per_contract) >= self.max_per_contract:
+                slot = max(slot, per_contract[-self.max_per_contract] + self.contract_period)
+            if request_key in self._identical:
+                slot = max(slot, self._identical[request_key] + self.identical_period)
+
+            self._sent.append(slot)
+            per_contract.append(slot)
+            self._identical[request_key] = slot
+            if len(self._identical) > 4 * self.max_requests:
+                cutoff = now - self.identical_period
+                self._identical = {key: sent for key, sent in self._identical.items() if sent > cutoff}
+            return slot - now
+
+    async def wait(self, contract_key, request_key):
+        delay = self.reserve(contract_key, request_key)
+        if delay > 0:
+            logger.debug("Pacing IB historical request for %.1fs", delay)
+            await asyncio.sleep(delay)
+
+
+# TWS enforces the limits per session, so all providers share one pacer
+pacer = HistoricalPacer()
@@ -1,11 +1,17 @@
-from historical_data.providers.alpaca_historical_provider import AlpacaHistoricalProvider
-from historical_data.providers.alpha_vantage_historical_provider import AlphaVantageHistoricalProvider
-from historical_data.providers.interactive_brokers_historical_provider import InteractiveBrokersHistoricalProvider
-from historical_data.providers.coinbase_pro_historical_provider import CoinbaseProHistoricalProvider
-
-__all__ = [
-    'AlpacaHistoricalProvider',
-    'AlphaVantageHistoricalProvider',
-    'InteractiveBrokersHistoricalProvider',
-    'CoinbaseProHistoricalProvider'
-]
+import importlib
+
+# Imported on first access so that importing one provider does not load every SDK
+_PROVIDERS = {
+    'AlpacaHistoricalProvider': 'historical_data.providers.alpaca_historical_provider',
+    'AlphaVantageHistoricalProvider': 'historical_data.providers.alpha_vantage_historical_provider',
+    'InteractiveBrokersHistoricalProvider': 'historical_data.providers.interactive_brokers_historical_provider',
+    'CoinbaseProHistoricalProvider': 'historical_data.providers.coinbase_pro_historical_provider'
+}
+
+__all__ = list(_PROVIDERS)
+
+
+def __getattr__(name):
+    if name not in _PROVIDERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_PROVIDERS[name]), name)
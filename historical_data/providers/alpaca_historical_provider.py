@@ -1,13 +1,23 @@
 import os
+import numpy as np
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from alpaca_trade_api.rest import REST
+from models import BarBatch
 from historical_data.base_historical_provider import BaseHistoricalDataProvider
 from utils.date_utils import DateUtils
+from utils.rate_limiter import scheduler
+from utils.http_transport import get_transport
 from utils.logging_wrapper import LoggingWrapper
 
 logger = LoggingWrapper(__name__)
 
 class AlpacaHistoricalProvider(BaseHistoricalDataProvider):
+    # Symbols per request to the multi-symbol bars endpoint
+    MAX_SYMBOLS_PER_REQUEST = 100
+    # Bars converted at a time by iter_historical_data (one page of the bars endpoint)
+    STREAM_PAGE_BARS = 10000
+
     def __init__(self, **config):
         self.api_key = os.getenv(config['api_key_env'])
         self.secret_key = os.getenv(config['secret_key_env'])
@@ -18,9 +28,24 @@ class AlpacaHistoricalProvider(BaseHistoricalDataProvider):
         self.use_sandbox = config.get('use_sandbox', False)
         self.base_url = config['url']
         self.data_url = config['data_url']
+        self.symbols_per_request = config.get('symbols_per_request', self.MAX_SYMBOLS_PER_REQUEST)
+        self.http = get_transport()
         self.api = REST(self.api_key, self.secret_key, base_url=self.base_url)
+        # Let the SDK reuse the shared keep-alive pools. The SDK sends requests without a
+        # timeout, so the transport's defaults are applied by its adapter. REST.close() on
+        # this provider's client would only drop the shared idle connections; the session
+        # stays usable and pools are reopened on the next request.
+        self.api._session = self.http.session
+        # Pace every page the SDK requests through the process-wide Alpaca bucket
+        self.rate_limit = scheduler.bucket('alpaca', config.get('requests_per_minute', 200) / 60)
+        self._data_get = self.api.data_get
+        self.api.data_get = self._paced_data_get
         logger.info("AlpacaHistoricalProvider initialized with config: %s", config)
 
+    def _paced_data_get(self, *args, **kwargs):
+        self.rate_limit.acquire()
+        return self._data_get(*args, **kwargs)
+
     def is_market_open(self):
         """
         Check if the market is currently open.
@@ -32,7 +57,7 @@ class AlpacaHistoricalProvider(BaseHistoricalDataProvider):
                 'APCA-API-SECRET-KEY': self.secret_key
             }
             logger.debug(f"Making request to {url} with headers {headers}")
-            response = requests.get(url, headers=headers)
+            response = scheduler.request('alpaca', lambda: self.http.get(url, headers=headers))
             response.raise_for_status()
             logger.info("Fetched market status")
             return response.json()
@@ -43,32 +68,131 @@ class AlpacaHistoricalProvider(BaseHistoricalDataProvider):
             logger.error(f"Unexpected error: {e}")
             raise
 
-    def get_historical_data(self, start=None, end=None):
+    def get_historical_data(self, start=None, end=None, symbol=None):
         """
-        Fetch historical data for the given symbol.
+        Fetch historical data for `symbol`, or for the configured symbol.
 
         :param start: The start date for the data.
         :param end: The end date for the data.
-        :return: Historical data in JSON format.
+        :param symbol: Symbol to fetch, defaults to the configured symbol.
+        :return: BarBatch of the bars in the range.
         """
         try:
             start, end = DateUtils.validate_dates(start, end)
+            symbol = symbol or self.symbol
             start_str = start.strftime('%Y-%m-%dT%H:%M:%SZ')
             end_str = end.strftime('%Y-%m-%dT%H:%M:%SZ')
 
-            logger.debug(f"Fetching data for {self.symbol} from {start_str} to {end_str}")
-            bars = self.api.get_bars(
-                self.symbol,
+            logger.debug(f"Fetching data for {symbol} from {start_str} to {end_str}")
+            # Raw bar dicts skip the per-page DataFrame construction done by get_bars().df
+            bars = list(self.api.get_bars_iter(
+                symbol,
                 self.timeframe,
                 start=start_str,
-                end=end_str
-            ).df
+                end=end_str,
+                raw=True
+            ))
 
-            logger.info(f"Fetched historical data for {self.symbol}")
-            return bars.to_json()
+            logger.info(f"Fetched historical data for {symbol}")
+            return self._to_batch(bars, symbol)
         except requests.RequestException as e:
             logger.error(f"Error fetching historical data: {e.response.text}")
             raise
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
             raise
+
+    def iter_historical_data(self, start=None, end=None, chunk=None, symbol=None):
+        """
+        Stream the range page by page as the SDK pages through the bars endpoint.
+
+        :return: Generator of non-empty BarBatch, each spanning at most `chunk`.
+        """
+        start, end = DateUtils.validate_dates(start, end)
+        symbol = symbol or self.symbol
+        yield from self._rechunk(self._iter_pages(symbol, start, end), chunk or self.default_chunk)
+
+    def _iter_pages(self, symbol, start, end):
+        try:
+            page = []
+            for bar in self.api.get_bars_iter(
+                symbol,
+                self.timeframe,
+                start=start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                end=end.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                raw=True
+            ):
+                page.append(bar)
+                if len(page) >= self.STREAM_PAGE_BARS:
+                    yield self._to_batch(page, symbol)
+                    page = []
+            if page:
+                yield self._to_batch(page, symbol)
+        except requests.RequestException as e:
+            logger.error(f"Error fetching historical data: {e}")
+            raise
+
+    def get_historical_data_batch(self, symbols, start=None, end=None, max_workers=None):
+        """
+        Fetch many symbols through the multi-symbol bars endpoint.
+
+        Symbols are requested in groups of `symbols_per_request`, with up to `max_workers`
+        groups in flight. Results are yielded per symbol as soon as their group completes.
+
+        :return: Generator of (symbol, BarBatch or Exception) pairs in completion order.
+        """
+        start, end = DateUtils.validate_dates(start, end)
+        symbols = list(dict.fromkeys(symbols))
+        groups = [symbols[i:i + self.symbols_per_request] for i in range(0, len(symbols), self.symbols_per_request)]
+        if not groups:
+            return
+        executor = ThreadPoolExecutor(max_workers=min(max_workers or self.batch_max_workers, len(groups)))
+        futures = {executor.submit(self._fetch_group, group, start, end): group for group in groups}
+        try:
+            for future in as_completed(futures):
+                group = futures[future]
+                try:
+                    by_symbol = future.result()
+                except Exception as e:
+                    logger.error(f"Batch fetch failed for {len(group)} symbols starting with {group[0]}: {e}")
+                    for symbol in group:
+                        yield symbol, e
+                    continue
+                for symbol in group:
+                    yield symbol, self._to_batch(by_symbol.get(symbol, []), symbol)
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _fetch_group(self, symbols, start, end):
+        """
+        Fetch the bars of several symbols with one paginated request, grouped by symbol.
+        """
+        logger.debug(f"Fetching data for {len(symbols)} symbols from {start} to {end}")
+        by_symbol = {}
+        for bar in self.api.get_bars_iter(
+            symbols,
+            self.timeframe,
+            start=start.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            end=end.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            raw=True
+        ):
+            by_symbol.setdefault(bar['S'], []).append(bar)
+        logger.info(f"Fetched historical data for {len(by_symbol)} of {len(symbols)} symbols")
+        return by_symbol
+
+    def _to_batch(self, bars, symbol=None):
+        """
+        Convert raw Alpaca bar dicts ({'t', 'o', 'h', 'l', 'c', 'v', ...}) to a BarBatch.
+        """
+        timestamp = np.array([bar['t'].rstrip('Z') for bar in bars], dtype='datetime64[ns]').view(np.int64)
+        return BarBatch.from_columns(
+            timestamp,
+            [bar['o'] for bar in bars],
+            [bar['h'] for bar in bars],
+            [bar['l'] for bar in bars],
+            [bar['c'] for bar in bars],
+            [bar['v'] for bar in bars],
+            symbol=symbol or self.symbol
+        ).normalized()
@@ -1,20 +1,46 @@
 import os
+import numpy as np
 import requests
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from models import BarBatch
 from historical_data.base_historical_provider import BaseHistoricalDataProvider
 from utils.date_utils import DateUtils
+from utils.rate_limiter import scheduler
+from utils.http_transport import get_transport
 from utils.logging_wrapper import LoggingWrapper
 
 logger = LoggingWrapper(__name__)
 
 class AlphaVantageHistoricalProvider(BaseHistoricalDataProvider):
+    INTRADAY_FUNCTION = 'TIME_SERIES_INTRADAY'
+    # Bars returned by outputsize=compact
+    COMPACT_POINTS = 100
+    # Days of intraday history returned by outputsize=full without a month
+    FULL_INTRADAY_DAYS = 30
+    INTERVAL_SECONDS = {'1min': 60, '5min': 300, '15min': 900, '30min': 1800, '60min': 3600}
+    FUNCTION_SECONDS = {
+        'TIME_SERIES_DAILY': 86400,
+        'TIME_SERIES_DAILY_ADJUSTED': 86400,
+        'TIME_SERIES_WEEKLY': 7 * 86400,
+        'TIME_SERIES_WEEKLY_ADJUSTED': 7 * 86400,
+        'TIME_SERIES_MONTHLY': 28 * 86400,
+        'TIME_SERIES_MONTHLY_ADJUSTED': 28 * 86400
+    }
+
     def __init__(self, **config):
         self.api_key = os.getenv(config['api_key_env'])
         self.symbol = config['symbol']
         self.function = config['function']
         self.interval = config.get('interval')  # Correctly access interval
-        self.outputsize = config['outputsize']
+        # 'full' lets the provider choose per request, 'compact' never asks for more
+        self.outputsize = config.get('outputsize', 'full')
         self.url = config['url']
+        # The free tier allows 5 requests per minute, shared with the real-time provider
+        scheduler.bucket('alpha_vantage', config.get('requests_per_minute', 5) / 60)
+        self.http = get_transport()
+        # symbol -> (covered_from, watermark, BarBatch) of the bars fetched up to the present
+        self._history = {}
         logger.info("AlphaVantageHistoricalProvider initialized with config: %s", config)
 
     def is_market_open(self):
@@ -29,7 +55,7 @@ class AlphaVantageHistoricalProvider(BaseHistoricalDataProvider):
                 'interval': self.interval,
                 'apikey': self.api_key
             }
-            response = requests.get(url, params=params)
+            response = scheduler.request('alpha_vantage', lambda: self.http.get(url, params=params))
             response.raise_for_status()
             data = response.json()
             logger.info("Fetched market status")
@@ -41,38 +67,159 @@ class AlphaVantageHistoricalProvider(BaseHistoricalDataProvider):
             logger.error(f"Unexpected error: {e}")
             return {"is_open": False}
 
-    def get_historical_data(self, start=None, end=None):
+    def _bar_seconds(self):
+        if self.function == self.INTRADAY_FUNCTION:
+            return self.INTERVAL_SECONDS.get(self.interval, 60)
+        return self.FUNCTION_SECONDS.get(self.function, 86400)
+
+    def _plan_requests(self, start, end, now):
+        """
+        Choose the cheapest requests covering [start, end).
+
+        'compact' returns the newest COMPACT_POINTS bars and is used whenever they span the
+        range. Otherwise intraday ranges within FULL_INTRADAY_DAYS use 'full' (trailing 30
+        days) and older ones one 'month' slice per calendar month.
+
+        :return: List of extra query parameter dicts, one per request.
+        """
+        age = (now - start).total_seconds()
+        if self.outputsize == 'compact' or age <= self.COMPACT_POINTS * self._bar_seconds():
+            return [{'outputsize': 'compact'}]
+        if self.function != self.INTRADAY_FUNCTION or age <= self.FULL_INTRADAY_DAYS * 86400:
+            return [{'outputsize': 'full'}]
+        months = []
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            months.append({'outputsize': 'full', 'month': f"{year:04d}-{month:02d}"})
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return months
+
+    def _fetch(self, symbol, extra_params, first_key, last_key):
+        params = {
+            'function': self.function,
+            'symbol': symbol,
+            'interval': self.interval,
+            'apikey': self.api_key,
+            **extra_params
+        }
+        response = scheduler.request('alpha_vantage', lambda: self.http.get(self.url, params=params))
+        response.raise_for_status()
+        data = response.json()
+        series_key = next((key for key in data if key.startswith('Time Series')), None)
+        if series_key is None:
+            logger.error(f"Error fetching historical data: {data}")
+            raise Exception(f"Alpha Vantage API error: {data}")
+        zone = None
+        if self.function == self.INTRADAY_FUNCTION:
+            meta = data.get('Meta Data', {})
+            zone = ZoneInfo(next((value for key, value in meta.items() if key.endswith('Time Zone')), 'US/Eastern'))
+        return self._to_batch(data[series_key], symbol, zone=zone, first_key=first_key, last_key=last_key)
+
+    def get_historical_data(self, start=None, end=None, symbol=None):
         """
-        Fetch historical data for the given symbol.
+        Fetch historical data for `symbol`, or for the configured symbol.
+
+        Bars already fetched for the symbol are kept in memory up to a watermark (the newest
+        bar seen), so a later call only requests the bars after it, usually with one
+        'compact' request.
+
+        :return: BarBatch of the bars in [start, end).
         """
         try:
             start, end = DateUtils.validate_dates(start, end)
-            start_str = start.strftime('%Y-%m-%d')
-            end_str = end.strftime('%Y-%m-%d')
+            symbol = symbol or self.symbol
+            now = datetime.now(timezone.utc)
+            start = start.astimezone(timezone.utc) if start.tzinfo else start.replace(tzinfo=timezone.utc)
+            end = end.astimezone(timezone.utc) if end.tzinfo else end.replace(tzinfo=timezone.utc)
 
-            params = {
-                'function': self.function,
-                'symbol': self.symbol,
-                'interval': self.interval,
-                'outputsize': self.outputsize,
-                'apikey': self.api_key
-            }
+            known = self._history.get(symbol)
+            fetch_from = start
+            if known is not None and known[0] <= start:
+                covered_from, watermark, batch = known
+                if end <= watermark + timedelta(seconds=self._bar_seconds()):
+                    logger.debug(f"Served {symbol} from memory up to watermark {watermark}")
+                    return batch.between(start, end)
+                # Refetch the newest known bar, it may have been incomplete
+                fetch_from = watermark
 
-            logger.debug(f"Fetching data for {self.symbol} from {start_str} to {end_str}")
-            response = requests.get(self.url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            plan = self._plan_requests(fetch_from, end, now)
+            # Loose string bounds skip converting rows far outside the range; between() trims exactly
+            first_key = (fetch_from - timedelta(days=1)).strftime('%Y-%m-%d')
+            last_key = (end + timedelta(days=2)).strftime('%Y-%m-%d')
+            logger.debug(f"Fetching data for {symbol} from {fetch_from} to {end} with {len(plan)} requests")
+            fetched = BarBatch.concat(
+                [self._fetch(symbol, extra, first_key, last_key) for extra in plan], symbol=symbol
+            ).normalized()
 
-            if 'Time Series' in data:
-                logger.info(f"Fetched historical data for {self.symbol}")
-                return data[f'Time Series ({self.interval})']
-            else:
-                logger.error(f"Error fetching historical data: {data}")
-                raise Exception(f"Alpha Vantage API error: {data}")
+            if known is not None and fetch_from != start:
+                fetched = BarBatch.concat([known[2], fetched], symbol=symbol).normalized()
+                fetch_from = known[0]
+            # validate_dates() defaults end to a minute before its own clock read, so allow
+            # two bars of slack when deciding whether the range reaches the present
+            if now - end <= timedelta(seconds=2 * self._bar_seconds()) and len(fetched):
+                # The fetched range reaches the present: remember it for incremental calls
+                watermark = datetime.fromtimestamp(fetched.timestamp[-1] / 1e9, tz=timezone.utc)
+                self._history[symbol] = (fetch_from, watermark, fetched)
 
+            logger.info(f"Fetched historical data for {symbol}")
+            return fetched.between(start, end)
         except requests.RequestException as e:
-            logger.error(f"Error fetching historical data: {e.response.text}")
+            logger.error(f"Error fetching historical data: {e}")
             raise
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
             raise
+
+    def iter_historical_data(self, start=None, end=None, chunk=None, symbol=None):
+        """
+        Stream the range one upstream request at a time (one month per request for older
+        intraday ranges). Streamed bars are not kept for incremental calls.
+
+        :return: Generator of non-empty BarBatch, each spanning at most `chunk`.
+        """
+        start, end = DateUtils.validate_dates(start, end)
+        symbol = symbol or self.symbol
+        start = start.astimezone(timezone.utc) if start.tzinfo else start.replace(tzinfo=timezone.utc)
+        end = end.astimezone(timezone.utc) if end.tzinfo else end.replace(tzinfo=timezone.utc)
+        first_key = (start - timedelta(days=1)).strftime('%Y-%m-%d')
+        last_key = (end + timedelta(days=2)).strftime('%Y-%m-%d')
+
+        def batches():
+            for extra in self._plan_requests(start, end, datetime.now(timezone.utc)):
+                lo, hi = start, end
+                if 'month' in extra:
+                    # Each slice only contributes its own month, so batches never overlap
+                    year, month = map(int, extra['month'].split('-'))
+                    lo = max(start, datetime(year, month, 1, tzinfo=timezone.utc))
+                    hi = min(end, datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc))
+                yield self._fetch(symbol, extra, first_key, last_key).between(lo, hi)
+
+        yield from self._rechunk(batches(), chunk or self.default_chunk)
+
+    def _to_batch(self, series, symbol=None, zone=None, first_key=None, last_key=None):
+        """
+        Convert an Alpha Vantage time series ({timestamp: {'1. open': '...', ...}}) to a BarBatch.
+
+        Only rows whose key lies in [first_key, last_key) are converted. Intraday keys are local
+        times in `zone`; daily and longer bars are stamped at midnight UTC of their date.
+        """
+        keys = [
+            key for key in series
+            if (first_key is None or key >= first_key) and (last_key is None or key < last_key)
+        ]
+        timestamp = np.array(keys, dtype='datetime64[ns]').view(np.int64)
+        if zone is not None and len(keys):
+            offsets = {}
+            for key in keys:
+                day = key[:10]
+                if day not in offsets:
+                    # Sessions never span a DST switch, so the offset at noon holds for the whole day
+                    noon = datetime.fromisoformat(day).replace(hour=12, tzinfo=zone)
+                    offsets[day] = int(noon.utcoffset().total_seconds()) * 1_000_000_000
+            timestamp = timestamp - np.array([offsets[key[:10]] for key in keys], dtype=np.int64)
+        rows = [series[key] for key in keys]
+        columns = [
+            [row[key] for row in rows]
+            for key in ('1. open', '2. high', '3. low', '4. close', '5. volume')
+        ]
+        return BarBatch.from_columns(timestamp, *columns, symbol=symbol or self.symbol).normalized()
@@ -1,14 +1,20 @@
 import requests
 import os
+import numpy as np
 from datetime import datetime, timedelta, time
 from utils.date_utils import DateTimeUtils, DateUtils  # Import the DateUtils class
+from utils.rate_limiter import scheduler
+from utils.http_transport import get_transport
 from historical_data.base_historical_provider import BaseHistoricalDataProvider
+from historical_data.chunked_fetcher import ChunkedFetcher
+from models import BarBatch
 from utils.logging_wrapper import LoggingWrapper
 
 logger = LoggingWrapper(__name__)
 
 class CoinbaseProHistoricalProvider(BaseHistoricalDataProvider):
     SUPPORTED_GRANULARITIES = {60, 300, 900, 3600, 21600, 86400}
+    MAX_CANDLES_PER_REQUEST = 300
 
     def __init__(self, **config):
         self.api_key = os.getenv(config['api_key_env'])
@@ -19,6 +25,16 @@ class CoinbaseProHistoricalProvider(BaseHistoricalDataProvider):
             raise ValueError(f"Unsupported granularity: {self.granularity}. Supported values are {self.SUPPORTED_GRANULARITIES}.")
         self.url = config['url']
         self.use_sandbox = config.get('use_sandbox', False)
+        self.max_workers = config.get('max_workers', 4)
+        self.requests_per_second = config.get('requests_per_second', 3)
+
+        # Keep-alive connections shared with every other REST provider
+        self.http = get_transport()
+        # Every batch worker runs up to max_workers windows; keep the total within the connection pool
+        self.batch_max_workers = max(1, self.http.pool_size // self.max_workers)
+        # Shared by every Coinbase Pro instance in the process
+        scheduler.bucket('coinbase_pro', self.requests_per_second)
+        self.fetcher = ChunkedFetcher(self._fetch_window, max_workers=self.max_workers)
         logger.info("CoinbaseProHistoricalProvider initialized with config: %s", config)
 
     def is_market_open(self):
@@ -26,7 +42,7 @@ class CoinbaseProHistoricalProvider(BaseHistoricalDataProvider):
         Check if the market is currently open. Placeholder implementation.
         """
         try:
-            response = requests.get(f"{self.url}/time")
+            response = scheduler.request('coinbase_pro', lambda: self.http.get(f"{self.url}/time"))
             response.raise_for_status()
             server_time = response.json()['iso']
             server_time = datetime.fromisoformat(server_time.replace('Z', '+00:00'))
@@ -45,37 +61,88 @@ class CoinbaseProHistoricalProvider(BaseHistoricalDataProvider):
             logger.error(f"Unexpected error: {e}")
             return {"is_open": False}
 
-    def get_historical_data(self, start=None, end=None):
+    def _fetch_window(self, start, end, symbol):
         """
-        Fetch historical data for the given symbol.
+        Fetch the candles of a single window of at most MAX_CANDLES_PER_REQUEST candles.
         """
-        try:
-            start, end = DateUtils.validate_dates(start, end)  # Use the validate_dates method from DateUtils
+        url_path = f"/products/{symbol}/candles"
+        params = {
+            'start': DateTimeUtils.to_rfc3339(start),
+            'end': DateTimeUtils.to_rfc3339(end),
+            'granularity': self.granularity
+        }
+
+        # Generate the required headers
+        headers = {
+            'CB-ACCESS-KEY': self.api_key,
+            'CB-ACCESS-SIGN': self.secret_key,
+            'CB-ACCESS-TIMESTAMP': str(int(datetime.utcnow().timestamp())),
+        }
+
+        response = scheduler.request(
+            'coinbase_pro',
+            lambda: self.http.get(f"{self.url}{url_path}", headers=headers, params=params)
+        )
+        response.raise_for_status()
+        return self._to_batch(response.json(), symbol)
 
-            start_str = DateTimeUtils.to_rfc3339(start)
-            end_str = DateTimeUtils.to_rfc3339(end)
+    def _to_batch(self, candles, symbol=None):
+        """
+        Convert Coinbase candles ([time, low, high, open, close, volume], ...) to a BarBatch.
+        """
+        symbol = symbol or self.symbol
+        if not candles:
+            return BarBatch.empty(symbol=symbol)
+        array = np.asarray(candles, dtype=np.float64)
+        timestamp = array[:, 0].astype(np.int64) * 1_000_000_000
+        return BarBatch(timestamp, array[:, [3, 2, 1, 4, 5]].T, symbol=symbol)
 
-            url_path = f"/products/{self.symbol}/candles"
-            params = {
-                'start': start_str,
-                'end': end_str,
-                'granularity': self.granularity
-            }
+    def get_historical_data(self, start=None, end=None, symbol=None):
+        """
+        Fetch historical data for `symbol`, or for the configured symbol.
 
-            # Generate the required headers
-            headers = {
-                'CB-ACCESS-KEY': self.api_key,
-                'CB-ACCESS-SIGN': self.secret_key,
-                'CB-ACCESS-TIMESTAMP': str(int(datetime.utcnow().timestamp())),
-            }
+        The range is split into windows of MAX_CANDLES_PER_REQUEST candles, fetched
+        concurrently, then stitched, de-duplicated and sorted by time ascending.
 
-            response = requests.get(f"{self.url}{url_path}", headers=headers, params=params)
-            response.raise_for_status()
-            logger.info(f"Fetched historical data for {self.symbol}")
-            return response.json()
+        :return: BarBatch of the bars in the range.
+        """
+        try:
+            start, end = DateUtils.validate_dates(start, end)  # Use the validate_dates method from DateUtils
+            symbol = symbol or self.symbol
+
+            window = timedelta(seconds=self.MAX_CANDLES_PER_REQUEST * self.granularity)
+            chunks = self.fetcher.fetch(start, end, window, symbol)
+
+            # Adjacent windows share their edge candle, normalized() drops the duplicates
+            logger.info(f"Fetched historical data for {symbol}")
+            return BarBatch.concat(chunks, symbol=symbol).normalized()
         except requests.RequestException as e:
             logger.error(f"Error fetching historical data: {e}")
             raise
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
             raise
+
+    def iter_historical_data(self, start=None, end=None, chunk=None, symbol=None):
+        """
+        Stream the range: windows of MAX_CANDLES_PER_REQUEST candles are fetched with up to
+        `max_workers` in flight and yielded in time order as they complete.
+
+        :return: Generator of non-empty BarBatch, each spanning at most `chunk`.
+        """
+        start, end = DateUtils.validate_dates(start, end)
+        symbol = symbol or self.symbol
+        window = timedelta(seconds=self.MAX_CANDLES_PER_REQUEST * self.granularity)
+
+        def batches():
+            last = None
+            for _, batch in self.fetcher.iter_fetch(start, end, window, symbol):
+                batch = batch.normalized()
+                # Adjacent windows share their edge candle, keep only what follows the previous window
+                if last is not None:
+                    batch = batch[int(np.searchsorted(batch.timestamp, last, side='right')):]
+                if len(batch):
+                    last = batch.timestamp[-1]
+                yield batch
+
+        yield from self._rechunk(batches(), chunk or self.default_chunk)
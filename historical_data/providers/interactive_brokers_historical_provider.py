@@ -1,13 +1,22 @@
-from ib_insync import IB, Stock, util
+from ib_insync import Stock
+import asyncio
 import os
 from datetime import datetime, timedelta
+from models import BarBatch, to_epoch_ns
 from utils.date_utils import DateUtils  # Import the DateUtils class
 from historical_data.base_historical_provider import BaseHistoricalDataProvider
+from historical_data.ib_pacing import pacer, plan_requests
+from utils.ib_connection import get_ib_connection_manager
 from utils.logging_wrapper import LoggingWrapper
 
 logger = LoggingWrapper(__name__)
 
 class InteractiveBrokersHistoricalProvider(BaseHistoricalDataProvider):
+    # ib_insync clients are bound to the thread running their event loop
+    batch_max_workers = 1
+    # Seconds per unit of an IB durationStr
+    DURATION_UNITS = {'S': 1, 'D': 86400, 'W': 7 * 86400, 'M': 31 * 86400, 'Y': 365 * 86400}
+
     def __init__(self, **config):
         required_keys = ['host', 'port', 'client_id', 'symbol', 'duration', 'bar_size']
         if not all(key in config for key in required_keys):
@@ -19,12 +28,24 @@ class InteractiveBrokersHistoricalProvider(BaseHistoricalDataProvider):
         self.symbol = config['symbol']
         self.duration = config['duration']
         self.bar_size = config['bar_size']
-        self.ib = IB()
-        if not self.ib.connect(self.host, self.port, clientId=self.client_id):
-            logger.error("Failed to connect to Interactive Brokers TWS API.")
-            raise ConnectionError("Could not connect to Interactive Brokers TWS API.")
+        self.what_to_show = config.get('what_to_show', 'MIDPOINT')
+        self.use_rth = config.get('use_rth', True)
+        # Requests in flight at once on the connection; the pacer still spaces them
+        self.max_concurrent_requests = config.get('max_concurrent_requests', 6)
+        # Shared with the real-time provider, connected on the first request
+        self.connection = get_ib_connection_manager().connection(self.host, self.port, self.client_id)
         logger.info("InteractiveBrokersHistoricalProvider initialized with config: %s", config)
 
+    @property
+    def ib(self):
+        return self.connection.ib
+
+    def close(self):
+        """
+        Release the shared IB connection.
+        """
+        self.connection.release()
+
     def is_market_open(self):
         """
         Check if the market is currently open.
@@ -36,34 +57,126 @@ class InteractiveBrokersHistoricalProvider(BaseHistoricalDataProvider):
         close_time = datetime(now.year, now.month, now.day, 16, 0)  # Market closes at 4:00 PM
         return open_time <= now <= close_time
 
-    def get_historical_data(self, start=None, end=None):
+    def get_historical_data(self, start=None, end=None, symbol=None):
         """
-        Fetch historical data for the given symbol between start and end dates.
+        Fetch historical data for `symbol` (or the configured symbol) between start and end dates.
+
+        The range is split into the longest windows IB accepts for the bar size. The window
+        requests run concurrently on the connection, paced to stay within IB's historical
+        data limits, and are merged into one series. Without `start`, the configured
+        `duration` before `end` is fetched.
+
+        :return: BarBatch of the returned bars.
         """
         try:
+            requested_start = start
             start, end = DateUtils.validate_dates(start, end)
+            if requested_start is None:
+                start = end - self._parse_duration(self.duration)
             logger.debug(f"Validated dates - Start: {start}, End: {end}")
+            symbol = symbol or self.symbol
 
-            contract = self.create_contract()
+            contract = self.create_contract(symbol)
+            requests = plan_requests(start, end, self.bar_size)
 
-            logger.debug(f"Requesting historical data for {self.symbol}")
-            bars = self.ib.reqHistoricalData(
-                contract,
-                endDateTime=end,
-                durationStr=self.duration,
-                barSizeSetting=self.bar_size,
-                whatToShow='MIDPOINT',
-                useRTH=True
-            )
+            logger.debug(f"Requesting historical data for {symbol} in {len(requests)} requests")
+            results = self.ib.run(self._fetch_windows(contract, requests))
 
-            logger.info(f"Fetched historical data for {self.symbol}")
-            return util.df(bars).to_json()
+            logger.info(f"Fetched historical data for {symbol}")
+            return BarBatch.concat(
+                [self._to_batch(bars, symbol) for bars in results], symbol=symbol
+            ).normalized().between(start, end)
         except Exception as e:
-            logger.error(f"Error fetching historical data for {self.symbol}: {e}")
+            logger.error(f"Error fetching historical data for {symbol}: {e}")
             raise
 
-    def create_contract(self):
+    def iter_historical_data(self, start=None, end=None, chunk=None, symbol=None):
+        """
+        Stream the range oldest first, `max_concurrent_requests` request windows at a time.
+
+        :return: Generator of non-empty BarBatch, each spanning at most `chunk`.
+        """
+        requested_start = start
+        start, end = DateUtils.validate_dates(start, end)
+        if requested_start is None:
+            start = end - self._parse_duration(self.duration)
+        symbol = symbol or self.symbol
+        contract = self.create_contract(symbol)
+        requests = plan_requests(start, end, self.bar_size)
+        # Window i spans [end of window i + 1, its own end); durations are rounded up, so trim
+        bounds = [(requests[i + 1][0] if i + 1 < len(requests) else start, window_end)
+                  for i, (window_end, _) in enumerate(requests)]
+        requests, bounds = requests[::-1], bounds[::-1]
+
+        def batches():
+            step = self.max_concurrent_requests
+            for i in range(0, len(requests), step):
+                results = self.ib.run(self._fetch_windows(contract, requests[i:i + step]))
+                for (window_start, window_end), bars in zip(bounds[i:i + step], results):
+                    yield self._to_batch(bars, symbol).between(window_start, window_end)
+
+        yield from self._rechunk(batches(), chunk or self.default_chunk)
+
+    async def _fetch_windows(self, contract, requests):
+        """
+        Run one reqHistoricalData per (end, durationStr) window concurrently.
+
+        :return: List of BarDataList, in window order.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        contract_key = (contract.symbol, contract.exchange, self.what_to_show)
+
+        async def fetch(window_end, duration):
+            async with semaphore:
+                await pacer.wait(contract_key, (contract_key, window_end, duration, self.bar_size))
+                bars = await self.ib.reqHistoricalDataAsync(
+                    contract,
+                    endDateTime=window_end,
+                    durationStr=duration,
+                    barSizeSetting=self.bar_size,
+                    whatToShow=self.what_to_show,
+                    useRTH=self.use_rth,
+                    formatDate=2  # UTC timestamps
+                )
+                if not bars:
+                    logger.warning(f"No bars for {contract.symbol} in the {duration} before {window_end}")
+                return bars or []
+
+        return await asyncio.gather(*(fetch(window_end, duration) for window_end, duration in requests))
+
+    @classmethod
+    def _parse_duration(cls, duration):
+        """
+        Convert an IB durationStr such as '1 D' to a timedelta.
+        """
+        count, unit = duration.split()
+        if unit not in cls.DURATION_UNITS:
+            raise ValueError(f"Unknown IB duration unit: {duration}")
+        return timedelta(seconds=int(count) * cls.DURATION_UNITS[unit])
+
+    def _to_batch(self, bars, symbol=None):
+        """
+        Convert ib_insync BarData objects to a BarBatch.
+        """
+        return BarBatch.from_columns(
+            [to_epoch_ns(self._as_datetime(bar.date)) for bar in bars],
+            [bar.open for bar in bars],
+            [bar.high for bar in bars],
+            [bar.low for bar in bars],
+            [bar.close for bar in bars],
+            [bar.volume for bar in bars],
+            symbol=symbol or self.symbol
+        ).normalized()
+
+    @staticmethod
+    def _as_datetime(value):
+        # Daily bars carry a date rather than a datetime
+        if isinstance(value, datetime):
+            return value
+        return datetime(value.year, value.month, value.day)
+
+    def create_contract(self, symbol=None):
         """
         Create a contract object for the symbol.
         """
-        return Stock(self.symbol, 'SMART', 'USD')
\ No newline at end of file
+        return Stock(symbol or self.symbol, 'SMART', 'USD')
\ No newline at end of file
@@ -1,12 +1,18 @@
 import json
+import asyncio
 import argparse
 from datetime import datetime, timezone
 from injector import Injector
-from di_module import Config, RealTimeDataProviderModule, HistoricalDataProviderModule
+from di_module import Config, RealTimeDataProviderModule, HistoricalDataProviderModule, AsyncRealTimeEngineModule, build_historical_provider
 from real_time_data.base_realtime_provider import BaseRealTimeDataProvider
+from real_time_data.realtime_engine import RealTimeEngine
+from real_time_data.supervisor import ConnectionSupervisor, Backoff
 from historical_data.base_historical_provider import BaseHistoricalDataProvider
+from historical_data.exporter import HistoricalExporter
+from service import DataService, DataServiceServer
 from utils.env_loader import EnvLoader
 from utils.logging_wrapper import LoggingWrapper
+from utils.logging_bootstrap import configure_logging
 
 logger = LoggingWrapper(__name__)
 
@@ -35,12 +41,54 @@ def get_real_time_data(config):
     
     :param config: Configuration object for the provider.
     """
+    provider = None
     try:
         injector = Injector([RealTimeDataProviderModule(config)])
         provider = injector.get(BaseRealTimeDataProvider)
-        provider.connect()
+        supervise = config.realtime_config.get('supervise') or {}
+        if supervise.get('enabled', False):
+            historical_provider = None
+            if supervise.get('backfill', True) and config.historical_config:
+                historical_provider = build_historical_provider(config)
+            supervisor = ConnectionSupervisor(
+                provider,
+                historical_provider=historical_provider,
+                bar_interval=supervise.get('bar_interval', 60),
+                backoff=Backoff(maximum=supervise.get('max_delay', 60))
+            )
+            supervisor.run()
+        else:
+            provider.connect()
     except Exception as e:
         logger.error(f"Error in real-time data provider: {e}")
+    finally:
+        if provider is not None and provider.publisher is not None:
+            provider.publisher.close()
+
+async def _consume(engine):
+    subscription = engine.subscribe()
+    consumer = asyncio.ensure_future(_print_records(subscription))
+    try:
+        await engine.run()
+    finally:
+        consumer.cancel()
+
+async def _print_records(subscription):
+    async for record in subscription:
+        print(record)
+
+def get_real_time_data_async(configs):
+    """
+    Run several real-time providers on one asyncio event loop.
+
+    :param configs: List of configuration objects, one per provider.
+    """
+    try:
+        injector = Injector([AsyncRealTimeEngineModule(configs)])
+        engine = injector.get(RealTimeEngine)
+        asyncio.run(_consume(engine))
+    except Exception as e:
+        logger.error(f"Error in async real-time engine: {e}")
 
 def get_historical_data(config):
     """
@@ -56,34 +104,131 @@ def get_historical_data(config):
         start_date = datetime(2024, 5, 24, tzinfo=timezone.utc)
         end_date = datetime(2024, 5, 25, tzinfo=timezone.utc)
 
-        # Fetch historical data
-        historical_data = historical_provider.get_historical_data(start=start_date, end=end_date)
-        logger.info(f"Historical data: {historical_data}")
+        # A 'symbols' list fetches a whole universe through the batch API
+        symbols = config.historical_config.get('symbols')
+        if symbols:
+            for symbol, result in historical_provider.get_historical_data_batch(symbols, start=start_date, end=end_date):
+                if isinstance(result, Exception):
+                    logger.error(f"Error fetching historical data for {symbol}: {result}")
+                    print(f"{symbol}: failed ({result})")
+                    continue
+                print(symbol)
+                print(result.to_pandas())
+            return
 
-        print(historical_data)
+        # Stream the range one chunk at a time so memory does not grow with its length
+        for batch in historical_provider.iter_historical_data(start=start_date, end=end_date):
+            logger.info(f"Historical data chunk: {batch}")
+            print(batch.to_pandas())
     except Exception as e:
         logger.error(f"Error in historical data provider: {e}")
 
+def export_historical_data(config, path, export_format='parquet', symbols=None, start=None, end=None, writers=4):
+    """
+    Export the historical bars of many symbols to files partitioned by symbol and date.
+
+    :param config: Configuration object for the provider.
+    :param symbols: Symbols to export, defaults to the configured 'symbols' list or symbol.
+    """
+    try:
+        injector = Injector([HistoricalDataProviderModule(config)])
+        historical_provider = injector.get(BaseHistoricalDataProvider)
+        symbols = symbols or config.historical_config.get('symbols') or [config.historical_config['symbol']]
+        exporter = HistoricalExporter(historical_provider, path, export_format=export_format, writers=writers)
+        for symbol, result in exporter.export(symbols, start=start, end=end).items():
+            if isinstance(result, Exception):
+                print(f"{symbol}: failed ({result})")
+            else:
+                print(f"{symbol}: {result['bars']} bars in {result['files']} files")
+    except Exception as e:
+        logger.error(f"Error exporting historical data: {e}")
+
+def _parse_date(value):
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def run_service(configs, listen):
+    """
+    Run the resident data service until interrupted.
+
+    :param configs: Configuration objects of the providers the service may use.
+    :param listen: 'host:port' or a Unix socket path.
+    """
+    service = DataService(configs)
+    server = None
+    try:
+        server = DataServiceServer(service, listen)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Data service stopped")
+    except Exception as e:
+        logger.error(f"Error in data service: {e}")
+    finally:
+        if server is not None:
+            server.stop()
+        service.close()
+
 def main():
     parser = argparse.ArgumentParser(description="Select data type to fetch (historical or real-time)")
-    parser.add_argument('--data-type', type=str, required=True, choices=['historical', 'realtime'], 
-                        help="Specify the data type to fetch: 'historical' or 'realtime'")
+    parser.add_argument('--data-type', type=str, required=True, choices=['historical', 'realtime', 'service'],
+                        help="Specify the data type to fetch: 'historical' or 'realtime', or 'service' to run "
+                             "the resident data service for every provider in PROVIDER_NAME (comma separated)")
+    parser.add_argument('--engine', type=str, default='threaded', choices=['threaded', 'async'],
+                        help="Real-time engine: one blocking provider ('threaded') or every provider in "
+                             "PROVIDER_NAME (comma separated) on one event loop ('async')")
+    parser.add_argument('--listen', type=str, default='127.0.0.1:8700',
+                        help="Data service address: 'host:port' or a Unix socket path")
+    parser.add_argument('--export', type=str, metavar='PATH',
+                        help="With --data-type historical, write the bars to PATH partitioned by symbol and date")
+    parser.add_argument('--export-format', type=str, default='parquet', choices=['parquet', 'arrow', 'csv'],
+                        help="Export file format: Parquet, Arrow IPC or gzip-compressed CSV")
+    parser.add_argument('--symbols', type=str, help="Comma separated symbols to export")
+    parser.add_argument('--start', type=_parse_date, help="Export range start (ISO 8601, UTC by default)")
+    parser.add_argument('--end', type=_parse_date, help="Export range end (ISO 8601, UTC by default)")
+    parser.add_argument('--writers', type=int, default=4, help="Export writer threads")
     args = parser.parse_args()
 
     try:
         # Load environment variables from .env file
         EnvLoader.load_env('.env')
 
+        # Apply the LOG_* settings from .env to the process-wide log handlers
+        configure_logging()
+
         # Get the provider name from environment variables
         provider_name = EnvLoader.get_env_variable('PROVIDER_NAME', 'binance')
         logger.info(f"Using provider: {provider_name}")
 
+        if args.data_type == 'service':
+            configs = []
+            for name in provider_name.split(','):
+                name = name.strip()
+                config_data = load_config('config/config.json', name)
+                configs.append(Config(provider=name, realtime_config=config_data.get('realtime'),
+                                      historical_config=config_data.get('historical')))
+            run_service(configs, args.listen)
+            return
+
+        if args.data_type == 'realtime' and args.engine == 'async':
+            configs = []
+            for name in provider_name.split(','):
+                name = name.strip()
+                config_data = load_config('config/config.json', name)
+                configs.append(Config(provider=name, realtime_config=config_data['realtime'],
+                                      historical_config=config_data.get('historical')))
+            get_real_time_data_async(configs)
+            return
+
         # Load the configuration for the specified provider
         config_data = load_config('config/config.json', provider_name)
         config = Config(provider=provider_name, realtime_config=config_data['realtime'], historical_config=config_data['historical'])
 
         if args.data_type == 'realtime':
             get_real_time_data(config)
+        elif args.data_type == 'historical' and args.export:
+            symbols = [symbol.strip() for symbol in args.symbols.split(',')] if args.symbols else None
+            export_historical_data(config, args.export, export_format=args.export_format, symbols=symbols,
+                                   start=args.start, end=args.end, writers=args.writers)
         elif args.data_type == 'historical':
             get_historical_data(config)
         
@@ -0,0 +1,10 @@
+from mock_exchange.faults import FaultInjector
+from mock_exchange.rest import MockRestServer
+from mock_exchange.streams import MockAlpacaStream, MockCoinbaseFeed
+
+__all__ = [
+    'FaultInjector',
+    'MockRestServer',
+    'MockAlpacaStream',
+    'MockCoinbaseFeed'
+]
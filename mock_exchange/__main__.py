@@ -0,0 +1,72 @@
+"""
+Run the local mock exchange.
+
+    python -m mock_exchange --rate 50000 --alpaca-port 8765 --coinbase-port 8766 --rest-port 8080
+
+Point the providers at it by setting, in config/config.json:
+    alpaca realtime url        ws://127.0.0.1:8765/v2/{feed}   (use_sandbox: false)
+    coinbase_pro realtime url  ws://127.0.0.1:8766
+    coinbase_pro historical url, alpha_vantage url (…/query), alpaca url/data_url  http://127.0.0.1:8080
+"""
+import argparse
+import asyncio
+import time
+from mock_exchange.faults import FaultInjector
+from mock_exchange.rest import MockRestServer
+from mock_exchange.streams import MockAlpacaStream, MockCoinbaseFeed
+
+
+async def _serve(args):
+    faults = FaultInjector(
+        disconnect_probability=args.disconnect_probability,
+        malformed_probability=args.malformed_probability,
+        http_error_rate=args.http_error_rate,
+        http_latency_ms=args.http_latency_ms
+    )
+    stream_options = dict(host=args.host, rate=args.rate, burst_factor=args.burst_factor,
+                          burst_every=args.burst_every, burst_duration=args.burst_duration, faults=faults)
+    alpaca = await MockAlpacaStream(port=args.alpaca_port, batch_size=args.batch_size, **stream_options).start()
+    coinbase = await MockCoinbaseFeed(port=args.coinbase_port, **stream_options).start()
+    rest = MockRestServer(host=args.host, port=args.rest_port, faults=faults).start()
+    print(f"Alpaca stream  ws://{args.host}:{alpaca.port}/v2/iex")
+    print(f"Coinbase feed  ws://{args.host}:{coinbase.port}")
+    print(f"REST           http://{args.host}:{rest.port}")
+
+    last, last_sent = time.monotonic(), 0
+    try:
+        while True:
+            await asyncio.sleep(args.stats_every)
+            now, sent = time.monotonic(), alpaca.sent + coinbase.sent
+            print(f"frames/s {((sent - last_sent) / (now - last)):,.0f}  rest requests {rest.requests}")
+            last, last_sent = now, sent
+    finally:
+        await alpaca.stop()
+        await coinbase.stop()
+        rest.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock exchange for offline load testing")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--alpaca-port', type=int, default=8765)
+    parser.add_argument('--coinbase-port', type=int, default=8766)
+    parser.add_argument('--rest-port', type=int, default=8080)
+    parser.add_argument('--rate', type=float, default=1000, help="Messages per second per connection")
+    parser.add_argument('--batch-size', type=int, default=100, help="Alpaca messages per frame")
+    parser.add_argument('--burst-factor', type=float, default=1.0, help="Rate multiplier during bursts")
+    parser.add_argument('--burst-every', type=float, default=0.0, help="Seconds between bursts (0 disables)")
+    parser.add_argument('--burst-duration', type=float, default=0.0, help="Length of a burst in seconds")
+    parser.add_argument('--disconnect-probability', type=float, default=0.0, help="Per-frame chance of dropping the socket")
+    parser.add_argument('--malformed-probability', type=float, default=0.0, help="Per-frame chance of a truncated frame")
+    parser.add_argument('--http-error-rate', type=float, default=0.0, help="Per-request chance of a 429/500")
+    parser.add_argument('--http-latency-ms', type=float, default=0.0, help="Extra latency per REST response")
+    parser.add_argument('--stats-every', type=float, default=5.0, help="Seconds between throughput reports")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import random
+
+
+class FaultInjector:
+    """
+    Randomized fault injection shared by the stream and REST endpoints.
+
+    :param disconnect_probability: Chance per sent frame that the stream connection is dropped.
+    :param malformed_probability: Chance per sent frame that a malformed frame is sent instead.
+    :param http_error_rate: Chance per REST request of answering 429 (with Retry-After) or 500.
+    :param http_latency_ms: Extra latency added to every REST response.
+    """
+
+    def __init__(self, disconnect_probability=0.0, malformed_probability=0.0, http_error_rate=0.0,
+                 http_latency_ms=0.0, seed=7):
+        self.disconnect_probability = disconnect_probability
+        self.malformed_probability = malformed_probability
+        self.http_error_rate = http_error_rate
+        self.http_latency_ms = http_latency_ms
+        self.rng = random.Random(seed)
+
+    def should_disconnect(self):
+        return self.disconnect_probability > 0 and self.rng.random() < self.disconnect_probability
+
+    def should_malform(self):
+        return self.malformed_probability > 0 and self.rng.random() < self.malformed_probability
+
+    def http_error(self):
+        """
+        Return an HTTP status to fail the request with, or None.
+        """
+        if self.http_error_rate > 0 and self.rng.random() < self.http_error_rate:
+            return 429 if self.rng.random() < 0.7 else 500
+        return None
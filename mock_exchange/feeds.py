@@ -0,0 +1,60 @@
+import random
+from datetime import datetime, timezone
+
+
+class PriceWalk:
+    """
+    Deterministic per-symbol random walk used by every mock endpoint.
+    """
+
+    def __init__(self, symbols, seed=42, start_price=100.0):
+        self.rng = random.Random(seed)
+        self.prices = {symbol: start_price * (1 + 0.5 * self.rng.random()) for symbol in symbols}
+
+    def step(self, symbol):
+        price = self.prices.get(symbol, 100.0)
+        price = max(0.01, price * (1 + self.rng.gauss(0, 0.0005)))
+        self.prices[symbol] = price
+        return price
+
+    def ohlcv(self, symbol):
+        o = self.prices.get(symbol, 100.0)
+        c = self.step(symbol)
+        return o, max(o, c) * 1.0003, min(o, c) * 0.9997, c, self.rng.randint(100, 50000)
+
+
+def iso_now(micros=True):
+    now = datetime.now(timezone.utc)
+    if micros:
+        return now.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+    return now.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class RateSchedule:
+    """
+    Messages-per-tick schedule with an optional periodic burst.
+
+    :param rate: Base rate in messages per second.
+    :param burst_factor: Rate multiplier applied during a burst.
+    :param burst_every: Seconds between burst starts (0 disables bursts).
+    :param burst_duration: Length of each burst in seconds.
+    """
+
+    def __init__(self, rate, burst_factor=1.0, burst_every=0.0, burst_duration=0.0):
+        self.rate = rate
+        self.burst_factor = burst_factor
+        self.burst_every = burst_every
+        self.burst_duration = burst_duration
+        self._carry = 0.0
+
+    def messages_due(self, elapsed, tick):
+        """
+        Number of messages to send in a tick of `tick` seconds, `elapsed` seconds after start.
+        """
+        rate = self.rate
+        if self.burst_every > 0 and (elapsed % self.burst_every) < self.burst_duration:
+            rate *= self.burst_factor
+        due = rate * tick + self._carry
+        count = int(due)
+        self._carry = due - count
+        return count
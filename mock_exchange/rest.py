@@ -0,0 +1,170 @@
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from mock_exchange.faults import FaultInjector
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+ALPACA_TIMEFRAMES = {'1Min': 60, '5Min': 300, '15Min': 900, '1Hour': 3600, '1Day': 86400}
+AV_INTERVALS = {'1min': 60, '5min': 300, '15min': 900, '30min': 1800, '60min': 3600}
+
+
+def _parse_time(value):
+    if value.isdigit():
+        return datetime.fromtimestamp(int(value), tz=timezone.utc)
+    value = value.replace('Z', '+00:00')
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def synthetic_bar(symbol, epoch):
+    """
+    Deterministic OHLCV for (symbol, epoch) so that repeated queries return identical data.
+    """
+    rng = random.Random(zlib.crc32(f"{symbol}:{epoch}".encode()))
+    base = 100 + 20 * math.sin(epoch / 604800.0) + 5 * math.sin(epoch / 3600.0)
+    o = base * (1 + rng.gauss(0, 0.001))
+    c = base * (1 + rng.gauss(0, 0.001))
+    return o, max(o, c) * 1.0005, min(o, c) * 0.9995, c, rng.randint(100, 50000)
+
+
+def _series(symbol, start, end, step):
+    first = int(math.ceil(start.timestamp() / step) * step)
+    return [(t,) + synthetic_bar(symbol, t) for t in range(first, int(end.timestamp()), step)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug("mock REST %s", format % args)
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server.mock
+        server.requests += 1
+        if server.faults.http_latency_ms:
+            time.sleep(server.faults.http_latency_ms / 1000.0)
+        status = server.faults.http_error()
+        if status == 429:
+            return self._send(429, {"message": "Too Many Requests"}, {'Retry-After': '1'})
+        if status is not None:
+            return self._send(status, {"message": "Internal Server Error"})
+
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split('/') if part]
+        try:
+            if parts == ['time']:
+                now = datetime.now(timezone.utc)
+                return self._send(200, {"iso": now.isoformat().replace('+00:00', 'Z'), "epoch": now.timestamp()})
+            if len(parts) == 3 and parts[0] == 'products' and parts[2] == 'candles':
+                return self._send(200, server.coinbase_candles(parts[1], query))
+            if parts == ['query']:
+                return self._send(200, server.alpha_vantage(query))
+            if parts == ['v2', 'clock']:
+                now = datetime.now(timezone.utc)
+                return self._send(200, {"timestamp": now.isoformat(), "is_open": True,
+                                        "next_open": now.isoformat(), "next_close": now.isoformat()})
+            if len(parts) == 4 and parts[:2] == ['v2', 'stocks'] and parts[3] == 'bars':
+                return self._send(200, server.alpaca_bars([parts[2]], query, multi=False))
+            if parts == ['v2', 'stocks', 'bars']:
+                return self._send(200, server.alpaca_bars(query['symbols'].split(','), query, multi=True))
+        except (KeyError, ValueError) as e:
+            return self._send(400, {"message": f"Bad request: {e}"})
+        return self._send(404, {"message": "Not found"})
+
+
+class MockRestServer:
+    """
+    Local stand-in for the Coinbase candles/time, Alpha Vantage query and Alpaca
+    clock/bars REST endpoints, serving deterministic synthetic data.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, faults=None, alpaca_page_limit=10000):
+        self.faults = faults or FaultInjector()
+        self.alpaca_page_limit = alpaca_page_limit
+        self.requests = 0
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self.host, self.port = self._httpd.server_address[:2]
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='mock-rest', daemon=True)
+        self._thread.start()
+        logger.info(f"MockRestServer listening on {self.host}:{self.port}")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def coinbase_candles(self, symbol, query):
+        granularity = int(query.get('granularity', 60))
+        end = _parse_time(query['end']) if 'end' in query else datetime.now(timezone.utc)
+        start = _parse_time(query['start']) if 'start' in query else end - timedelta(seconds=300 * granularity)
+        # Coinbase returns at most 300 candles, newest first, as [time, low, high, open, close, volume]
+        rows = _series(symbol, start, end + timedelta(seconds=1), granularity)[-300:]
+        return [[t, round(l, 2), round(h, 2), round(o, 2), round(c, 2), v] for t, o, h, l, c, v in reversed(rows)]
+
+    def alpha_vantage(self, query):
+        function = query['function']
+        symbol = query['symbol']
+        now = datetime.now(timezone.utc)
+        if function == 'TIME_SERIES_INTRADAY':
+            interval = query.get('interval', '1min')
+            step = AV_INTERVALS[interval]
+            count = 100 if query.get('outputsize', 'compact') == 'compact' else 30 * 390
+            rows = _series(symbol, now - timedelta(seconds=step * count), now, step)
+            key, fmt = f"Time Series ({interval})", '%Y-%m-%d %H:%M:%S'
+        else:
+            count = 100 if query.get('outputsize', 'compact') == 'compact' else 20 * 365
+            rows = _series(symbol, now - timedelta(days=count), now, 86400)
+            key, fmt = "Time Series (Daily)", '%Y-%m-%d'
+        series = {
+            datetime.fromtimestamp(t, tz=timezone.utc).strftime(fmt): {
+                "1. open": f"{o:.4f}", "2. high": f"{h:.4f}", "3. low": f"{l:.4f}",
+                "4. close": f"{c:.4f}", "5. volume": str(v)
+            }
+            for t, o, h, l, c, v in reversed(rows)
+        }
+        return {"Meta Data": {"2. Symbol": symbol, "Time Zone": "UTC"}, key: series}
+
+    def alpaca_bars(self, symbols, query, multi):
+        step = ALPACA_TIMEFRAMES.get(query.get('timeframe', '1Min'), 60)
+        start = _parse_time(query['start'])
+        end = _parse_time(query['end']) if 'end' in query else datetime.now(timezone.utc)
+        limit = min(int(query.get('limit', self.alpaca_page_limit)), self.alpaca_page_limit)
+        offset = int(query.get('page_token') or 0)
+
+        rows = [(symbol, row) for symbol in symbols for row in _series(symbol, start, end, step)]
+        page = rows[offset:offset + limit]
+        next_token = str(offset + limit) if offset + limit < len(rows) else None
+        bars = {}
+        for symbol, (t, o, h, l, c, v) in page:
+            bars.setdefault(symbol, []).append({
+                "t": datetime.fromtimestamp(t, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                "o": round(o, 2), "h": round(h, 2), "l": round(l, 2), "c": round(c, 2), "v": v,
+                "n": 1, "vw": round((o + c) / 2, 4)
+            })
+        if multi:
+            return {"bars": bars, "next_page_token": next_token}
+        return {"bars": bars.get(symbols[0], []), "symbol": symbols[0], "next_page_token": next_token}
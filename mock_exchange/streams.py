@@ -0,0 +1,222 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+import websockets
+from mock_exchange.feeds import PriceWalk, RateSchedule, iso_now
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+TICK_SECONDS = 0.01
+
+
+class _StreamSession:
+    """
+    One client connection: reads control frames and produces market data at the scheduled rate.
+    """
+
+    def __init__(self, server, ws):
+        self.server = server
+        self.ws = ws
+        self.symbols = set()
+        self.schedule = RateSchedule(server.rate, server.burst_factor, server.burst_every, server.burst_duration)
+
+    async def run(self):
+        producer = asyncio.ensure_future(self._produce())
+        try:
+            async for message in self.ws:
+                try:
+                    control = json.loads(message)
+                except ValueError as e:
+                    control = e
+                if isinstance(control, dict):
+                    await self.server.handle_control(self, control)
+                else:
+                    # Like a real exchange, reject the frame and keep the session open
+                    await self.ws.send(self.server.error_frame(f"invalid control frame: {control}"))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            producer.cancel()
+
+    async def _produce(self):
+        started = time.monotonic()
+        next_tick = started
+        try:
+            while True:
+                next_tick += TICK_SECONDS
+                await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+                if not self.symbols:
+                    continue
+                count = self.schedule.messages_due(time.monotonic() - started, TICK_SECONDS)
+                for frame in self.server.build_frames(sorted(self.symbols), count):
+                    if self.server.faults.should_disconnect():
+                        logger.info("Injecting disconnect")
+                        await self.ws.close(code=1011, reason='injected fault')
+                        return
+                    if self.server.faults.should_malform():
+                        frame = frame[:len(frame) // 2]
+                    await self.ws.send(frame)
+                    self.server.sent += 1
+        except websockets.ConnectionClosed:
+            pass
+
+
+class MockStreamServer(ABC):
+    """
+    Base WebSocket server: subclasses implement the protocol handshake and frame layout.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, rate=1000, burst_factor=1.0, burst_every=0.0,
+                 burst_duration=0.0, faults=None, seed=42):
+        from mock_exchange.faults import FaultInjector
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.burst_factor = burst_factor
+        self.burst_every = burst_every
+        self.burst_duration = burst_duration
+        self.faults = faults or FaultInjector()
+        self.walk = PriceWalk([], seed=seed)
+        self.sent = 0
+        self._server = None
+
+    async def _handler(self, ws, path=None):
+        session = _StreamSession(self, ws)
+        await self.on_connect(session)
+        await session.run()
+
+    async def start(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port, compression=None, max_queue=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"{type(self).__name__} listening on {self.host}:{self.port}")
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def on_connect(self, session):
+        pass
+
+    @abstractmethod
+    async def handle_control(self, session, message):
+        """
+        Answer one decoded control frame (auth, subscribe, ...) from the client.
+        """
+        pass
+
+    @abstractmethod
+    def error_frame(self, reason):
+        """
+        Protocol error frame sent in reply to a malformed client frame.
+        """
+        pass
+
+    @abstractmethod
+    def build_frames(self, symbols, count):
+        """
+        Build `count` market data messages for `symbols` as a list of text frames.
+        """
+        pass
+
+
+class MockAlpacaStream(MockStreamServer):
+    """
+    Speaks the Alpaca market data stream protocol: connected/auth handshake,
+    subscribe/unsubscribe acknowledgements and batched bar frames.
+
+    :param batch_size: Maximum number of bars per frame; Alpaca batches messages in JSON arrays.
+    :param api_key: If set, only this key authenticates.
+    """
+
+    def __init__(self, batch_size=100, api_key=None, **kwargs):
+        super().__init__(**kwargs)
+        self.batch_size = batch_size
+        self.api_key = api_key
+
+    async def on_connect(self, session):
+        session.authenticated = False
+        await session.ws.send(json.dumps([{"T": "success", "msg": "connected"}]))
+
+    async def handle_control(self, session, message):
+        action = message.get('action')
+        if action == 'auth':
+            if self.api_key is not None and message.get('key') != self.api_key:
+                await session.ws.send(json.dumps([{"T": "error", "code": 402, "msg": "auth failed"}]))
+                return
+            session.authenticated = True
+            await session.ws.send(json.dumps([{"T": "success", "msg": "authenticated"}]))
+            return
+        if not session.authenticated:
+            await session.ws.send(json.dumps([{"T": "error", "code": 401, "msg": "not authenticated"}]))
+            return
+        if action in ('subscribe', 'unsubscribe'):
+            symbols = message.get('bars', [])
+            if action == 'subscribe':
+                session.symbols.update(symbols)
+            else:
+                session.symbols.difference_update(symbols)
+            await session.ws.send(json.dumps([{"T": "subscription", "trades": [], "quotes": [],
+                                               "bars": sorted(session.symbols)}]))
+
+    def error_frame(self, reason):
+        return json.dumps([{"T": "error", "code": 400, "msg": "invalid syntax"}])
+
+    def build_frames(self, symbols, count):
+        frames = []
+        timestamp = iso_now(micros=False)
+        for start in range(0, count, self.batch_size):
+            batch = []
+            for i in range(start, min(count, start + self.batch_size)):
+                symbol = symbols[i % len(symbols)]
+                o, h, l, c, v = self.walk.ohlcv(symbol)
+                batch.append('{"T":"b","S":"%s","o":%.2f,"h":%.2f,"l":%.2f,"c":%.2f,"v":%d,"t":"%s"}'
+                             % (symbol, o, h, l, c, v, timestamp))
+            frames.append('[' + ','.join(batch) + ']')
+        return frames
+
+
+class MockCoinbaseFeed(MockStreamServer):
+    """
+    Speaks the Coinbase feed protocol for the ticker channel: subscribe/unsubscribe,
+    'subscriptions' acknowledgements and one ticker message per frame.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sequence = 0
+
+    async def handle_control(self, session, message):
+        kind = message.get('type')
+        if kind not in ('subscribe', 'unsubscribe'):
+            await session.ws.send(json.dumps({"type": "error", "message": "Failed to subscribe",
+                                              "reason": f"{kind} is not a valid message"}))
+            return
+        product_ids = [product_id for channel in message.get('channels', []) if channel.get('name') == 'ticker'
+                       for product_id in channel.get('product_ids', [])]
+        if kind == 'subscribe':
+            session.symbols.update(product_ids)
+        else:
+            session.symbols.difference_update(product_ids)
+        await session.ws.send(json.dumps({"type": "subscriptions", "channels": [
+            {"name": "ticker", "product_ids": sorted(session.symbols)}
+        ]}))
+
+    def error_frame(self, reason):
+        return json.dumps({"type": "error", "message": "Malformed JSON", "reason": reason})
+
+    def build_frames(self, symbols, count):
+        frames = []
+        timestamp = iso_now()
+        for i in range(count):
+            symbol = symbols[i % len(symbols)]
+            price = self.walk.step(symbol)
+            self.sequence += 1
+            frames.append('{"type":"ticker","sequence":%d,"product_id":"%s","price":"%.2f","best_bid":"%.2f",'
+                          '"best_ask":"%.2f","side":"buy","time":"%s","trade_id":%d,"last_size":"%.8f"}'
+                          % (self.sequence, symbol, price, price - 0.01, price, timestamp, self.sequence,
+                             self.walk.rng.random()))
+        return frames
@@ -0,0 +1,18 @@
+from models.bar import Bar, BarBatch, BAR_DTYPE, OHLCV, to_epoch_ns
+from models.tick import Tick
+from models.codec import RECORD_DTYPE, RECORD_SIZE, encode_record, encode_record_into, decode_record, decode_records
+
+__all__ = [
+    'Bar',
+    'BarBatch',
+    'BAR_DTYPE',
+    'OHLCV',
+    'RECORD_DTYPE',
+    'RECORD_SIZE',
+    'Tick',
+    'decode_record',
+    'decode_records',
+    'encode_record',
+    'encode_record_into',
+    'to_epoch_ns'
+]
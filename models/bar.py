@@ -0,0 +1,202 @@
+from datetime import datetime, timezone
+import numpy as np
+
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+# Record layout used when a batch is exported as a NumPy structured array
+BAR_DTYPE = np.dtype([
+    ('timestamp', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64),
+])
+
+
+def to_epoch_ns(value):
+    """
+    Convert a datetime (naive values are taken as UTC) to integer nanoseconds since the epoch.
+    """
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (delta.days * 86400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1000
+
+
+class Bar:
+    """
+    A single OHLCV bar. Timestamps are integer nanoseconds since the epoch (UTC).
+    """
+    __slots__ = ('symbol', 'timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, symbol, timestamp, open, high, low, close, volume):
+        self.symbol = symbol
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @property
+    def time(self):
+        return datetime.fromtimestamp(self.timestamp / 1e9, tz=timezone.utc)
+
+    def __eq__(self, other):
+        if not isinstance(other, Bar):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return (f"Bar(symbol={self.symbol!r}, timestamp={self.timestamp}, open={self.open}, high={self.high}, "
+                f"low={self.low}, close={self.close}, volume={self.volume})")
+
+
+class BarBatch:
+    """
+    A time range of bars for one symbol stored column-wise.
+
+    OHLCV values live in a single (5, n) float64 block so that to_pandas() can wrap
+    it without copying; timestamps are an int64 array of nanoseconds since the epoch.
+    """
+
+    def __init__(self, timestamp, values, symbol=None):
+        """
+        :param timestamp: int64 array of epoch nanoseconds.
+        :param values: float64 array of shape (5, n) ordered as open, high, low, close, volume.
+        :param symbol: Symbol the bars belong to.
+        """
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float64).reshape(len(OHLCV), len(self.timestamp))
+        self.symbol = symbol
+
+    @classmethod
+    def empty(cls, symbol=None):
+        return cls(np.empty(0, dtype=np.int64), np.empty((len(OHLCV), 0)), symbol=symbol)
+
+    @classmethod
+    def from_columns(cls, timestamp, open, high, low, close, volume, symbol=None):
+        """
+        Build a batch from one sequence per column.
+        """
+        return cls(timestamp, np.vstack([
+            np.asarray(column, dtype=np.float64) for column in (open, high, low, close, volume)
+        ]), symbol=symbol)
+
+    @classmethod
+    def from_bars(cls, bars, symbol=None):
+        """
+        Build a batch from an iterable of Bar records.
+        """
+        bars = list(bars)
+        if symbol is None and bars:
+            symbol = bars[0].symbol
+        timestamp = np.fromiter((bar.timestamp for bar in bars), dtype=np.int64, count=len(bars))
+        values = np.array([[getattr(bar, name) for bar in bars] for name in OHLCV], dtype=np.float64)
+        return cls(timestamp, values, symbol=symbol)
+
+    @classmethod
+    def from_struct_array(cls, array, symbol=None):
+        return cls(array['timestamp'], np.vstack([array[name] for name in OHLCV]), symbol=symbol)
+
+    @classmethod
+    def from_dataframe(cls, frame, symbol=None):
+        """
+        Build a batch from a DataFrame indexed by timestamp with OHLCV columns.
+        """
+        index = frame.index
+        if getattr(index, 'tz', None) is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        timestamp = np.asarray(index.values, dtype='datetime64[ns]').view(np.int64)
+        return cls(timestamp, frame[list(OHLCV)].to_numpy(dtype=np.float64).T, symbol=symbol)
+
+    @classmethod
+    def concat(cls, batches, symbol=None):
+        batches = [batch for batch in batches if batch is not None]
+        if not batches:
+            return cls.empty(symbol=symbol)
+        if symbol is None:
+            symbol = batches[0].symbol
+        return cls(
+            np.concatenate([batch.timestamp for batch in batches]),
+            np.concatenate([batch.values for batch in batches], axis=1),
+            symbol=symbol
+        )
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return BarBatch(self.timestamp[index], self.values[:, index], symbol=self.symbol)
+        return Bar(self.symbol, int(self.timestamp[index]), *(float(v) for v in self.values[:, index]))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return f"BarBatch(symbol={self.symbol!r}, length={len(self)})"
+
+    @property
+    def open(self):
+        return self.values[0]
+
+    @property
+    def high(self):
+        return self.values[1]
+
+    @property
+    def low(self):
+        return self.values[2]
+
+    @property
+    def close(self):
+        return self.values[3]
+
+    @property
+    def volume(self):
+        return self.values[4]
+
+    def normalized(self):
+        """
+        Return the batch sorted by timestamp with duplicate timestamps removed (last one wins).
+        """
+        if len(self) == 0:
+            return self
+        if np.all(self.timestamp[1:] > self.timestamp[:-1]):
+            return self
+        # Reverse so np.unique keeps the last occurrence of each timestamp
+        reversed_ts = self.timestamp[::-1]
+        _, first = np.unique(reversed_ts, return_index=True)
+        keep = len(self) - 1 - first
+        return BarBatch(self.timestamp[keep], self.values[:, keep], symbol=self.symbol)
+
+    def between(self, start=None, end=None):
+        """
+        Return the bars in [start, end) of a sorted batch as a view.
+        """
+        lo = 0 if start is None else np.searchsorted(self.timestamp, to_epoch_ns(start), side='left')
+        hi = len(self) if end is None else np.searchsorted(self.timestamp, to_epoch_ns(end), side='left')
+        return self[lo:hi]
+
+    def to_struct_array(self):
+        """
+        Copy the batch into a NumPy structured array with BAR_DTYPE records.
+        """
+        array = np.empty(len(self), dtype=BAR_DTYPE)
+        array['timestamp'] = self.timestamp
+        for i, name in enumerate(OHLCV):
+            array[name] = self.values[i]
+        return array
+
+    def to_pandas(self):
+        """
+        Wrap the batch in a DataFrame indexed by UTC timestamp without copying the OHLCV block.
+        """
+        import pandas as pd
+        index = pd.DatetimeIndex(self.timestamp.view('datetime64[ns]'), name='timestamp').tz_localize('UTC')
+        return pd.DataFrame(self.values.T, index=index, columns=list(OHLCV), copy=False)
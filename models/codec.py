@@ -0,0 +1,96 @@
+import struct
+import numpy as np
+from models.bar import Bar
+from models.tick import Tick
+
+# kind (1 byte), symbol (15 bytes, NUL padded), timestamp (int64 ns), five float64 values
+RECORD_STRUCT = struct.Struct('<B15sq5d')
+RECORD_SIZE = RECORD_STRUCT.size
+
+# The same layout as a NumPy dtype, to view record files and buffers without decoding them
+RECORD_DTYPE = np.dtype([('kind', 'u1'), ('symbol', 'S15'), ('timestamp', '<i8'), ('values', '<f8', (5,))])
+
+KIND_TICK = 1
+KIND_BAR = 2
+SYMBOL_SIZE = 15
+
+# symbol -> encoded bytes; the symbol universe is small, so this stays bounded
+_symbol_bytes = {}
+
+
+def encode_symbol(symbol):
+    """
+    UTF-8 bytes of `symbol` for the record's symbol field.
+
+    :raises ValueError: If the symbol is longer than 15 bytes. Truncating it could make
+        two symbols (e.g. long option or crypto pair names) collide.
+    """
+    encoded = _symbol_bytes.get(symbol)
+    if encoded is None:
+        encoded = symbol.encode()
+        if len(encoded) > SYMBOL_SIZE:
+            raise ValueError(f"Symbol {symbol!r} is longer than {SYMBOL_SIZE} bytes and cannot be encoded")
+        _symbol_bytes[symbol] = encoded
+    return encoded
+
+
+def encode_record(record):
+    """
+    Encode a Tick or Bar as a fixed-size 64-byte little-endian record.
+    """
+    symbol = encode_symbol(record.symbol)
+    if isinstance(record, Bar):
+        return RECORD_STRUCT.pack(KIND_BAR, symbol, record.timestamp, record.open, record.high,
+                                  record.low, record.close, record.volume)
+    return RECORD_STRUCT.pack(KIND_TICK, symbol, record.timestamp, record.price, record.size, 0.0, 0.0, 0.0)
+
+
+def encode_record_into(buffer, offset, record):
+    """
+    Encode a record straight into a writable buffer (e.g. shared memory) at `offset`.
+    """
+    symbol = encode_symbol(record.symbol)
+    if isinstance(record, Bar):
+        RECORD_STRUCT.pack_into(buffer, offset, KIND_BAR, symbol, record.timestamp, record.open, record.high,
+                                record.low, record.close, record.volume)
+    else:
+        RECORD_STRUCT.pack_into(buffer, offset, KIND_TICK, symbol, record.timestamp, record.price, record.size,
+                                0.0, 0.0, 0.0)
+
+
+def decode_record(buffer, offset=0):
+    """
+    Decode a record produced by encode_record.
+    """
+    kind, symbol, timestamp, a, b, c, d, e = RECORD_STRUCT.unpack_from(buffer, offset)
+    symbol = symbol.rstrip(b'\0').decode()
+    if kind == KIND_BAR:
+        return Bar(symbol, timestamp, a, b, c, d, e)
+    if kind == KIND_TICK:
+        return Tick(symbol, timestamp, a, b)
+    raise ValueError(f"Unknown record kind: {kind}")
+
+
+def decode_records(array):
+    """
+    Decode a RECORD_DTYPE array (e.g. a memory-mapped record file) into Tick/Bar records.
+
+    Columns are converted once per call rather than unpacked record by record.
+
+    :return: List of Tick and Bar.
+    """
+    symbols = {}
+    records = []
+    append = records.append
+    for kind, symbol, timestamp, values in zip(array['kind'].tolist(), array['symbol'].tolist(),
+                                               array['timestamp'].tolist(), array['values'].tolist()):
+        name = symbols.get(symbol)
+        if name is None:
+            name = symbols[symbol] = symbol.decode()
+        if kind == KIND_TICK:
+            append(Tick(name, timestamp, values[0], values[1]))
+        elif kind == KIND_BAR:
+            append(Bar(name, timestamp, *values))
+        else:
+            raise ValueError(f"Unknown record kind: {kind}")
+    return records
@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+
+
+class Tick:
+    """
+    A single trade or quote update. Timestamps are integer nanoseconds since the epoch (UTC).
+    """
+    __slots__ = ('symbol', 'timestamp', 'price', 'size')
+
+    def __init__(self, symbol, timestamp, price, size=0.0):
+        self.symbol = symbol
+        self.timestamp = timestamp
+        self.price = price
+        self.size = size
+
+    @property
+    def time(self):
+        return datetime.fromtimestamp(self.timestamp / 1e9, tz=timezone.utc)
+
+    def __eq__(self, other):
+        if not isinstance(other, Tick):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"Tick(symbol={self.symbol!r}, timestamp={self.timestamp}, price={self.price}, size={self.size})"
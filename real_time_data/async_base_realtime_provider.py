@@ -0,0 +1,121 @@
+import json
+import logging
+from abc import ABC, abstractmethod
+import websockets
+from real_time_data.subscription_manager import SubscriptionManager
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+class AsyncBaseRealTimeDataProvider(ABC):
+    """
+    asyncio variant of BaseRealTimeDataProvider.
+
+    Instead of blocking a thread in run_forever(), a provider runs as a coroutine on
+    the shared event loop and hands every normalized Tick or Bar to an async `emit`
+    callback supplied by the RealTimeEngine.
+    """
+    name = None
+
+    def __init__(self, symbols=(), subscription_batch_size=200, ws_max_queue=16):
+        """
+        :param symbols: Symbols to subscribe to on connect.
+        :param subscription_batch_size: Maximum symbols per subscribe/unsubscribe frame.
+        :param ws_max_queue: Frames the WebSocket client buffers before it stops reading from the
+            socket, so that a blocked subscriber pushes backpressure to the TCP connection.
+        """
+        self.ws = None
+        self.ws_max_queue = ws_max_queue
+        self.subscriptions = SubscriptionManager(symbols, max_batch=subscription_batch_size)
+
+    @abstractmethod
+    def _get_ws_url(self):
+        pass
+
+    @abstractmethod
+    async def on_open(self, ws):
+        """
+        Perform any handshake (e.g. authentication) once the socket is open.
+        """
+        pass
+
+    @abstractmethod
+    def build_subscription_frame(self, action, symbols):
+        """
+        Build the provider message for `action` ('subscribe' or 'unsubscribe') on a batch of symbols.
+        """
+        pass
+
+    async def subscribe(self, ws):
+        """
+        Send every pending subscription change as batched frames.
+        """
+        subscribe_batches, unsubscribe_batches = self.subscriptions.drain()
+        for action, batches in (('subscribe', subscribe_batches), ('unsubscribe', unsubscribe_batches)):
+            for batch in batches:
+                await ws.send(json.dumps(self.build_subscription_frame(action, batch)))
+                logger.info(f"Sent {self.name} {action} for {len(batch)} symbols")
+
+    async def add_symbols(self, symbols):
+        """
+        Add symbols to the live connection. Changes made while disconnected are sent on the next connect.
+        """
+        if self.subscriptions.add(symbols) and self.ws is not None:
+            await self.subscribe(self.ws)
+
+    async def remove_symbols(self, symbols):
+        """
+        Remove symbols from the live connection.
+        """
+        if self.subscriptions.remove(symbols) and self.ws is not None:
+            await self.subscribe(self.ws)
+
+    @abstractmethod
+    def parse_message(self, message):
+        """
+        Turn one raw frame into an iterable of normalized Tick/Bar records.
+        """
+        pass
+
+    async def connect(self):
+        """
+        Open the WebSocket connection and run the provider handshake.
+        """
+        try:
+            ws = await websockets.connect(self._get_ws_url(), compression=None, max_queue=self.ws_max_queue)
+            await self.on_open(ws)
+            # Only expose the socket to add_symbols/remove_symbols once the handshake is done
+            self.ws = ws
+            await self.subscribe(ws)
+        except Exception as e:
+            logger.error(f"Error connecting {self.name} WebSocket: {e}")
+            raise
+
+    async def run(self, emit):
+        """
+        Connect and forward every normalized record to `emit` until the connection closes.
+
+        :param emit: Coroutine function called with each Tick/Bar record.
+        """
+        await self.connect()
+        try:
+            async for message in self.ws:
+                try:
+                    records = self.parse_message(message)
+                except Exception as e:
+                    logger.log_rate_limited(logging.ERROR, 5, "Error processing %s message: %s", self.name, e)
+                    continue
+                for record in records:
+                    await emit(record)
+        finally:
+            await self.disconnect()
+
+    async def disconnect(self):
+        """
+        Close the WebSocket connection.
+        """
+        if self.ws is not None:
+            ws, self.ws = self.ws, None
+            self.subscriptions.reset()
+            await ws.close()
+            logger.info(f"{self.name} WebSocket closed")
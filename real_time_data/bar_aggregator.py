@@ -0,0 +1,189 @@
+import logging
+from models import Bar
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+NS_PER_SECOND = 1_000_000_000
+INFINITY = float('inf')
+TIMEFRAME_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Indices into the per-bucket state list
+# _FIRST/_LAST: timestamps of the records that set the open and the close
+_OPEN, _HIGH, _LOW, _CLOSE, _VOLUME, _PV, _COUNT, _FIRST, _LAST = range(9)
+
+
+def parse_timeframe(timeframe):
+    """
+    Convert a timeframe such as 60, '1m', '5m' or '1h' to seconds.
+    """
+    if isinstance(timeframe, (int, float)):
+        return int(timeframe)
+    unit = TIMEFRAME_UNITS.get(timeframe[-1:].lower())
+    if unit is None or not timeframe[:-1].isdigit():
+        raise ValueError(f"Unsupported timeframe: {timeframe}. Use seconds or a value like '30s', '5m', '1h', '1d'.")
+    return int(timeframe[:-1]) * unit
+
+
+class AggregatedBar(Bar):
+    """
+    A Bar built by the BarAggregator, with its length in seconds, VWAP and number of updates.
+    """
+    __slots__ = ('interval', 'vwap', 'count')
+
+    def __init__(self, symbol, timestamp, open, high, low, close, volume, interval, vwap, count):
+        super().__init__(symbol, timestamp, open, high, low, close, volume)
+        self.interval = interval
+        self.vwap = vwap
+        self.count = count
+
+    def __repr__(self):
+        return (f"AggregatedBar(symbol={self.symbol!r}, timestamp={self.timestamp}, interval={self.interval}, "
+                f"open={self.open}, high={self.high}, low={self.low}, close={self.close}, "
+                f"volume={self.volume}, vwap={self.vwap}, count={self.count})")
+
+
+class BarAggregator:
+    """
+    Build OHLCV + VWAP bars at several timeframes at once from a stream of Ticks (or finer Bars).
+
+    Every record updates one open bucket per timeframe in O(1). A bucket is closed and
+    emitted once the symbol's newest timestamp passes the end of the bucket by more than
+    `allowed_lateness` seconds, so out-of-order records that arrive within that window
+    still land in the right bar. Records arriving later than that are dropped and counted
+    in `late_records`. Quiet symbols can be closed on wall-clock time with flush(now).
+    """
+
+    def __init__(self, timeframes=('1m', '5m', '1h'), allowed_lateness=0):
+        """
+        :param timeframes: Bar lengths, as seconds or strings like '1m', '5m', '1h'.
+        :param allowed_lateness: Seconds a bucket stays open after its end for late records.
+        """
+        self.intervals = sorted({parse_timeframe(timeframe) for timeframe in timeframes})
+        self._interval_ns = [interval * NS_PER_SECOND for interval in self.intervals]
+        self.lateness_ns = int(allowed_lateness * NS_PER_SECOND)
+        # symbol -> [ {bucket_start: state} per interval ]
+        self._buckets = {}
+        self._watermark = {}
+        # symbol -> earliest time at which one of its buckets closes
+        self._next_close = {}
+        self.late_records = 0
+
+    def add(self, record):
+        """
+        Fold a Tick or Bar into the open buckets of its symbol.
+
+        :return: List of AggregatedBar closed by this record, oldest first.
+        """
+        symbol = record.symbol
+        timestamp = record.timestamp
+        if isinstance(record, Bar):
+            open_, high, low, close, volume = record.open, record.high, record.low, record.close, record.volume
+        else:
+            open_ = high = low = close = record.price
+            volume = record.size
+
+        buckets = self._buckets.get(symbol)
+        if buckets is None:
+            buckets = self._buckets[symbol] = [{} for _ in self.intervals]
+            self._next_close[symbol] = INFINITY
+        watermark = self._watermark.get(symbol)
+        if watermark is None or timestamp > watermark:
+            self._watermark[symbol] = watermark = timestamp
+
+        closed = self._close(symbol, buckets, watermark) if watermark >= self._next_close[symbol] else []
+
+        late = False
+        for interval_ns, open_buckets in zip(self._interval_ns, buckets):
+            start = timestamp - timestamp % interval_ns
+            state = open_buckets.get(start)
+            if state is None:
+                end = start + interval_ns + self.lateness_ns
+                if end <= watermark:
+                    late = True
+                    continue
+                open_buckets[start] = [open_, high, low, close, volume, close * volume, 1, timestamp, timestamp]
+                if end < self._next_close[symbol]:
+                    self._next_close[symbol] = end
+                continue
+            if high > state[_HIGH]:
+                state[_HIGH] = high
+            if low < state[_LOW]:
+                state[_LOW] = low
+            # Late records within allowed_lateness only move the open or close if they belong there
+            if timestamp < state[_FIRST]:
+                state[_OPEN] = open_
+                state[_FIRST] = timestamp
+            if timestamp >= state[_LAST]:
+                state[_CLOSE] = close
+                state[_LAST] = timestamp
+            state[_VOLUME] += volume
+            state[_PV] += close * volume
+            state[_COUNT] += 1
+        if late:
+            self.late_records += 1
+            logger.log_rate_limited(logging.WARNING, 5, "Dropped late record for %s at %s", symbol, timestamp)
+        return closed
+
+    def _close(self, symbol, buckets, watermark):
+        closed = []
+        next_close = INFINITY
+        for interval, interval_ns, open_buckets in zip(self.intervals, self._interval_ns, buckets):
+            for start in sorted(open_buckets):
+                end = start + interval_ns + self.lateness_ns
+                if end > watermark:
+                    next_close = min(next_close, end)
+                    break
+                closed.append(self._to_bar(symbol, start, interval, open_buckets.pop(start)))
+        self._next_close[symbol] = next_close
+        if len(closed) > 1:
+            closed.sort(key=lambda bar: (bar.timestamp + bar.interval * NS_PER_SECOND, bar.interval))
+        return closed
+
+    @staticmethod
+    def _to_bar(symbol, start, interval, state):
+        volume = state[_VOLUME]
+        vwap = state[_PV] / volume if volume else state[_CLOSE]
+        return AggregatedBar(symbol, start, state[_OPEN], state[_HIGH], state[_LOW], state[_CLOSE],
+                             volume, interval, vwap, state[_COUNT])
+
+    def current(self, symbol, timeframe):
+        """
+        :return: The still-open, partial AggregatedBar of `symbol` at `timeframe`, or None.
+        """
+        interval = parse_timeframe(timeframe)
+        buckets = self._buckets.get(symbol)
+        open_buckets = buckets[self.intervals.index(interval)] if buckets else None
+        if not open_buckets:
+            return None
+        start = max(open_buckets)
+        return self._to_bar(symbol, start, interval, open_buckets[start])
+
+    def flush(self, now_ns=None):
+        """
+        Close buckets using a wall-clock time instead of the next record, so that bars of
+        quiet symbols are still emitted. Without `now_ns` every open bucket is closed.
+
+        :return: List of AggregatedBar, oldest first per symbol.
+        """
+        closed = []
+        for symbol, buckets in self._buckets.items():
+            if now_ns is None:
+                watermark = INFINITY
+            else:
+                watermark = max(self._watermark.get(symbol, now_ns), now_ns)
+                self._watermark[symbol] = watermark
+            closed.extend(self._close(symbol, buckets, watermark))
+        return closed
+
+
+def build_aggregator(config):
+    """
+    Build a BarAggregator from an 'aggregate' config block: {"enabled": true, "timeframes": [...], "allowed_lateness": 2}.
+
+    :return: BarAggregator, or None when aggregation is not enabled.
+    """
+    config = dict(config or {})
+    if not config.pop('enabled', False):
+        return None
+    return BarAggregator(**config)
@@ -1,6 +1,70 @@
+import threading
+import time
 from abc import ABC, abstractmethod
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
 
 class BaseRealTimeDataProvider(ABC):
+    # Optional Publisher that receives every normalized Tick/Bar record
+    publisher = None
+    # Optional BarAggregator that builds bars from the published records
+    aggregator = None
+    # Seconds between wall-clock flushes of the aggregator, so that bars of quiet symbols
+    # still close; None disables them (e.g. when replaying recorded timestamps)
+    aggregator_flush_interval = 1.0
+    _aggregator_lock = None
+    _flusher = None
+
+    def publish(self, record):
+        """
+        Hand a normalized Tick or Bar record to the attached publisher and aggregator, if any.
+        """
+        if self.aggregator is None:
+            if self.publisher is not None:
+                self.publisher.publish(record)
+            return
+        if self._aggregator_lock is None:
+            self._start_aggregator_flush()
+        # The flush thread publishes too, and the sinks expect a single writer
+        with self._aggregator_lock:
+            if self.publisher is not None:
+                self.publisher.publish(record)
+            for bar in self.aggregator.add(record):
+                self.on_bar(bar)
+
+    def _start_aggregator_flush(self):
+        self._aggregator_lock = threading.Lock()
+        self._flush_stopped = threading.Event()
+        if self.aggregator_flush_interval is None:
+            return
+        self._flusher = threading.Thread(target=self._flush_aggregator, name=f"{type(self).__name__}-flush",
+                                         daemon=True)
+        self._flusher.start()
+
+    def _flush_aggregator(self):
+        while not self._flush_stopped.wait(self.aggregator_flush_interval):
+            try:
+                with self._aggregator_lock:
+                    for bar in self.aggregator.flush(time.time_ns()):
+                        self.on_bar(bar)
+            except Exception as e:
+                logger.error(f"Error flushing the bar aggregator of {type(self).__name__}: {e}")
+
+    def stop_aggregator_flush(self):
+        """
+        Stop the wall-clock flush thread, if it was started.
+        """
+        if self._flusher is not None:
+            self._flush_stopped.set()
+
+    def on_bar(self, bar):
+        """
+        Handle an AggregatedBar closed by the aggregator.
+        """
+        if self.publisher is not None:
+            self.publisher.publish(bar)
+
     @abstractmethod
     def on_message(self, ws, message):
         pass
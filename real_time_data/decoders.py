@@ -0,0 +1,96 @@
+import json
+import os
+from models import Bar, Tick
+from utils.date_utils import DateTimeUtils
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+
+def _select_loads():
+    """
+    Pick the fastest installed JSON parser; JSON_DECODER=json forces the stdlib.
+    """
+    preferred = os.getenv('JSON_DECODER', 'auto')
+    if preferred in ('auto', 'orjson'):
+        try:
+            import orjson
+            return 'orjson', orjson.loads
+        except ImportError:
+            pass
+    if preferred in ('auto', 'ujson'):
+        try:
+            import ujson
+            return 'ujson', ujson.loads
+        except ImportError:
+            pass
+    return 'json', json.loads
+
+
+DECODER_NAME, loads = _select_loads()
+logger.info("Using %s for real-time message decoding", DECODER_NAME)
+
+# Frames arriving within the same second share their 'YYYY-MM-DDTHH:MM:SS' prefix
+_second_cache = {}
+
+
+def _epoch_ns(value):
+    """
+    Memoized DateTimeUtils.iso_to_epoch_ns for the 'YYYY-MM-DDTHH:MM:SS[.fffffffff]Z' stamps of the feeds.
+    """
+    prefix = value[:19]
+    base = _second_cache.get(prefix)
+    if base is None:
+        if len(_second_cache) > 4096:
+            _second_cache.clear()
+        base = _second_cache[prefix] = DateTimeUtils.iso_to_epoch_ns(prefix)
+    tail = value[19:]
+    if tail == 'Z' or not tail:
+        return base
+    if tail[0] == '.' and tail[-1] == 'Z':
+        return base + int(tail[1:-1].ljust(9, '0')[:9])
+    return DateTimeUtils.iso_to_epoch_ns(value)
+
+
+def decode_alpaca(message, on_control=None):
+    """
+    Decode an Alpaca stream frame into Bar ('b') and Tick ('t') records.
+
+    Only the fields needed by the records are read; control messages (success,
+    subscription, error) are passed to `on_control` instead.
+
+    :param message: Raw frame as str or bytes.
+    :param on_control: Optional callable receiving each control message dict.
+    :return: List of Bar/Tick records.
+    """
+    records = []
+    data = loads(message)
+    if isinstance(data, dict):
+        data = [data]
+    for msg in data:
+        kind = msg.get('T')
+        if kind == 'b':
+            records.append(Bar(msg['S'], _epoch_ns(msg['t']),
+                               msg['o'], msg['h'], msg['l'], msg['c'], msg['v']))
+        elif kind == 't':
+            records.append(Tick(msg['S'], _epoch_ns(msg['t']), msg['p'], msg['s']))
+        elif on_control is not None:
+            on_control(msg)
+    return records
+
+
+def decode_coinbase(message, on_control=None):
+    """
+    Decode a Coinbase feed frame; ticker frames become a single Tick record.
+
+    :param message: Raw frame as str or bytes.
+    :param on_control: Optional callable receiving every non-ticker message dict.
+    :return: List with zero or one Tick.
+    """
+    data = loads(message)
+    if data.get('type') == 'ticker' and 'time' in data:
+        return [Tick(data['product_id'], _epoch_ns(data['time']),
+                     float(data['price']), float(data.get('last_size') or 0.0))]
+    if on_control is not None:
+        on_control(data)
+    return []
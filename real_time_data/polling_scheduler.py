@@ -0,0 +1,94 @@
+import heapq
+import threading
+import time
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+
+class PollingScheduler:
+    """
+    Call `poll(symbol)` for every symbol once per `interval` seconds, spreading the symbols
+    evenly over the interval so that requests are not issued in bursts.
+
+    If `max_requests_per_minute` cannot cover every symbol at `interval`, the interval is
+    stretched to fit the quota. Symbols can be added and removed while running.
+    """
+
+    def __init__(self, poll, interval, symbols=(), max_requests_per_minute=None):
+        """
+        :param poll: Callable taking a symbol; exceptions are logged and the symbol stays scheduled.
+        :param interval: Desired seconds between two polls of the same symbol.
+        :param symbols: Initial symbols.
+        :param max_requests_per_minute: Request quota shared by all symbols.
+        """
+        self.poll = poll
+        self.requested_interval = interval
+        self.max_requests_per_minute = max_requests_per_minute
+        self.symbols = list(dict.fromkeys(symbols))
+        self._queue = []
+        self._stopped = threading.Event()
+        self._changed = threading.Condition()
+
+    @property
+    def interval(self):
+        """
+        Effective seconds between two polls of the same symbol.
+        """
+        if not self.max_requests_per_minute or not self.symbols:
+            return self.requested_interval
+        return max(self.requested_interval, len(self.symbols) * 60.0 / self.max_requests_per_minute)
+
+    def _reschedule_all(self, now):
+        interval = self.interval
+        if interval > self.requested_interval:
+            logger.warning("Polling %d symbols every %.0fs instead of %.0fs to stay within %s requests/min",
+                           len(self.symbols), interval, self.requested_interval, self.max_requests_per_minute)
+        step = interval / max(1, len(self.symbols))
+        self._queue = [(now + i * step, symbol) for i, symbol in enumerate(self.symbols)]
+        heapq.heapify(self._queue)
+
+    def add_symbols(self, symbols):
+        with self._changed:
+            new = [symbol for symbol in symbols if symbol not in self.symbols]
+            if new:
+                self.symbols.extend(new)
+                self._reschedule_all(time.monotonic())
+                self._changed.notify_all()
+
+    def remove_symbols(self, symbols):
+        with self._changed:
+            self.symbols = [symbol for symbol in self.symbols if symbol not in set(symbols)]
+            self._reschedule_all(time.monotonic())
+            self._changed.notify_all()
+
+    def run(self):
+        """
+        Poll until stop() is called. A stop() made before run() starts is kept, so that
+        run() returns at once instead of polling.
+        """
+        with self._changed:
+            self._reschedule_all(time.monotonic())
+        while not self._stopped.is_set():
+            with self._changed:
+                if not self._queue:
+                    self._changed.wait(1.0)
+                    continue
+                due, symbol = self._queue[0]
+                wait = due - time.monotonic()
+                if wait > 0:
+                    # Woken early by stop() or a symbol change
+                    self._changed.wait(wait)
+                    continue
+                heapq.heappop(self._queue)
+                # Keep the cadence, but do not try to catch up on missed polls
+                heapq.heappush(self._queue, (max(due + self.interval, time.monotonic()), symbol))
+            try:
+                self.poll(symbol)
+            except Exception as e:
+                logger.error(f"Polling {symbol} failed: {e}")
+
+    def stop(self):
+        self._stopped.set()
+        with self._changed:
+            self._changed.notify_all()
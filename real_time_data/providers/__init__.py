@@ -1,11 +1,17 @@
-from real_time_data.providers.alpaca_realtime_provider import AlpacaRealTimeProvider
-from real_time_data.providers.alpha_vantage_realtime_provider import AlphaVantageRealTimeProvider
-from real_time_data.providers.interactive_brokers_realtime_provider import InteractiveBrokersRealTimeProvider
-from real_time_data.providers.coinbase_pro_realtime_provider import CoinbaseProRealTimeProvider
-
-__all__ = [
-    'AlpacaRealTimeProvider',
-    'AlphaVantageRealTimeProvider',
-    'InteractiveBrokersRealTimeProvider',
-    'CoinbaseProRealTimeProvider'
-]
+import importlib
+
+# Imported on first access so that importing one provider does not load every SDK
+_PROVIDERS = {
+    'AlpacaRealTimeProvider': 'real_time_data.providers.alpaca_realtime_provider',
+    'AlphaVantageRealTimeProvider': 'real_time_data.providers.alpha_vantage_realtime_provider',
+    'InteractiveBrokersRealTimeProvider': 'real_time_data.providers.interactive_brokers_realtime_provider',
+    'CoinbaseProRealTimeProvider': 'real_time_data.providers.coinbase_pro_realtime_provider'
+}
+
+__all__ = list(_PROVIDERS)
+
+
+def __getattr__(name):
+    if name not in _PROVIDERS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_PROVIDERS[name]), name)
@@ -1,8 +1,11 @@
 import os
 import json
+import logging
 import websocket
 from utils.logging_wrapper import LoggingWrapper
 from real_time_data.base_realtime_provider import BaseRealTimeDataProvider
+from real_time_data.subscription_manager import SubscriptionManager
+from real_time_data.decoders import decode_alpaca
 
 logger = LoggingWrapper(__name__)
 
@@ -13,8 +16,13 @@ class AlpacaRealTimeProvider(BaseRealTimeDataProvider):
         self.url = config['url']
         self.sandbox_url = config.get('sandbox_url', self.url)
         self.feed = config.get('feed', 'iex')
-        self.symbol = config['symbol']
+        self.symbol = config.get('symbol')
         self.use_sandbox = config.get('use_sandbox', False)
+        self.subscriptions = SubscriptionManager(
+            config.get('symbols') or [config['symbol']],
+            max_batch=config.get('subscription_batch_size', 200)
+        )
+        self.authenticated = False
         self.ws = None
         logger.info("AlpacaRealTimeProvider initialized")
 
@@ -44,18 +52,46 @@ class AlpacaRealTimeProvider(BaseRealTimeDataProvider):
             logger.error(f"Error connecting to WebSocket: {e}")
             raise
 
-    def subscribe(self, symbol):
+    def subscribe(self, symbols=None):
         """
-        Subscribe to the specified symbol.
+        Subscribe to the given symbols (if any) and send every pending subscription change.
+
+        :param symbols: Optional symbol or list of symbols to add.
+        """
+        if symbols:
+            self.add_symbols([symbols] if isinstance(symbols, str) else symbols)
+        else:
+            self._flush_subscriptions()
+
+    def add_symbols(self, symbols):
+        """
+        Add symbols to the live connection. Changes made while disconnected are sent after authentication.
+        """
+        if self.subscriptions.add(symbols):
+            self._flush_subscriptions()
+
+    def remove_symbols(self, symbols):
+        """
+        Remove symbols from the live connection.
         """
+        if self.subscriptions.remove(symbols):
+            self._flush_subscriptions()
+
+    def _flush_subscriptions(self):
+        """
+        Send pending subscription changes as batched frames.
+        """
+        if self.ws is None or not self.authenticated:
+            return
+        subscribe_batches, unsubscribe_batches = self.subscriptions.drain()
         try:
-            subscribe_message = {
-                "action": "subscribe",
-                "bars": [symbol]
-            }
-            self.ws.send(json.dumps(subscribe_message))
+            for action, batches in (("subscribe", subscribe_batches), ("unsubscribe", unsubscribe_batches)):
+                for batch in batches:
+                    self.ws.send(json.dumps({"action": action, "bars": batch}))
+                    logger.info(f"Sent {action} for {len(batch)} symbols")
         except Exception as e:
-            logger.error(f"Error subscribing to {symbol}: {e}")
+            logger.error(f"Error sending subscription changes: {e}")
+            self.subscriptions.reset()
             raise
 
     def on_message(self, ws, message):
@@ -63,26 +99,33 @@ class AlpacaRealTimeProvider(BaseRealTimeDataProvider):
         Handle incoming messages.
         """
         try:
-            logger.info(message)
-            message_data = json.loads(message)
-            if isinstance(message_data, list):
-                for msg in message_data:
-                    self.process_message(msg)
-            else:
-                self.process_message(message_data)
+            for record in decode_alpaca(message, self.process_message):
+                self.process_record(record)
         except Exception as e:
-            logger.error(f"Error processing message: {e}")
+            logger.log_rate_limited(logging.ERROR, 5, "Error processing message: %s", e)
 
     def process_message(self, message):
         """
-        Process a single message.
+        Process a single control message (success, subscription, error).
         """
         try:
-            logger.info(f"Processing message: {message}")
-            if message.get('T') == 'b':
-                logger.info(f"Bar data: {message}")
+            kind = message.get('T')
+            if kind == 'subscription':
+                self.subscriptions.confirm(message.get('bars', []))
+            elif kind == 'success' and message.get('msg') == 'authenticated':
+                self.authenticated = True
+                self._flush_subscriptions()
+            elif kind == 'error':
+                logger.error("Alpaca stream error: %s", message.get('msg'))
         except Exception as e:
-            logger.error(f"Error processing individual message: {e}")
+            logger.log_rate_limited(logging.ERROR, 5, "Error processing individual message: %s", e)
+
+    def process_record(self, record):
+        """
+        Process a decoded Bar or Tick record.
+        """
+        self.publish(record)
+        logger.log_every_n(logging.INFO, 1000, "Bar data (1 in 1000 logged): %s", record)
 
     def on_error(self, ws, error):
         """
@@ -95,6 +138,8 @@ class AlpacaRealTimeProvider(BaseRealTimeDataProvider):
         Handle WebSocket closing.
         """
         logger.info(f"WebSocket closed with status code {close_status_code} and message: {close_msg}")
+        self.authenticated = False
+        self.subscriptions.reset()
 
     def on_open(self, ws):
         """
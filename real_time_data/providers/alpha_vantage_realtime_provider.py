@@ -1,30 +1,66 @@
 import os
+import logging
 import requests
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from models import Bar, to_epoch_ns
 from utils.logging_wrapper import LoggingWrapper
+from utils.rate_limiter import scheduler
+from utils.http_transport import get_transport
 from real_time_data.base_realtime_provider import BaseRealTimeDataProvider
+from real_time_data.polling_scheduler import PollingScheduler
 
 logger = LoggingWrapper(__name__)
 
 class AlphaVantageRealTimeProvider(BaseRealTimeDataProvider):
+    """
+    Streams Alpha Vantage intraday bars by polling the REST API.
+
+    Every symbol is polled once per `poll_interval` seconds (by default the bar interval),
+    within the `requests_per_minute` quota. Each response is compared with the newest
+    bar already seen for that symbol and only newer bars reach process_record, the same
+    path the WebSocket providers use. The first poll of a symbol emits its latest bar only.
+    """
+    # Seconds per Alpha Vantage intraday interval
+    INTERVALS = {'1min': 60, '5min': 300, '15min': 900, '30min': 1800, '60min': 3600}
+
     def __init__(self, **config):
         self.api_key = os.getenv(config['api_key_env'])
         self.symbol = config['symbol']
         self.function = config['function']
         self.interval = config['interval']
         self.url = config['url']
+        self.requests_per_minute = config.get('requests_per_minute', 5)
+        # The free tier allows 5 requests per minute, shared with the historical provider
+        self.rate_limit = scheduler.bucket('alpha_vantage', self.requests_per_minute / 60)
+        self.http = get_transport()
+        # Newest bar timestamp seen per symbol, as the 'YYYY-MM-DD HH:MM:SS' key of the series
+        self.last_seen = {}
+        self.poller = PollingScheduler(
+            self.poll,
+            interval=config.get('poll_interval', self.INTERVALS.get(self.interval, 60)),
+            symbols=config.get('symbols') or [self.symbol],
+            max_requests_per_minute=self.requests_per_minute
+        )
         logger.info("AlphaVantageRealTimeProvider initialized with config: %s", config)
 
     def connect(self):
         """
-        Fetch real-time data using Alpha Vantage REST API.
+        Poll Alpha Vantage until disconnect() is called.
         """
         try:
-            response = self.get_real_time_data(self.symbol)
-            self.process_message(response)
+            logger.info(f"Polling {len(self.poller.symbols)} symbols every {self.poller.interval:.0f}s")
+            self.poller.run()
         except Exception as e:
             logger.error(f"Error fetching real-time data: {e}")
             raise
 
+    def poll(self, symbol):
+        """
+        Fetch the latest intraday bars of one symbol and emit the new ones.
+        """
+        self.process_message(self.get_real_time_data(symbol), symbol)
+
     def get_real_time_data(self, symbol):
         """
         Fetch real-time data from Alpha Vantage.
@@ -34,29 +70,73 @@ class AlphaVantageRealTimeProvider(BaseRealTimeDataProvider):
                 "function": self.function,
                 "symbol": symbol,
                 "interval": self.interval,
+                "outputsize": "compact",
                 "apikey": self.api_key
             }
-            response = requests.get(self.url, params=params)
+            response = scheduler.request('alpha_vantage', lambda: self.http.get(self.url, params=params))
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
             logger.error(f"Error fetching data from Alpha Vantage: {e}")
             raise
 
-    def process_message(self, message):
+    def process_message(self, message, symbol=None):
         """
-        Process the fetched real-time data.
+        Emit the bars of a response that are newer than the last bar seen for the symbol.
         """
         try:
-            logger.info(f"Received data: {message}")
-            # Implement your logic to handle the real-time data
+            symbol = symbol or self.symbol
+            series_key = next((key for key in message if key.startswith('Time Series')), None)
+            if series_key is None:
+                # Over-quota answers come back as 200 with a 'Note' or 'Information' message
+                notice = message.get('Note') or message.get('Information') or message.get('Error Message')
+                logger.warning("Alpha Vantage returned no data for %s: %s", symbol, notice)
+                if 'Note' in message or 'Information' in message:
+                    self.rate_limit.pause(60)
+                return
+            meta = message.get('Meta Data', {})
+            zone = ZoneInfo(next((value for key, value in meta.items() if key.endswith('Time Zone')), 'US/Eastern'))
+
+            series = message[series_key]
+            last = self.last_seen.get(symbol)
+            # Keys share one format and time zone, so string order is time order
+            new_keys = sorted(key for key in series if last is None or key > last)
+            if not new_keys:
+                return
+            if last is None:
+                new_keys = new_keys[-1:]
+            self.last_seen[symbol] = new_keys[-1]
+            for key in new_keys:
+                row = series[key]
+                timestamp = to_epoch_ns(datetime.fromisoformat(key).replace(tzinfo=zone))
+                self.process_record(Bar(symbol, timestamp, float(row['1. open']), float(row['2. high']),
+                                        float(row['3. low']), float(row['4. close']), float(row['5. volume'])))
         except Exception as e:
             logger.error(f"Error processing message: {e}")
 
-    # Placeholder methods for WebSocket-based abstract methods
-    def subscribe(self, symbol):
-        logger.info(f"Subscription is not applicable for Alpha Vantage REST API")
+    def process_record(self, record):
+        """
+        Process a new Bar record.
+        """
+        self.publish(record)
+        logger.log_every_n(logging.INFO, 100, "Bar data (1 in 100 logged): %s", record)
+
+    def subscribe(self, symbols=None):
+        """
+        Start polling the given symbol or symbols.
+        """
+        if symbols:
+            self.add_symbols([symbols] if isinstance(symbols, str) else symbols)
 
+    def add_symbols(self, symbols):
+        self.poller.add_symbols(symbols)
+
+    def remove_symbols(self, symbols):
+        self.poller.remove_symbols(symbols)
+        for symbol in symbols:
+            self.last_seen.pop(symbol, None)
+
+    # Placeholder methods for WebSocket-based abstract methods
     def on_message(self, ws, message):
         logger.info(f"Message handler is not applicable for Alpha Vantage REST API")
 
@@ -70,4 +150,5 @@ class AlphaVantageRealTimeProvider(BaseRealTimeDataProvider):
         logger.info(f"WebSocket open handler is not applicable for Alpha Vantage REST API")
 
     def disconnect(self):
+        self.poller.stop()
         logger.info("AlphaVantageRealTimeProvider disconnected")
@@ -0,0 +1,63 @@
+import os
+import json
+from real_time_data.decoders import decode_alpaca, loads
+from utils.logging_wrapper import LoggingWrapper
+from real_time_data.async_base_realtime_provider import AsyncBaseRealTimeDataProvider
+
+logger = LoggingWrapper(__name__)
+
+class AsyncAlpacaRealTimeProvider(AsyncBaseRealTimeDataProvider):
+    name = 'alpaca'
+
+    def __init__(self, **config):
+        super().__init__(config.get('symbols') or [config['symbol']], config.get('subscription_batch_size', 200),
+                         config.get('ws_max_queue', 16))
+        self.api_key = os.getenv(config['api_key_env'])
+        self.secret_key = os.getenv(config['secret_key_env'])
+        self.url = config['url']
+        self.sandbox_url = config.get('sandbox_url', self.url)
+        self.feed = config.get('feed', 'iex')
+        self.symbol = config.get('symbol')
+        self.use_sandbox = config.get('use_sandbox', False)
+        logger.info("AsyncAlpacaRealTimeProvider initialized")
+
+    def _get_ws_url(self):
+        """
+        Get the WebSocket URL based on whether sandbox mode is used.
+        """
+        if self.use_sandbox:
+            return self.sandbox_url.format(feed=self.feed)
+        return self.url.format(feed=self.feed)
+
+    async def on_open(self, ws):
+        """
+        Authenticate and wait for the server to accept the credentials.
+        """
+        await ws.send(json.dumps({
+            "action": "auth",
+            "key": self.api_key,
+            "secret": self.secret_key
+        }))
+        while True:
+            for msg in loads(await ws.recv()):
+                if msg.get('T') == 'error':
+                    raise ConnectionError(f"Alpaca authentication failed: {msg.get('msg')}")
+                if msg.get('T') == 'success' and msg.get('msg') == 'authenticated':
+                    logger.info("Alpaca WebSocket authenticated")
+                    return
+
+    def build_subscription_frame(self, action, symbols):
+        return {"action": action, "bars": symbols}
+
+    def parse_message(self, message):
+        """
+        Convert bar ('b') and trade ('t') frames into Bar and Tick records.
+        """
+        return decode_alpaca(message, self._on_control)
+
+    def _on_control(self, msg):
+        kind = msg.get('T')
+        if kind == 'subscription':
+            self.subscriptions.confirm(msg.get('bars', []))
+        elif kind == 'error':
+            logger.error("Alpaca stream error: %s", msg.get('msg'))
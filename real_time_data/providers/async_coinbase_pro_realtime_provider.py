@@ -0,0 +1,42 @@
+from real_time_data.decoders import decode_coinbase
+from utils.logging_wrapper import LoggingWrapper
+from real_time_data.async_base_realtime_provider import AsyncBaseRealTimeDataProvider
+
+logger = LoggingWrapper(__name__)
+
+class AsyncCoinbaseProRealTimeProvider(AsyncBaseRealTimeDataProvider):
+    name = 'coinbase_pro'
+
+    def __init__(self, **config):
+        super().__init__(config.get('symbols') or [config.get('symbol')], config.get('subscription_batch_size', 200),
+                         config.get('ws_max_queue', 16))
+        self.url = config.get('url')
+        self.symbol = config.get('symbol')
+        self.use_sandbox = config.get('use_sandbox', False)
+        logger.info("AsyncCoinbaseProRealTimeProvider initialized with config: %s", config)
+
+    def _get_ws_url(self):
+        return self.url
+
+    async def on_open(self, ws):
+        logger.info("Connection opened")
+
+    def build_subscription_frame(self, action, symbols):
+        return {"type": action, "channels": [{"name": "ticker", "product_ids": symbols}]}
+
+    def parse_message(self, message):
+        """
+        Convert ticker frames into Tick records.
+        """
+        return decode_coinbase(message, self._on_control)
+
+    def _on_control(self, data):
+        kind = data.get('type')
+        if kind == 'subscriptions':
+            self.subscriptions.confirm(
+                product_id
+                for channel in data.get('channels', []) if channel.get('name') == 'ticker'
+                for product_id in channel.get('product_ids', [])
+            )
+        elif kind == 'error':
+            logger.error("Coinbase feed error: %s %s", data.get('message'), data.get('reason', ''))
@@ -1,7 +1,10 @@
 import websocket
 import json
+import logging
 from utils.logging_wrapper import LoggingWrapper
 from real_time_data.base_realtime_provider import BaseRealTimeDataProvider
+from real_time_data.subscription_manager import SubscriptionManager
+from real_time_data.decoders import decode_coinbase
 
 logger = LoggingWrapper(__name__)
 
@@ -12,29 +15,80 @@ class CoinbaseProRealTimeProvider(BaseRealTimeDataProvider):
         self.api_key_env = config.get('api_key_env')
         self.secret_key_env = config.get('secret_key_env')
         self.use_sandbox = config.get('use_sandbox', False)
+        self.subscriptions = SubscriptionManager(
+            config.get('symbols') or [self.symbol],
+            max_batch=config.get('subscription_batch_size', 200)
+        )
+        self.connected = False
         self.ws = None
         logger.info("CoinbaseProRealTimeProvider initialized with config: %s", config)
 
     def on_message(self, ws, message):
-        data = json.loads(message)
-        logger.info(f"Received message: {data}")
+        try:
+            for record in decode_coinbase(message, self.process_message):
+                self.process_record(record)
+        except Exception as e:
+            logger.log_rate_limited(logging.ERROR, 5, "Error processing message: %s", e)
+
+    def process_message(self, data):
+        """
+        Process a non-ticker message (subscriptions, heartbeat, error).
+        """
+        kind = data.get('type')
+        if kind == 'subscriptions':
+            self.subscriptions.confirm(
+                product_id
+                for channel in data.get('channels', []) if channel.get('name') == 'ticker'
+                for product_id in channel.get('product_ids', [])
+            )
+        elif kind == 'error':
+            logger.error("Coinbase feed error: %s %s", data.get('message'), data.get('reason', ''))
+
+    def process_record(self, record):
+        """
+        Process a decoded Tick record.
+        """
+        self.publish(record)
+        logger.log_every_n(logging.INFO, 1000, "Received tick (1 in 1000 logged): %s", record)
 
     def on_error(self, ws, error):
         logger.error(f"Error: {error}")
 
-    def on_close(self, ws):
+    def on_close(self, ws, close_status_code=None, close_msg=None):
         logger.info("Connection closed")
+        self.connected = False
+        self.subscriptions.reset()
 
     def on_open(self, ws):
         logger.info("Connection opened")
+        self.connected = True
         self.subscribe(ws)
 
     def subscribe(self, ws):
-        subscribe_message = json.dumps({
-            "type": "subscribe",
-            "channels": [{"name": "ticker", "product_ids": [self.symbol]}]
-        })
-        ws.send(subscribe_message)
+        """
+        Send every pending subscription change as batched frames.
+        """
+        subscribe_batches, unsubscribe_batches = self.subscriptions.drain()
+        for action, batches in (("subscribe", subscribe_batches), ("unsubscribe", unsubscribe_batches)):
+            for batch in batches:
+                ws.send(json.dumps({
+                    "type": action,
+                    "channels": [{"name": "ticker", "product_ids": batch}]
+                }))
+
+    def add_symbols(self, symbols):
+        """
+        Add product ids to the live connection. Changes made while disconnected are sent on the next open.
+        """
+        if self.subscriptions.add(symbols) and self.connected:
+            self.subscribe(self.ws)
+
+    def remove_symbols(self, symbols):
+        """
+        Remove product ids from the live connection.
+        """
+        if self.subscriptions.remove(symbols) and self.connected:
+            self.subscribe(self.ws)
 
     def connect(self):
         self.ws = websocket.WebSocketApp(
@@ -45,3 +99,10 @@ class CoinbaseProRealTimeProvider(BaseRealTimeDataProvider):
             on_open=self.on_open
         )
         self.ws.run_forever()
+
+    def disconnect(self):
+        """
+        Disconnect the WebSocket.
+        """
+        if self.ws:
+            self.ws.close()
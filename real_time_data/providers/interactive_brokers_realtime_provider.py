@@ -1,6 +1,10 @@
-from ib_insync import IB, Contract, util
+from ib_insync import Contract, util
+import asyncio
 import os
+import logging
 from ..base_realtime_provider import BaseRealTimeDataProvider
+from models import Tick, to_epoch_ns
+from utils.ib_connection import get_ib_connection_manager
 from utils.logging_wrapper import LoggingWrapper
 
 logger = LoggingWrapper(__name__)
@@ -15,20 +19,26 @@ class InteractiveBrokersRealTimeProvider(BaseRealTimeDataProvider):
         self.port = config['port']
         self.client_id = config['client_id']
         self.symbol = config['symbol']
-        self.ib = IB()
-        if not self.ib.connect(self.host, self.port, clientId=self.client_id):
-            logger.error("Failed to connect to Interactive Brokers TWS API.")
-            raise ConnectionError("Could not connect to Interactive Brokers TWS API.")
+        # Shared with the historical provider, connected by connect() or the first request
+        self.connection = get_ib_connection_manager().connection(self.host, self.port, self.client_id)
+        self._loop = None
         logger.info("InteractiveBrokersRealTimeProvider initialized with config: %s", config)
 
+    @property
+    def ib(self):
+        return self.connection.ib
+
     def connect(self):
         """
-        Connect to the IB TWS or Gateway.
+        Connect to the IB TWS or Gateway, subscribe and deliver market data on the calling
+        thread's event loop until disconnect() is called, like the WebSocket providers.
         """
         try:
-            if not self.ib.isConnected():
-                self.ib.connect(self.host, self.port, clientId=self.client_id)
-            logger.info("Connected to IB")
+            self.connection.ensure_connected()
+            logger.info(f"Connected to IB with client ID {self.connection.client_id}")
+            self.on_open()
+            self._loop = asyncio.get_event_loop()
+            self.ib.run()
         except Exception as e:
             logger.error(f"Error connecting to IB: {e}")
             raise
@@ -40,7 +50,8 @@ class InteractiveBrokersRealTimeProvider(BaseRealTimeDataProvider):
         try:
             contract = Contract(symbol=self.symbol, secType='STK', exchange='SMART', currency='USD')
             self.ib.qualifyContracts(contract)
-            self.ib.reqMktData(contract, '', False, False)
+            ticker = self.ib.reqMktData(contract, '', False, False)
+            ticker.updateEvent += self.on_message
             logger.info(f"Subscribed to {symbol}")
         except Exception as e:
             logger.error(f"Error subscribing to {symbol}: {e}")
@@ -48,12 +59,15 @@ class InteractiveBrokersRealTimeProvider(BaseRealTimeDataProvider):
 
     def on_message(self, msg):
         """
-        Handle incoming messages.
+        Handle ticker updates.
         """
         try:
-            logger.info(msg)
+            # last is NaN until the first trade arrives
+            if msg.time is not None and msg.last == msg.last:
+                self.publish(Tick(msg.contract.symbol, to_epoch_ns(msg.time), msg.last, msg.lastSize or 0.0))
+            logger.log_every_n(logging.INFO, 1000, "Market data (1 in 1000 logged): %s", msg)
         except Exception as e:
-            logger.error(f"Error processing message: {e}")
+            logger.log_rate_limited(logging.ERROR, 5, "Error processing message: %s", e)
 
     def on_error(self, error):
         """
@@ -75,4 +89,15 @@ class InteractiveBrokersRealTimeProvider(BaseRealTimeDataProvider):
             self.subscribe(self.symbol)
         except Exception as e:
             logger.error(f"Error during connection on_open: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def disconnect(self):
+        """
+        Stop delivering market data and release the shared IB connection.
+        """
+        if self._loop is not None and self._loop.is_running():
+            # connect() may be running the loop in another thread
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+        self.connection.release()
+        logger.info("InteractiveBrokersRealTimeProvider disconnected")
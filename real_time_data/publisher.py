@@ -0,0 +1,57 @@
+import logging
+from real_time_data.sinks import BinaryFileSink, SegmentRecorder, SharedMemoryRingSink, UnixSocketSink
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+SINK_MAP = {
+    'shared_memory': SharedMemoryRingSink,
+    'unix_socket': UnixSocketSink,
+    'file': BinaryFileSink,
+    'recorder': SegmentRecorder
+}
+
+
+class Publisher:
+    """
+    Fan normalized Tick/Bar records out to every attached sink.
+
+    A failing sink is logged and skipped so that it cannot interrupt the feed or the other sinks.
+    """
+
+    def __init__(self, sinks=None):
+        self.sinks = list(sinks or [])
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def publish(self, record):
+        for sink in self.sinks:
+            try:
+                sink.write(record)
+            except Exception as e:
+                logger.log_rate_limited(logging.ERROR, 5, "Error publishing to %s: %s", type(sink).__name__, e)
+
+    def close(self):
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                logger.error(f"Error closing {type(sink).__name__}: {e}")
+
+
+def build_publisher(config):
+    """
+    Build a Publisher from a 'publish' config block: {"sinks": [{"type": "file", "path": ...}, ...]}.
+
+    :return: Publisher, or None when no sinks are configured.
+    """
+    sinks = []
+    for sink_config in (config or {}).get('sinks', []):
+        sink_config = dict(sink_config)
+        sink_type = sink_config.pop('type', None)
+        sink_class = SINK_MAP.get(sink_type)
+        if not sink_class:
+            raise ValueError(f"Unsupported sink type: {sink_type}")
+        sinks.append(sink_class(**sink_config))
+    return Publisher(sinks) if sinks else None
@@ -0,0 +1,183 @@
+import time
+import asyncio
+from real_time_data.supervisor import Backoff, GapTracker, backfill_bars
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+class Subscription:
+    """
+    Bounded per-subscriber queue of Tick/Bar records.
+
+    When the queue is full the overflow policy decides what happens:
+    'drop_oldest' discards the oldest queued record, 'drop_newest' discards the incoming
+    one and 'block' suspends the publishing provider until the subscriber catches up,
+    which pushes backpressure down to that provider's socket.
+    """
+    OVERFLOW_POLICIES = {'drop_oldest', 'drop_newest', 'block'}
+
+    def __init__(self, symbols=None, maxsize=10000, overflow='drop_oldest'):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unsupported overflow policy: {overflow}. Supported values are {self.OVERFLOW_POLICIES}.")
+        self.symbols = set(symbols) if symbols else None
+        self.overflow = overflow
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def accepts(self, record):
+        return self.symbols is None or record.symbol in self.symbols
+
+    async def put(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except asyncio.QueueFull:
+            if self.overflow == 'block':
+                await self.queue.put(record)
+                return
+            self.dropped += 1
+            if self.overflow == 'drop_oldest':
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+
+class RealTimeEngine:
+    """
+    Run many AsyncBaseRealTimeDataProvider instances on one event loop and fan their
+    records out to subscriber queues.
+
+    With reconnect enabled, a provider whose connection drops is restarted with jittered
+    exponential backoff; it re-authenticates and re-subscribes on connect, and missed
+    bars are filled from its historical provider before live records resume.
+
+    Every record is also handed to the optional Publisher, which writes it to
+    out-of-process sinks. A provider can have a BarAggregator; the bars it closes are
+    emitted like any other record, and open buckets are closed on wall-clock time once
+    per `flush_interval` seconds so quiet symbols still produce bars.
+    """
+
+    def __init__(self, providers=None, reconnect=True, max_backoff=60.0, publisher=None, flush_interval=1.0):
+        self.providers = []
+        self.publisher = publisher
+        self.flush_interval = flush_interval
+        self.subscriptions = []
+        self.reconnect = reconnect
+        self.max_backoff = max_backoff
+        self._backfill_sources = {}
+        self._aggregators = {}
+        self._tasks = []
+        for provider in providers or []:
+            self.add_provider(provider)
+
+    def add_provider(self, provider, historical_provider=None, bar_interval=60, aggregator=None):
+        """
+        :param provider: Async real-time provider to run.
+        :param historical_provider: Optional BaseHistoricalDataProvider used to fill gaps after a reconnect.
+        :param bar_interval: Expected spacing of bars in seconds, used for gap detection.
+        :param aggregator: Optional BarAggregator building bars from this provider's records.
+        """
+        self.providers.append(provider)
+        self._backfill_sources[id(provider)] = (historical_provider, bar_interval)
+        self._aggregators[id(provider)] = aggregator
+
+    def subscribe(self, symbols=None, maxsize=10000, overflow='drop_oldest'):
+        """
+        Register a subscriber.
+
+        :param symbols: Symbols to receive, or None for every symbol.
+        :param maxsize: Capacity of the subscriber queue.
+        :param overflow: Policy applied when the queue is full.
+        :return: Subscription to read records from.
+        """
+        subscription = Subscription(symbols=symbols, maxsize=maxsize, overflow=overflow)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.remove(subscription)
+
+    async def _emit(self, record):
+        if self.publisher is not None:
+            self.publisher.publish(record)
+        for subscription in self.subscriptions:
+            if subscription.accepts(record):
+                await subscription.put(record)
+
+    async def _flush_aggregator(self, aggregator):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            for bar in aggregator.flush(time.time_ns()):
+                await self._emit(bar)
+
+    async def _run_provider(self, provider):
+        historical_provider, bar_interval = self._backfill_sources[id(provider)]
+        aggregator = self._aggregators.get(id(provider))
+        gaps = GapTracker(bar_interval)
+        backoff = Backoff(maximum=self.max_backoff)
+        loop = asyncio.get_running_loop()
+
+        async def deliver(record):
+            await self._emit(record)
+            if aggregator is not None:
+                for bar in aggregator.add(record):
+                    await self._emit(bar)
+
+        async def emit(record):
+            if gaps.is_duplicate(record):
+                return
+            gap = gaps.observe(record)
+            backoff.reset()
+            if gap is not None:
+                try:
+                    bars = await loop.run_in_executor(None, backfill_bars, historical_provider, record.symbol, *gap)
+                    for bar in bars:
+                        await deliver(bar)
+                except Exception as e:
+                    logger.error(f"Backfill for {record.symbol} failed: {e}")
+            await deliver(record)
+
+        flusher = asyncio.ensure_future(self._flush_aggregator(aggregator)) if aggregator is not None else None
+        try:
+            while True:
+                try:
+                    await provider.run(emit)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Real-time provider {provider.name} stopped: {e}")
+                if not self.reconnect:
+                    return
+                delay = backoff.next_delay()
+                logger.warning(f"Reconnecting {provider.name} in {delay:.1f}s")
+                gaps.arm()
+                await asyncio.sleep(delay)
+        finally:
+            if flusher is not None:
+                flusher.cancel()
+
+    async def run(self):
+        """
+        Run every provider concurrently until all of them stop or the engine is stopped.
+        """
+        self._tasks = [asyncio.ensure_future(self._run_provider(provider)) for provider in self.providers]
+        logger.info(f"Real-time engine running {len(self._tasks)} providers")
+        try:
+            await asyncio.gather(*self._tasks)
+        except asyncio.CancelledError:
+            pass
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.publisher is not None:
+            self.publisher.close()
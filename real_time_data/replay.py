@@ -0,0 +1,72 @@
+import threading
+import time
+from models import decode_records
+from real_time_data.sinks.segment_recorder import RecordingReader
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+# Do not sleep for less than this many seconds; being slightly late is cheaper than a syscall per record
+MIN_SLEEP = 0.001
+
+
+class ReplayEngine:
+    """
+    Drive a consumer with the records captured by SegmentRecorder.
+
+    The consumer is a BaseRealTimeDataProvider (records go through its publish(), so its
+    publisher and aggregator see them as if they came from the live feed) or any callable
+    taking one record. Records are replayed in recording order, paced on their timestamps
+    at `speed` times real time, or as fast as possible when speed is None.
+    """
+
+    def __init__(self, recording, speed=None, batch_size=65536):
+        """
+        :param recording: Directory written by SegmentRecorder, or a RecordingReader.
+        :param speed: Replay speed, e.g. 1 for real time or 10 for ten times faster; None for maximum speed.
+        :param batch_size: Records decoded at a time.
+        """
+        if speed is not None and speed <= 0:
+            raise ValueError(f"Replay speed must be positive, got {speed}")
+        self.reader = recording if isinstance(recording, RecordingReader) else RecordingReader(recording)
+        self.speed = speed
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+
+    def run(self, consumer, start=None, end=None, symbols=None):
+        """
+        Replay the records of [start, end), optionally only those of `symbols`.
+
+        :return: Number of records delivered.
+        """
+        deliver = consumer.publish if hasattr(consumer, 'publish') else consumer
+        if hasattr(consumer, 'aggregator_flush_interval'):
+            # Recorded timestamps are not wall-clock time; bars close on the replayed records instead
+            consumer.aggregator_flush_interval = None
+        self._stop.clear()
+        delivered = 0
+        origin = None
+        try:
+            for array in self.reader.iter_arrays(start, end, symbols, self.batch_size):
+                for record in decode_records(array):
+                    if self._stop.is_set():
+                        return delivered
+                    if self.speed is not None:
+                        if origin is None:
+                            origin = (record.timestamp, time.perf_counter())
+                        delay = origin[1] + (record.timestamp - origin[0]) / 1e9 / self.speed - time.perf_counter()
+                        if delay > MIN_SLEEP:
+                            # Wakes up early on stop()
+                            if self._stop.wait(delay):
+                                return delivered
+                    deliver(record)
+                    delivered += 1
+            return delivered
+        except Exception as e:
+            logger.error(f"Replay of {self.reader.path} failed after {delivered} records: {e}")
+            raise
+        finally:
+            logger.info(f"Replayed {delivered} records from {self.reader.path}")
+
+    def stop(self):
+        self._stop.set()
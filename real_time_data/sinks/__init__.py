@@ -0,0 +1,17 @@
+from real_time_data.sinks.base_sink import BaseSink
+from real_time_data.sinks.binary_file_sink import BinaryFileSink, read_binary_file
+from real_time_data.sinks.segment_recorder import SegmentRecorder, RecordingReader
+from real_time_data.sinks.shared_memory_sink import SharedMemoryRingSink, SharedMemoryRingReader
+from real_time_data.sinks.unix_socket_sink import UnixSocketSink, UnixSocketSubscriber
+
+__all__ = [
+    'BaseSink',
+    'BinaryFileSink',
+    'RecordingReader',
+    'SegmentRecorder',
+    'SharedMemoryRingReader',
+    'SharedMemoryRingSink',
+    'UnixSocketSink',
+    'UnixSocketSubscriber',
+    'read_binary_file'
+]
@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+
+class BaseSink(ABC):
+    """
+    Destination for the normalized Tick/Bar records published by the real-time providers.
+    """
+
+    @abstractmethod
+    def write(self, record):
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,65 @@
+import os
+import struct
+import time
+from models import RECORD_SIZE, encode_record, decode_record
+from real_time_data.sinks.base_sink import BaseSink
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+# Header: magic, version, record size
+FILE_HEADER = struct.Struct('<4sHH8x')
+MAGIC = b'RTRF'
+VERSION = 1
+
+
+class BinaryFileSink(BaseSink):
+    """
+    Append records as fixed-size binary frames to a file.
+
+    Writes are buffered and flushed every `flush_interval` seconds and on close, so a
+    reader tailing the file sees records with at most that delay.
+    """
+
+    def __init__(self, path='data/realtime_feed.bin', flush_interval=1.0, buffer_size=1024 * 1024):
+        """
+        :param path: File to append to; created with a header if it does not exist.
+        :param flush_interval: Maximum seconds between flushes to the OS.
+        :param buffer_size: Size of the write buffer in bytes.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'ab', buffering=buffer_size)
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION, RECORD_SIZE))
+        self._last_flush = time.monotonic()
+        logger.info("Appending real-time records to %s", path)
+
+    def write(self, record):
+        self.file.write(encode_record(record))
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            self.file.flush()
+            self._last_flush = now
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def read_binary_file(path):
+    """
+    Iterate over the records stored by a BinaryFileSink, ignoring a trailing partial frame.
+    """
+    with open(path, 'rb') as f:
+        magic, version, record_size = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            raise ValueError(f"{path} is not a version {VERSION} real-time record file")
+        while True:
+            frame = f.read(RECORD_SIZE)
+            if len(frame) < RECORD_SIZE:
+                return
+            yield decode_record(frame)
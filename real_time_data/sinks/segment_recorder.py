@@ -0,0 +1,214 @@
+import glob
+import os
+import struct
+import time
+import numpy as np
+from models import RECORD_DTYPE, RECORD_SIZE, decode_records, encode_record, to_epoch_ns
+from real_time_data.sinks.base_sink import BaseSink
+from real_time_data.sinks.binary_file_sink import FILE_HEADER, MAGIC, VERSION
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+SEGMENT_SUFFIX = '.seg'
+INDEX_SUFFIX = '.idx'
+# Index header: magic, version, records per entry, record count, min and max timestamp
+INDEX_HEADER = struct.Struct('<4sHxxqqqq')
+INDEX_MAGIC = b'RTRI'
+INDEX_VERSION = 1
+
+
+class SegmentRecorder(BaseSink):
+    """
+    Record the feed into a directory of segment files, each memory-mappable as a
+    RECORD_DTYPE array.
+
+    A segment is a BinaryFileSink-format file (header, then 64-byte records in arrival
+    order) named after its first timestamp. It is closed after `segment_records`
+    records or `segment_seconds` of feed time. On close a sidecar index is written with
+    the running maximum timestamp every `index_every` records, so readers can seek to a
+    time without scanning the segment.
+    """
+
+    def __init__(self, path='data/recordings', segment_records=1_000_000, segment_seconds=3600,
+                 index_every=4096, flush_interval=1.0, buffer_size=1024 * 1024):
+        """
+        :param path: Directory holding the segments.
+        :param segment_records: Records per segment before rolling over.
+        :param segment_seconds: Feed seconds per segment before rolling over.
+        :param index_every: Records per index entry.
+        :param flush_interval: Maximum seconds between flushes to the OS.
+        :param buffer_size: Size of the write buffer in bytes.
+        """
+        self.path = path
+        self.segment_records = segment_records
+        self.segment_ns = int(segment_seconds * 1_000_000_000)
+        self.index_every = index_every
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        os.makedirs(path, exist_ok=True)
+        self.file = None
+        self._last_flush = time.monotonic()
+        logger.info("Recording real-time records to %s", path)
+
+    def _open_segment(self, timestamp):
+        # Zero-padded so that name order is time order; never overwrite an earlier capture
+        name = max(timestamp, 0)
+        while os.path.exists(os.path.join(self.path, f"{name:020d}{SEGMENT_SUFFIX}")):
+            name += 1
+        self.segment_path = os.path.join(self.path, f"{name:020d}{SEGMENT_SUFFIX}")
+        self.file = open(self.segment_path, 'wb', buffering=self.buffer_size)
+        self.file.write(FILE_HEADER.pack(MAGIC, VERSION, RECORD_SIZE))
+        self._first = timestamp
+        self._count = 0
+        self._min = self._max = timestamp
+        self._index = []
+
+    def _close_segment(self):
+        self.file.close()
+        self.file = None
+        write_index(self.segment_path, self.index_every, self._count, self._min, self._max, self._index)
+
+    def write(self, record):
+        timestamp = record.timestamp
+        if self.file is not None and (self._count >= self.segment_records
+                                      or timestamp - self._first >= self.segment_ns):
+            self._close_segment()
+        if self.file is None:
+            self._open_segment(timestamp)
+        self.file.write(encode_record(record))
+        if timestamp > self._max:
+            self._max = timestamp
+        elif timestamp < self._min:
+            self._min = timestamp
+        if self._count % self.index_every == 0:
+            self._index.append(self._max)
+        self._count += 1
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            self.file.flush()
+            self._last_flush = now
+
+    def close(self):
+        if self.file is not None:
+            self._close_segment()
+
+
+def write_index(segment_path, every, count, min_timestamp, max_timestamp, entries):
+    with open(segment_path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX, 'wb') as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, every, count, min_timestamp, max_timestamp))
+        f.write(np.asarray(entries, dtype='<i8').tobytes())
+
+
+class Segment:
+    """
+    One recorded segment, memory-mapped as a RECORD_DTYPE array.
+
+    The index is read from the sidecar file, or rebuilt from the records if the
+    segment was not closed cleanly (its trailing partial record is ignored).
+    """
+
+    def __init__(self, path, index_every=4096):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, record_size = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            raise ValueError(f"{path} is not a version {VERSION} real-time record file")
+        count = (os.path.getsize(path) - FILE_HEADER.size) // RECORD_SIZE
+        self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=FILE_HEADER.size, shape=(count,)) \
+            if count else np.empty(0, dtype=RECORD_DTYPE)
+        self._load_index(index_every)
+
+    def _load_index(self, default_every):
+        index_path = self.path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+        if os.path.exists(index_path):
+            with open(index_path, 'rb') as f:
+                header = f.read(INDEX_HEADER.size)
+                if len(header) == INDEX_HEADER.size:
+                    magic, version, every, count, lo, hi = INDEX_HEADER.unpack(header)
+                    if magic == INDEX_MAGIC and version == INDEX_VERSION and count == len(self.records):
+                        self.every, self.min_timestamp, self.max_timestamp = every, lo, hi
+                        self.running_max = np.frombuffer(f.read(), dtype='<i8')
+                        return
+        logger.warning("Rebuilding the time index of %s", self.path)
+        timestamp = self.records['timestamp']
+        self.every = default_every
+        self.running_max = np.maximum.accumulate(timestamp)[::default_every].copy() if len(timestamp) else \
+            np.empty(0, dtype='<i8')
+        self.min_timestamp = int(timestamp.min()) if len(timestamp) else 0
+        self.max_timestamp = int(timestamp.max()) if len(timestamp) else 0
+
+    def __len__(self):
+        return len(self.records)
+
+    def first_at_or_after(self, timestamp):
+        """
+        Position of the first record with a timestamp >= `timestamp`, or len(self).
+
+        The index narrows the search to one block of `every` records.
+        """
+        entry = int(np.searchsorted(self.running_max, timestamp, side='left'))
+        if entry >= len(self.running_max) and (not len(self.records) or self.max_timestamp < timestamp):
+            return len(self.records)
+        begin = (entry - 1) * self.every if entry > 0 else 0
+        while begin < len(self.records):
+            block = self.records['timestamp'][begin:begin + self.every]
+            hits = np.flatnonzero(block >= timestamp)
+            if len(hits):
+                return begin + int(hits[0])
+            begin += self.every
+        return len(self.records)
+
+
+class RecordingReader:
+    """
+    Read the segments written by SegmentRecorder in recording order.
+
+    A range selects the records from the first one at or after `start` up to, not
+    including, the first one at or after `end`, i.e. a contiguous slice of the capture.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def segments(self):
+        for segment_path in sorted(glob.glob(os.path.join(self.path, f"*{SEGMENT_SUFFIX}"))):
+            yield Segment(segment_path)
+
+    def iter_arrays(self, start=None, end=None, symbols=None, batch_size=65536):
+        """
+        Yield RECORD_DTYPE arrays of at most `batch_size` records. Without a symbol filter
+        they are views of the memory-mapped files.
+
+        :param start: Epoch nanoseconds (or datetime) of the first record.
+        :param end: Epoch nanoseconds (or datetime) to stop at.
+        :param symbols: Optional symbols to keep.
+        """
+        start = None if start is None else to_epoch_ns(start)
+        end = None if end is None else to_epoch_ns(end)
+        wanted = np.array([symbol.encode() for symbol in symbols], dtype='S15') if symbols else None
+        started = start is None
+        for segment in self.segments():
+            if not started and segment.max_timestamp < start:
+                continue
+            lo = 0 if started else segment.first_at_or_after(start)
+            started = True
+            hi = len(segment) if end is None or segment.max_timestamp < end else segment.first_at_or_after(end)
+            for offset in range(lo, hi, batch_size):
+                array = segment.records[offset:min(offset + batch_size, hi)]
+                if wanted is not None:
+                    array = array[np.isin(array['symbol'], wanted)]
+                if len(array):
+                    yield array
+            if hi < len(segment):
+                return
+
+    def __iter__(self):
+        return self.records()
+
+    def records(self, start=None, end=None, symbols=None):
+        """
+        Yield the recorded Tick/Bar records.
+        """
+        for array in self.iter_arrays(start, end, symbols):
+            yield from decode_records(array)
@@ -0,0 +1,140 @@
+import struct
+from multiprocessing import shared_memory
+from models import RECORD_SIZE, encode_record_into, decode_record
+from real_time_data.sinks.base_sink import BaseSink
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+# Header: magic, version, capacity (slots), write sequence
+HEADER = struct.Struct('<4sIQQ')
+HEADER_SIZE = 64
+MAGIC = b'RTRB'
+VERSION = 1
+WRITE_SEQ_OFFSET = 16
+SEQ = struct.Struct('<q')
+SLOT_SIZE = SEQ.size + RECORD_SIZE
+
+# Segments created by sinks in this process
+_owned_segments = set()
+
+
+def _detach_from_tracker(shm):
+    """
+    Stop the resource tracker of an attaching process from unlinking a segment it does not own.
+    """
+    if shm.name in _owned_segments:
+        return
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+class SharedMemoryRingSink(BaseSink):
+    """
+    Single-producer ring buffer of fixed-size records in a named shared memory segment.
+
+    The writer never waits for readers. Every slot carries the sequence number of the
+    record it holds; the writer marks the slot as in progress, writes the record, stamps
+    the sequence and then advances the header write sequence. Readers use the stamps to
+    detect slots overwritten while they were reading them.
+    """
+
+    def __init__(self, name='realtime_feed', capacity=65536):
+        """
+        :param name: Name of the shared memory segment readers attach to.
+        :param capacity: Number of record slots; readers falling further behind lose records.
+        """
+        self.name = name
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity * SLOT_SIZE
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a writer that did not shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _owned_segments.add(name)
+        self.buf = self.shm.buf
+        HEADER.pack_into(self.buf, 0, MAGIC, VERSION, capacity, 0)
+        self._seq = 0
+        logger.info("Shared memory ring '%s' created with %d slots", name, capacity)
+
+    def write(self, record):
+        seq = self._seq
+        offset = HEADER_SIZE + (seq % self.capacity) * SLOT_SIZE
+        SEQ.pack_into(self.buf, offset, -1)
+        encode_record_into(self.buf, offset + SEQ.size, record)
+        SEQ.pack_into(self.buf, offset, seq)
+        self._seq = seq + 1
+        SEQ.pack_into(self.buf, WRITE_SEQ_OFFSET, seq + 1)
+
+    def close(self):
+        if self.shm is None:
+            return
+        self.buf.release()
+        self.shm.close()
+        self.shm.unlink()
+        _owned_segments.discard(self.name)
+        self.shm = None
+
+
+class SharedMemoryRingReader:
+    """
+    Reader side of a SharedMemoryRingSink, for consumer processes on the same host.
+
+    Usage:
+        reader = SharedMemoryRingReader('realtime_feed')
+        while True:
+            for record in reader.poll():
+                ...
+    """
+
+    def __init__(self, name='realtime_feed', from_start=False):
+        """
+        :param name: Name of the shared memory segment.
+        :param from_start: Start with the oldest record still in the ring instead of the next new one.
+        """
+        self.shm = shared_memory.SharedMemory(name=name)
+        _detach_from_tracker(self.shm)
+        self.buf = self.shm.buf
+        magic, version, self.capacity, head = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Shared memory segment '{name}' is not a version {VERSION} ring buffer")
+        self.cursor = max(0, head - self.capacity) if from_start else head
+        self.lost = 0
+
+    def poll(self, max_records=None):
+        """
+        :return: List of records written since the previous poll, oldest first.
+        """
+        head = SEQ.unpack_from(self.buf, WRITE_SEQ_OFFSET)[0]
+        if head - self.cursor > self.capacity:
+            self.lost += head - self.capacity - self.cursor
+            self.cursor = head - self.capacity
+        if max_records is not None:
+            head = min(head, self.cursor + max_records)
+        records = []
+        while self.cursor < head:
+            offset = HEADER_SIZE + (self.cursor % self.capacity) * SLOT_SIZE
+            before = SEQ.unpack_from(self.buf, offset)[0]
+            try:
+                record = decode_record(self.buf, offset + SEQ.size)
+            except (ValueError, UnicodeDecodeError):
+                # Torn read of a slot that is being overwritten
+                record = None
+            after = SEQ.unpack_from(self.buf, offset)[0]
+            if before == after == self.cursor:
+                records.append(record)
+            else:
+                self.lost += 1
+            self.cursor += 1
+        return records
+
+    def close(self):
+        self.buf.release()
+        self.shm.close()
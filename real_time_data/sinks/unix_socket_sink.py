@@ -0,0 +1,137 @@
+import os
+import socket
+import threading
+from models import RECORD_SIZE, encode_record, decode_record
+from real_time_data.sinks.base_sink import BaseSink
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+
+class UnixSocketSink(BaseSink):
+    """
+    Publish records to every process connected to a local Unix domain socket.
+
+    Each record is sent as one fixed-size frame on a non-blocking socket. Frames a
+    subscriber cannot take immediately are kept in a per-subscriber buffer; a subscriber
+    whose backlog exceeds `max_pending` bytes is disconnected so that a slow consumer
+    never stalls the feed. Backlogs are also retried every `flush_interval` seconds, so
+    the last records reach the subscribers when the feed goes quiet.
+    """
+
+    def __init__(self, path='/tmp/realtime_feed.sock', max_pending=4 * 1024 * 1024, flush_interval=0.1):
+        """
+        :param path: Filesystem path of the socket.
+        :param max_pending: Maximum unsent bytes buffered per subscriber.
+        :param flush_interval: Seconds between retries of the unsent backlogs.
+        """
+        self.path = path
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        if os.path.exists(path):
+            os.unlink(path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen()
+        self._accept_thread = threading.Thread(target=self._accept_loop, name='unix-socket-sink', daemon=True)
+        self._accept_thread.start()
+        self._flush_thread = threading.Thread(target=self._flush_loop, name='unix-socket-sink-flush', daemon=True)
+        self._flush_thread.start()
+        logger.info("Publishing real-time records on %s", path)
+
+    def _accept_loop(self):
+        while True:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return
+            client.setblocking(False)
+            with self._lock:
+                self._clients[client] = bytearray()
+            logger.info("Subscriber connected to %s", self.path)
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """
+        Send as much of every subscriber's backlog as its socket takes now.
+        """
+        with self._lock:
+            if any(self._clients.values()):
+                self._send(b'')
+
+    def write(self, record):
+        frame = encode_record(record)
+        with self._lock:
+            if self._clients:
+                self._send(frame)
+
+    def _send(self, frame):
+        # Called with the lock held
+        dropped = []
+        for client, pending in self._clients.items():
+            pending += frame
+            if not pending:
+                continue
+            try:
+                sent = client.send(pending)
+                del pending[:sent]
+            except BlockingIOError:
+                pass
+            except OSError:
+                dropped.append(client)
+                continue
+            if len(pending) > self.max_pending:
+                logger.warning("Disconnecting slow subscriber on %s (%d bytes pending)", self.path, len(pending))
+                dropped.append(client)
+        for client in dropped:
+            del self._clients[client]
+            client.close()
+
+    def close(self):
+        self._closed.set()
+        self.flush()
+        self.server.close()
+        with self._lock:
+            for client in self._clients:
+                client.close()
+            self._clients.clear()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class UnixSocketSubscriber:
+    """
+    Client side of a UnixSocketSink.
+
+    Usage:
+        for record in UnixSocketSubscriber('/tmp/realtime_feed.sock', symbols=['AAPL']):
+            ...
+    """
+
+    def __init__(self, path='/tmp/realtime_feed.sock', symbols=None):
+        self.symbols = set(symbols) if symbols else None
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self._buffer = bytearray()
+
+    def __iter__(self):
+        while True:
+            chunk = self.sock.recv(RECORD_SIZE * 1024)
+            if not chunk:
+                return
+            self._buffer += chunk
+            complete = len(self._buffer) - len(self._buffer) % RECORD_SIZE
+            for offset in range(0, complete, RECORD_SIZE):
+                record = decode_record(self._buffer, offset)
+                if self.symbols is None or record.symbol in self.symbols:
+                    yield record
+            del self._buffer[:complete]
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,128 @@
+import threading
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+class SubscriptionState:
+    PENDING_SUBSCRIBE = 'pending_subscribe'
+    SUBSCRIBED = 'subscribed'
+    PENDING_UNSUBSCRIBE = 'pending_unsubscribe'
+
+
+class SubscriptionManager:
+    """
+    Track per-symbol subscription state of one connection and batch the changes into frames.
+
+    Symbols added or removed while the socket is down stay pending and are flushed on
+    the next connect; acknowledgements from the server move them to their final state.
+    """
+
+    def __init__(self, symbols=(), max_batch=200):
+        """
+        :param symbols: Symbols to subscribe to initially.
+        :param max_batch: Maximum number of symbols sent in one subscribe/unsubscribe frame.
+        """
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._states = {}
+        # Symbols already put on the wire and awaiting acknowledgement
+        self._in_flight = set()
+        self.add(symbols)
+
+    def add(self, symbols):
+        """
+        Mark symbols for subscription.
+
+        :return: List of symbols whose state changed.
+        """
+        changed = []
+        with self._lock:
+            for symbol in symbols:
+                state = self._states.get(symbol)
+                if state in (SubscriptionState.SUBSCRIBED, SubscriptionState.PENDING_SUBSCRIBE):
+                    continue
+                self._states[symbol] = SubscriptionState.PENDING_SUBSCRIBE
+                self._in_flight.discard(symbol)
+                changed.append(symbol)
+        return changed
+
+    def remove(self, symbols):
+        """
+        Mark symbols for unsubscription.
+
+        :return: List of symbols whose state changed.
+        """
+        changed = []
+        with self._lock:
+            for symbol in symbols:
+                state = self._states.get(symbol)
+                if state is None or state == SubscriptionState.PENDING_UNSUBSCRIBE:
+                    continue
+                if state == SubscriptionState.PENDING_SUBSCRIBE and symbol not in self._in_flight:
+                    # Never sent, nothing to undo on the server
+                    del self._states[symbol]
+                else:
+                    self._states[symbol] = SubscriptionState.PENDING_UNSUBSCRIBE
+                    self._in_flight.discard(symbol)
+                changed.append(symbol)
+        return changed
+
+    def _batches(self, symbols):
+        return [symbols[i:i + self.max_batch] for i in range(0, len(symbols), self.max_batch)]
+
+    def drain(self):
+        """
+        Collect the pending changes that have not been sent yet.
+
+        :return: Tuple (subscribe_batches, unsubscribe_batches) of symbol lists, each at most max_batch long.
+        """
+        with self._lock:
+            subscribe = sorted(s for s, state in self._states.items()
+                               if state == SubscriptionState.PENDING_SUBSCRIBE and s not in self._in_flight)
+            unsubscribe = sorted(s for s, state in self._states.items()
+                                 if state == SubscriptionState.PENDING_UNSUBSCRIBE and s not in self._in_flight)
+            self._in_flight.update(subscribe)
+            self._in_flight.update(unsubscribe)
+        return self._batches(subscribe), self._batches(unsubscribe)
+
+    def confirm(self, subscribed_symbols):
+        """
+        Apply a server acknowledgement listing every symbol currently subscribed.
+        """
+        subscribed_symbols = set(subscribed_symbols)
+        with self._lock:
+            for symbol, state in list(self._states.items()):
+                if symbol in subscribed_symbols:
+                    if state == SubscriptionState.PENDING_SUBSCRIBE:
+                        self._states[symbol] = SubscriptionState.SUBSCRIBED
+                        self._in_flight.discard(symbol)
+                elif state == SubscriptionState.PENDING_UNSUBSCRIBE and symbol in self._in_flight:
+                    del self._states[symbol]
+                    self._in_flight.discard(symbol)
+                elif state == SubscriptionState.SUBSCRIBED:
+                    logger.warning(f"Server no longer reports a subscription for {symbol}")
+                    self._states[symbol] = SubscriptionState.PENDING_SUBSCRIBE
+
+    def reset(self):
+        """
+        Forget what the server knows after a disconnect so that every wanted symbol is re-sent.
+        """
+        with self._lock:
+            for symbol, state in list(self._states.items()):
+                if state == SubscriptionState.PENDING_UNSUBSCRIBE:
+                    del self._states[symbol]
+                else:
+                    self._states[symbol] = SubscriptionState.PENDING_SUBSCRIBE
+            self._in_flight.clear()
+
+    def state(self, symbol):
+        with self._lock:
+            return self._states.get(symbol)
+
+    @property
+    def symbols(self):
+        """
+        Symbols that are subscribed or about to be.
+        """
+        with self._lock:
+            return sorted(s for s, state in self._states.items() if state != SubscriptionState.PENDING_UNSUBSCRIBE)
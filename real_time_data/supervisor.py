@@ -0,0 +1,159 @@
+import random
+import threading
+from datetime import datetime, timezone
+from utils.rate_limiter import PRIORITY_LIVE, request_priority
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+NS_PER_SECOND = 1_000_000_000
+
+
+class Backoff:
+    """
+    Exponential backoff with full jitter: the n-th delay is uniform in [0, min(maximum, initial * factor ** n)].
+    """
+
+    def __init__(self, initial=1.0, maximum=60.0, factor=2.0, rng=None):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.attempts = 0
+        self.rng = rng or random.Random()
+
+    def next_delay(self):
+        ceiling = min(self.maximum, self.initial * (self.factor ** self.attempts))
+        self.attempts += 1
+        return self.rng.uniform(0, ceiling)
+
+    def reset(self):
+        self.attempts = 0
+
+
+class GapTracker:
+    """
+    Track the last timestamp seen per symbol and report missing ranges.
+
+    Only the first record of each symbol after a reconnect is checked. While connected,
+    a missing bar means no trades in that interval (an illiquid symbol, a session
+    break) rather than lost data, and backfilling it would spend the shared rate limit
+    on empty fetches.
+    """
+
+    def __init__(self, bar_interval=60):
+        self.interval_ns = int(bar_interval * NS_PER_SECOND)
+        self.last_seen = {}
+        self._armed = set()
+
+    def arm(self):
+        """
+        Check the next record of every known symbol, typically after a reconnect.
+        """
+        self._armed = set(self.last_seen)
+
+    def observe(self, record):
+        """
+        :return: (start_ns, end_ns) of the missing range before `record`, or None.
+        """
+        last = self.last_seen.get(record.symbol)
+        armed = record.symbol in self._armed
+        self._armed.discard(record.symbol)
+        if last is not None and record.timestamp <= last:
+            return None
+        self.last_seen[record.symbol] = record.timestamp
+        if last is None or not armed:
+            return None
+        if record.timestamp - last > self.interval_ns:
+            return last, record.timestamp
+        return None
+
+    def is_duplicate(self, record):
+        last = self.last_seen.get(record.symbol)
+        return last is not None and record.timestamp <= last
+
+
+def backfill_bars(historical_provider, symbol, start_ns, end_ns):
+    """
+    Fetch the bars strictly between start_ns and end_ns from a historical provider.
+
+    :return: List of Bar records for `symbol`, oldest first.
+    """
+    if historical_provider is None:
+        logger.warning(f"Missed data for {symbol}, no historical provider configured for backfill")
+        return []
+    start = datetime.fromtimestamp(start_ns / NS_PER_SECOND, tz=timezone.utc)
+    end = datetime.fromtimestamp(end_ns / NS_PER_SECOND, tz=timezone.utc)
+    logger.info(f"Backfilling {symbol} from {start} to {end}")
+    # Gap repair for a live feed goes ahead of any bulk backfill sharing the rate limit
+    with request_priority(PRIORITY_LIVE):
+        batch = historical_provider.get_historical_data(start=start, end=end, symbol=symbol)
+    bars = []
+    for bar in batch:
+        if start_ns < bar.timestamp < end_ns:
+            bars.append(bar)
+    return bars
+
+
+class ConnectionSupervisor:
+    """
+    Keep a blocking BaseRealTimeDataProvider connected.
+
+    connect() is re-run with jittered exponential backoff whenever run_forever returns;
+    the providers re-authenticate and re-subscribe in on_open. Records are routed
+    through a GapTracker and any missed range is filled from the historical provider
+    before the live record is delivered, so process_record sees a continuous stream.
+    """
+
+    def __init__(self, provider, historical_provider=None, bar_interval=60, backoff=None, max_retries=None):
+        """
+        :param provider: The real-time provider to supervise.
+        :param historical_provider: Optional BaseHistoricalDataProvider used to fill gaps.
+        :param bar_interval: Expected spacing of bars in seconds.
+        :param backoff: Backoff policy, defaults to 1s doubling up to 60s.
+        :param max_retries: Give up after this many consecutive failed reconnects (None retries forever).
+        """
+        self.provider = provider
+        self.historical_provider = historical_provider
+        self.gaps = GapTracker(bar_interval)
+        self.backoff = backoff or Backoff()
+        self.max_retries = max_retries
+        self._stopped = threading.Event()
+        self._deliver = provider.process_record
+        provider.process_record = self._process_record
+
+    def _process_record(self, record):
+        if self.gaps.is_duplicate(record):
+            return
+        gap = self.gaps.observe(record)
+        self.backoff.reset()
+        if gap is not None:
+            try:
+                for bar in backfill_bars(self.historical_provider, record.symbol, *gap):
+                    self._deliver(bar)
+            except Exception as e:
+                logger.error(f"Backfill for {record.symbol} failed: {e}")
+        self._deliver(record)
+
+    def run(self):
+        """
+        Connect and keep reconnecting until stop() is called or max_retries is exceeded.
+        """
+        while not self._stopped.is_set():
+            try:
+                self.provider.connect()
+            except Exception as e:
+                logger.error(f"Real-time connection failed: {e}")
+            if self._stopped.is_set():
+                break
+            if self.max_retries is not None and self.backoff.attempts >= self.max_retries:
+                logger.error(f"Giving up after {self.backoff.attempts} reconnect attempts")
+                break
+            delay = self.backoff.next_delay()
+            logger.warning(f"Real-time connection lost, reconnecting in {delay:.1f}s")
+            self.gaps.arm()
+            self._stopped.wait(delay)
+
+    def stop(self):
+        self._stopped.set()
+        self.provider.stop_aggregator_flush()
+        self.provider.disconnect()
@@ -0,0 +1,10 @@
+from service.coalescer import RequestCoalescer
+from service.data_service import DataService, LiveSubscription
+from service.http_api import DataServiceServer
+
+__all__ = [
+    'DataService',
+    'DataServiceServer',
+    'LiveSubscription',
+    'RequestCoalescer'
+]
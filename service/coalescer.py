@@ -0,0 +1,48 @@
+import threading
+from concurrent.futures import Future
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+
+class RequestCoalescer:
+    """
+    Share one call among concurrent identical requests.
+
+    The first caller for a key runs the function; callers arriving with the same key
+    while it is in flight wait for and receive the same result (or exception). Nothing
+    is kept once the call completes, so later requests fetch again.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def run(self, key, function, *args, **kwargs):
+        """
+        Return function(*args, **kwargs), or the result of the identical call already running.
+
+        :param key: Hashable identifying the request.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        if not owner:
+            logger.debug("Joined in-flight request %s", key)
+            return future.result()
+
+        try:
+            future.set_result(function(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result()
@@ -0,0 +1,263 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from injector import Injector
+from di_module import RealTimeDataProviderModule, HistoricalDataProviderModule, build_historical_provider
+from historical_data.base_historical_provider import BaseHistoricalDataProvider
+from real_time_data.base_realtime_provider import BaseRealTimeDataProvider
+from real_time_data.publisher import Publisher
+from real_time_data.sinks import BaseSink
+from real_time_data.supervisor import ConnectionSupervisor, Backoff
+from service.coalescer import RequestCoalescer
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+
+def _set_thread_event_loop():
+    # Providers built on asyncio clients (ib_insync) need a loop in the thread running them
+    asyncio.set_event_loop(asyncio.new_event_loop())
+
+
+class LiveSubscription:
+    """
+    Bounded queue of the live records of one client, optionally filtered by symbol.
+
+    The feed never waits for a client: when the queue is full the record is dropped
+    and counted in `dropped`.
+    """
+
+    def __init__(self, feed, symbols=None, max_queue=10000):
+        self.feed = feed
+        self.symbols = set(symbols) if symbols else None
+        self.dropped = 0
+        self._queue = queue.Queue(max_queue)
+
+    def offer(self, record):
+        if self.symbols is not None and record.symbol not in self.symbols:
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def get(self, timeout=None):
+        """
+        Next record, or None if none arrived within `timeout` seconds.
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.feed.unsubscribe(self)
+
+
+class _BroadcastSink(BaseSink):
+    """
+    Sink handing every published record to the live subscriptions of a feed.
+    """
+
+    def __init__(self):
+        # Replaced rather than mutated so that write() can iterate without a lock
+        self.subscriptions = ()
+
+    def write(self, record):
+        for subscription in self.subscriptions:
+            subscription.offer(record)
+
+
+class _LiveFeed:
+    """
+    A real-time provider running in a background thread for as long as the service runs.
+
+    The provider is built and run on that thread, which has its own event loop, so
+    providers bound to the thread that created them (ib_insync) work.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.sink = _BroadcastSink()
+        self._lock = threading.Lock()
+        self.provider = None
+        self.supervisor = None
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=f"live-{config.provider}", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def _build(self):
+        _set_thread_event_loop()
+        self.provider = Injector([RealTimeDataProviderModule(self.config)]).get(BaseRealTimeDataProvider)
+        # Keep the configured sinks and add the service's subscribers
+        sinks = self.provider.publisher.sinks if self.provider.publisher is not None else []
+        self.provider.publisher = Publisher([self.sink] + sinks)
+
+    def _run(self):
+        try:
+            self._build()
+        except Exception as e:
+            logger.error(f"Could not build live feed {self.config.provider}: {e}")
+            self._error = e
+            return
+        finally:
+            self._ready.set()
+        try:
+            supervise = self.config.realtime_config.get('supervise') or {}
+            if supervise.get('enabled', False):
+                historical_provider = None
+                if supervise.get('backfill', True) and self.config.historical_config:
+                    historical_provider = build_historical_provider(self.config)
+                self.supervisor = ConnectionSupervisor(
+                    self.provider,
+                    historical_provider=historical_provider,
+                    bar_interval=supervise.get('bar_interval', 60),
+                    backoff=Backoff(maximum=supervise.get('max_delay', 60))
+                )
+                self.supervisor.run()
+            else:
+                self.provider.connect()
+        except Exception as e:
+            logger.error(f"Live feed {self.config.provider} stopped: {e}")
+
+    def subscribe(self, symbols=None, max_queue=10000):
+        subscription = LiveSubscription(self, symbols, max_queue)
+        with self._lock:
+            self.sink.subscriptions = self.sink.subscriptions + (subscription,)
+        if symbols and hasattr(self.provider, 'add_symbols'):
+            try:
+                self.provider.add_symbols(list(symbols))
+            except Exception as e:
+                logger.warning(f"Could not add {symbols} to the {self.config.provider} feed: {e}")
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self.sink.subscriptions = tuple(s for s in self.sink.subscriptions if s is not subscription)
+
+    def stop(self):
+        try:
+            self.provider.stop_aggregator_flush()
+            if self.supervisor is not None:
+                self.supervisor.stop()
+            elif hasattr(self.provider, 'disconnect'):
+                self.provider.disconnect()
+            if self.provider.publisher is not None:
+                self.provider.publisher.close()
+        except Exception as e:
+            logger.error(f"Error stopping live feed {self.config.provider}: {e}")
+
+
+class _HistoricalEntry:
+    """
+    A warm historical provider. Thread-bound providers (batch_max_workers == 1, e.g. the
+    ib_insync one) are built and called on one dedicated thread with its own event loop.
+    """
+
+    def __init__(self, config):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"historical-{config.provider}",
+                                           initializer=_set_thread_event_loop)
+        self.provider = self.executor.submit(
+            lambda: Injector([HistoricalDataProviderModule(config)]).get(BaseHistoricalDataProvider)
+        ).result()
+        self.thread_bound = self.provider.batch_max_workers <= 1
+
+    def call(self, function, *args, **kwargs):
+        if self.thread_bound:
+            return self.executor.submit(function, *args, **kwargs).result()
+        return function(*args, **kwargs)
+
+
+class DataService:
+    """
+    Resident service keeping providers, connections and caches warm across requests.
+
+    Historical providers are built on the first query for them and reused; identical
+    concurrent range queries share one upstream fetch. Live feeds are started on the
+    first subscription and fan their records out to every subscriber.
+    """
+
+    def __init__(self, configs):
+        """
+        :param configs: di_module.Config objects of the providers the service may use.
+        """
+        self.configs = {config.provider: config for config in configs}
+        self.coalescer = RequestCoalescer()
+        self._historical = {}
+        self._feeds = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    @property
+    def default_provider(self):
+        return next(iter(self.configs))
+
+    def _config(self, provider):
+        config = self.configs.get(provider or self.default_provider)
+        if config is None:
+            raise ValueError(f"Provider not configured in this service: {provider}")
+        return config
+
+    def _historical_entry(self, provider):
+        config = self._config(provider)
+        if not config.historical_config:
+            raise ValueError(f"No historical configuration for {config.provider}")
+        # Held while building so that concurrent first queries construct one provider
+        with self._build_lock:
+            entry = self._historical.get(config.provider)
+            if entry is None:
+                entry = self._historical[config.provider] = _HistoricalEntry(config)
+                logger.info(f"Historical provider {config.provider} ready")
+        return entry
+
+    def get_historical_data(self, provider=None, symbol=None, start=None, end=None):
+        """
+        Fetch a range of bars, sharing the upstream fetch with identical queries in flight.
+
+        :return: BarBatch.
+        """
+        entry = self._historical_entry(provider)
+        key = ('historical', provider or self.default_provider, symbol, start, end)
+        return self.coalescer.run(
+            key, entry.call, entry.provider.get_historical_data, start=start, end=end, symbol=symbol
+        )
+
+    def subscribe(self, provider=None, symbols=None, max_queue=10000):
+        """
+        Subscribe to the live records of a provider, starting its feed if needed.
+
+        :return: LiveSubscription; close() it when done.
+        """
+        config = self._config(provider)
+        if not config.realtime_config:
+            raise ValueError(f"No real-time configuration for {config.provider}")
+        with self._lock:
+            feed = self._feeds.get(config.provider)
+            if feed is None:
+                feed = self._feeds[config.provider] = _LiveFeed(config)
+                logger.info(f"Live feed {config.provider} started")
+        return feed.subscribe(symbols, max_queue)
+
+    def status(self):
+        with self._lock:
+            return {
+                'providers': list(self.configs),
+                'historical': list(self._historical),
+                'live': {name: len(feed.sink.subscriptions) for name, feed in self._feeds.items()},
+                'upstream_fetches': self.coalescer.calls,
+                'coalesced': self.coalescer.coalesced
+            }
+
+    def close(self):
+        with self._lock:
+            feeds, self._feeds = list(self._feeds.values()), {}
+            entries, self._historical = list(self._historical.values()), {}
+        for feed in feeds:
+            feed.stop()
+        for entry in entries:
+            entry.executor.shutdown(wait=False)
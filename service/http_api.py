@@ -0,0 +1,192 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from models import RECORD_SIZE, encode_record
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+# Seconds between keep-alives on an idle live stream, to notice closed clients
+STREAM_HEARTBEAT = 5.0
+# Keep-alive of binary streams: an all-zero record, whose kind 0 is neither tick nor bar
+HEARTBEAT_RECORD = bytes(RECORD_SIZE)
+
+
+def parse_time(value):
+    """
+    Parse an ISO 8601 timestamp (UTC when it has no offset) or epoch seconds.
+    """
+    if value is None:
+        return None
+    if value.replace('.', '', 1).isdigit():
+        return datetime.fromtimestamp(float(value), tz=timezone.utc)
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def record_to_dict(record):
+    """
+    JSON-ready dict of a Tick, Bar or AggregatedBar.
+    """
+    fields = {'type': type(record).__name__}
+    for cls in reversed(type(record).__mro__):
+        for name in getattr(cls, '__slots__', ()):
+            fields[name] = getattr(record, name)
+    return fields
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug("data service %s", format % args)
+
+    def address_string(self):
+        # Unix socket peers have no address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def _send(self, status, body, content_type='application/json'):
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        service = self.server.service
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if url.path == '/health':
+                return self._send(200, {"status": "ok", **service.status()})
+            if url.path == '/historical':
+                return self._historical(service, query)
+            if url.path == '/stream':
+                return self._stream(service, query)
+        except ValueError as e:
+            return self._send(400, {"message": f"Bad request: {e}"})
+        except Exception as e:
+            logger.error(f"Error serving {self.path}: {e}")
+            return self._send(502, {"message": f"Upstream error: {e}"})
+        return self._send(404, {"message": "Not found"})
+
+    def _historical(self, service, query):
+        batch = service.get_historical_data(
+            provider=query.get('provider'),
+            symbol=query.get('symbol'),
+            start=parse_time(query.get('start')),
+            end=parse_time(query.get('end'))
+        )
+        if query.get('format') == 'binary':
+            return self._send(200, b''.join(encode_record(bar) for bar in batch), 'application/octet-stream')
+        return self._send(200, {
+            "symbol": batch.symbol,
+            "timestamp": batch.timestamp.tolist(),
+            "open": batch.open.tolist(),
+            "high": batch.high.tolist(),
+            "low": batch.low.tolist(),
+            "close": batch.close.tolist(),
+            "volume": batch.volume.tolist()
+        })
+
+    def _stream(self, service, query):
+        symbols = [symbol for symbol in query.get('symbols', '').split(',') if symbol]
+        binary = query.get('format') == 'binary'
+        subscription = service.subscribe(provider=query.get('provider'), symbols=symbols or None)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream' if binary else 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            while not self.server.stopping.is_set():
+                record = subscription.get(timeout=STREAM_HEARTBEAT)
+                if record is None:
+                    # Writing is the only way to notice a client that went away
+                    chunk = HEARTBEAT_RECORD if binary else b'\n'
+                else:
+                    try:
+                        chunk = encode_record(record) if binary else \
+                            json.dumps(record_to_dict(record)).encode() + b'\n'
+                    except ValueError as e:
+                        # The status line is already sent; drop the record rather than the stream
+                        logger.warning(f"Skipping live record {record!r}: {e}")
+                        continue
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                self.wfile.flush()
+            # The service is stopping: end the chunked body cleanly
+            self.wfile.write(b'0\r\n\r\n')
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug("Live stream client disconnected")
+        finally:
+            subscription.close()
+            self.close_connection = True
+
+
+class _UnixHTTPServer(ThreadingHTTPServer):
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        # HTTPServer.server_bind expects a (host, port) address
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+
+class DataServiceServer:
+    """
+    Local HTTP API in front of a DataService, on a TCP address or a Unix socket.
+
+    GET /historical?provider=&symbol=&start=&end=[&format=binary]
+        Bars of the range as JSON columns, or as 64-byte records (models.codec).
+    GET /stream?provider=&symbols=A,B[&format=binary]
+        Live records as newline-delimited JSON or 64-byte records, until the client disconnects.
+        Idle streams get a blank line, or an all-zero record (kind 0) in binary, every
+        STREAM_HEARTBEAT seconds.
+    GET /health
+        Service status, including upstream fetch and coalescing counters.
+    """
+
+    def __init__(self, service, listen='127.0.0.1:8700'):
+        """
+        :param service: DataService answering the requests.
+        :param listen: 'host:port', or the path of a Unix socket ('unix:/path' or '/path').
+        """
+        self.service = service
+        self.unix_path = None
+        if listen.startswith('unix:') or listen.startswith('/'):
+            self.unix_path = listen[len('unix:'):] if listen.startswith('unix:') else listen
+            if os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+            self._httpd = _UnixHTTPServer(self.unix_path, _Handler)
+            self.address = f"unix:{self.unix_path}"
+        else:
+            host, _, port = listen.rpartition(':')
+            self._httpd = ThreadingHTTPServer((host or '127.0.0.1', int(port)), _Handler)
+            self.address = f"http://{self._httpd.server_address[0]}:{self._httpd.server_address[1]}"
+        self._httpd.daemon_threads = True
+        self._httpd.service = service
+        self._httpd.stopping = threading.Event()
+        self._thread = None
+
+    def serve_forever(self):
+        logger.info(f"Data service listening on {self.address}")
+        self._httpd.serve_forever()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='data-service', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.stopping.set()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
@@ -15,18 +15,17 @@ class DateUtils:
         """
         pst = pytz.timezone('America/Los_Angeles')
         current_time = datetime.now(pytz.utc).astimezone(pst)
-        logger = LoggingWrapper(__name__)
-        logger.info(f'current_time (PST): {current_time}')
+        logger.debug('current_time (PST): %s', current_time)
 
         if end is None or end > current_time:
             end = current_time - timedelta(minutes=1)  # Ensure end time is not in the future
-            logger.info(f'end (PST): {end}')
+            logger.debug('end (PST): %s', end)
         if start is None or start >= end:
             start = end - timedelta(days=1)
-            logger.info(f'start (PST): {start}')
+            logger.debug('start (PST): %s', start)
         if start >= current_time:
             start = current_time - timedelta(days=1)
-            logger.info(f'adjusted start (PST): {start}')
+            logger.debug('adjusted start (PST): %s', start)
         return start, end
 
 class DateTimeUtils:
@@ -41,4 +40,28 @@ class DateTimeUtils:
             return dt.isoformat()
         except Exception as e:
             logger.error(f"Error converting datetime to RFC3339: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    def iso_to_epoch_ns(value):
+        """
+        Convert an ISO 8601 UTC timestamp such as '2024-05-24T13:30:00.123456789Z' to
+        integer nanoseconds since the epoch, keeping sub-microsecond precision.
+
+        Fields are sliced at fixed offsets rather than parsed with strptime because this
+        runs once per real-time message.
+        """
+        year, month, day = int(value[0:4]), int(value[5:7]), int(value[8:10])
+        seconds = int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19])
+        fraction = 0
+        if len(value) > 19 and value[19] == '.':
+            digits = value[20:].rstrip('Z').split('+', 1)[0]
+            fraction = int(digits[:9].ljust(9, '0'))
+        # Days since 1970-01-01 (proleptic Gregorian, Howard Hinnant's days_from_civil)
+        year -= month <= 2
+        era = year // 400
+        yoe = year - era * 400
+        doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+        doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+        days = era * 146097 + doe - 719468
+        return (days * 86400 + seconds) * 1_000_000_000 + fraction
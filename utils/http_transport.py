@@ -0,0 +1,124 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter applying a default timeout to requests sent without one, such as the
+    requests made by third-party SDKs that use the shared session.
+    """
+
+    def __init__(self, timeout, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=self.timeout if timeout is None else timeout, **kwargs)
+
+
+class HttpTransport:
+    """
+    Process-wide HTTP client shared by every REST provider.
+
+    Connections are kept alive in a pool per host so that consecutive requests to the same
+    API skip the TCP and TLS handshakes. Responses are requested gzip-compressed. With
+    `http2` and httpx (with its h2 extra) installed, requests are multiplexed over HTTP/2
+    instead; responses are converted to requests.Response either way, so callers keep
+    using raise_for_status(), json() and requests.RequestException.
+    """
+
+    def __init__(self, pool_size=10, max_hosts=10, connect_timeout=5.0, read_timeout=30.0, http2=False):
+        """
+        :param pool_size: Keep-alive connections kept per host.
+        :param max_hosts: Number of hosts whose pools are kept open.
+        :param connect_timeout: Seconds to wait for a connection.
+        :param read_timeout: Seconds to wait for response data.
+        :param http2: Use HTTP/2 through httpx when it is installed.
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+        adapter = TimeoutHTTPAdapter(self.timeout, pool_connections=max_hosts, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.http2_client = self._http2_client(pool_size, max_hosts) if http2 else None
+
+    def _http2_client(self, pool_size, max_hosts):
+        try:
+            import httpx
+            client = httpx.Client(
+                http2=True,
+                timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                limits=httpx.Limits(max_connections=pool_size * max_hosts, max_keepalive_connections=pool_size)
+            )
+            logger.info("HTTP/2 enabled for REST providers")
+            return client
+        except ImportError as e:
+            logger.warning(f"HTTP/2 requested but unavailable ({e}), using HTTP/1.1 keep-alive pools")
+            return None
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        """
+        Send a GET request on a pooled connection.
+
+        :return: requests.Response.
+        """
+        if self.http2_client is None:
+            return self.session.get(url, params=params, headers=headers, timeout=timeout or self.timeout)
+        return self._get_http2(url, params, headers, timeout)
+
+    def _get_http2(self, url, params, headers, timeout):
+        import httpx
+        if timeout is None:
+            # An explicit None disables httpx timeouts instead of using the client's
+            timeout = httpx.USE_CLIENT_DEFAULT
+        elif isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        try:
+            reply = self.http2_client.get(url, params=params, headers=headers, timeout=timeout)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e))
+        except httpx.HTTPError as e:
+            raise requests.ConnectionError(str(e))
+        response = requests.Response()
+        response.status_code = reply.status_code
+        response.headers = CaseInsensitiveDict(reply.headers)
+        response._content = reply.content
+        response.encoding = reply.encoding
+        response.url = str(reply.url)
+        response.reason = reply.reason_phrase
+        return response
+
+    def close(self):
+        self.session.close()
+        if self.http2_client is not None:
+            self.http2_client.close()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """
+    Return the shared HttpTransport, created on first use from the HTTP_* environment
+    variables: HTTP_POOL_SIZE, HTTP_MAX_HOSTS, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP2.
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HttpTransport(
+                pool_size=int(os.getenv('HTTP_POOL_SIZE', 10)),
+                max_hosts=int(os.getenv('HTTP_MAX_HOSTS', 10)),
+                connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', 5)),
+                read_timeout=float(os.getenv('HTTP_READ_TIMEOUT', 30)),
+                http2=os.getenv('HTTP2', 'false').lower() in ('1', 'true', 'yes')
+            )
+        return _transport
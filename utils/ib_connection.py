@@ -0,0 +1,253 @@
+import asyncio
+import threading
+from ib_insync import IB
+from utils.logging_wrapper import LoggingWrapper
+
+logger = LoggingWrapper(__name__)
+
+# TWS error code for a client ID already held by another connection
+CLIENT_ID_IN_USE = 326
+
+
+def ensure_event_loop():
+    """
+    Give the calling thread an asyncio event loop if it has none, as ib_insync runs its
+    client on the current thread's loop.
+
+    :return: The thread's event loop.
+    """
+    try:
+        return asyncio.get_event_loop_policy().get_event_loop()
+    except RuntimeError:
+        # Threads other than the main one start without a loop
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        return loop
+
+
+class IBConnection:
+    """
+    A connection shared by every IB provider using it from one thread.
+
+    The socket is only opened on first use of `ib`, so building providers never blocks
+    on TWS. Historical and market data requests are multiplexed over the same client.
+    """
+
+    def __init__(self, manager, host, port, preferred_client_id):
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.preferred_client_id = preferred_client_id
+        self.client_id = None
+        self.users = 0
+        # Created on the thread that uses it, which owns the event loop the client runs on
+        ensure_event_loop()
+        self._ib = IB()
+        self._lock = threading.Lock()
+
+    @property
+    def ib(self):
+        """
+        The connected ib_insync client, connecting on first access.
+        """
+        self.ensure_connected()
+        return self._ib
+
+    def is_connected(self):
+        return self._ib.isConnected()
+
+    def ensure_connected(self):
+        with self._lock:
+            if not self._ib.isConnected():
+                ensure_event_loop()
+                self.client_id = self.manager._connect(self._ib, self.host, self.port,
+                                                       self.preferred_client_id, self.client_id)
+
+
+class IBConnectionHandle:
+    """
+    A provider's handle on the shared IB connections of (host, port).
+
+    The connection is resolved from the thread that accesses `ib`, not the one that
+    built the provider, so a provider built on one thread and used on another (as the
+    data service and the supervisor do) still gets the connection of the using thread.
+    """
+
+    def __init__(self, manager, host, port, client_id):
+        self.manager = manager
+        self.host = host
+        self.port = port
+        self.preferred_client_id = client_id
+        # thread id -> IBConnection acquired by this handle
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    def _current(self):
+        thread_id = threading.get_ident()
+        connection = self._connections.get(thread_id)
+        if connection is None:
+            connection = self.manager._acquire(self.host, self.port, self.preferred_client_id, thread_id)
+            with self._lock:
+                self._connections[thread_id] = connection
+        return connection
+
+    @property
+    def ib(self):
+        """
+        The connected ib_insync client of the calling thread, connecting on first access.
+        """
+        return self._current().ib
+
+    @property
+    def client_id(self):
+        connection = self._connections.get(threading.get_ident())
+        return connection.client_id if connection is not None else None
+
+    def is_connected(self):
+        connection = self._connections.get(threading.get_ident())
+        return connection is not None and connection.is_connected()
+
+    def ensure_connected(self):
+        self._current().ensure_connected()
+
+    def release(self):
+        """
+        Give back every connection this handle used; each is closed once its last user released it.
+        """
+        with self._lock:
+            connections, self._connections = list(self._connections.values()), {}
+        for connection in connections:
+            self.manager._release(connection)
+
+
+class IBConnectionManager:
+    """
+    Process-wide pool of Interactive Brokers connections.
+
+    Providers configured with the same host and port share one connection per thread
+    that uses them (ib_insync clients are bound to the thread running their event loop). Each
+    connection gets its own client ID, starting at the configured one and skipping IDs
+    in use by this process or rejected by TWS as held by another process.
+    """
+
+    def __init__(self, connect_timeout=4.0, max_client_id_attempts=5):
+        """
+        :param connect_timeout: Seconds to wait for the TWS handshake.
+        :param max_client_id_attempts: Client IDs tried before giving up on a connection.
+        """
+        self.connect_timeout = connect_timeout
+        self.max_client_id_attempts = max_client_id_attempts
+        self._connections = {}
+        self._client_ids = {}
+        self._lock = threading.Lock()
+
+    def connection(self, host, port, client_id=1):
+        """
+        Get a handle on the shared connections for (host, port), without connecting.
+
+        :param client_id: Preferred client ID, used if no other connection holds it.
+        :return: IBConnectionHandle; call release() when done with it.
+        """
+        return IBConnectionHandle(self, host, port, client_id)
+
+    def _acquire(self, host, port, client_id, thread_id):
+        key = (host, port, thread_id)
+        with self._lock:
+            connection = self._connections.get(key)
+            if connection is None:
+                connection = self._connections[key] = IBConnection(self, host, port, client_id)
+            connection.users += 1
+            return connection
+
+    def _reserve_client_id(self, host, port, preferred, skip=()):
+        with self._lock:
+            used = self._client_ids.setdefault((host, port), set())
+            client_id = preferred
+            while client_id in used or client_id in skip:
+                client_id += 1
+            used.add(client_id)
+            return client_id
+
+    def _free_client_id(self, host, port, client_id):
+        with self._lock:
+            self._client_ids.get((host, port), set()).discard(client_id)
+
+    def _connect(self, ib, host, port, preferred, previous=None):
+        """
+        Connect `ib`, moving on to the next free client ID if TWS rejects one as already
+        in use (error 326). Any other failure, such as a refused connection or a timeout,
+        is raised at once as a ConnectionError.
+
+        :return: The client ID in use.
+        """
+        if previous is not None:
+            self._free_client_id(host, port, previous)
+        # IDs TWS rejected during this call; other processes may free them later
+        rejected = set()
+        errors = []
+
+        def on_error(req_id, code, message, contract=None):
+            errors.append(code)
+
+        ib.errorEvent += on_error
+        try:
+            for attempt in range(self.max_client_id_attempts):
+                client_id = self._reserve_client_id(host, port, preferred, rejected)
+                del errors[:]
+                try:
+                    ib.connect(host, port, clientId=client_id, timeout=self.connect_timeout)
+                    logger.info(f"Connected to IB at {host}:{port} with client ID {client_id}")
+                    return client_id
+                except Exception as e:
+                    self._free_client_id(host, port, client_id)
+                    ib.disconnect()
+                    if CLIENT_ID_IN_USE not in errors:
+                        logger.error(f"Could not connect to Interactive Brokers TWS API at {host}:{port}: {e}")
+                        raise ConnectionError("Could not connect to Interactive Brokers TWS API.") from e
+                    logger.warning(f"IB client ID {client_id} is in use by another process, trying the next one")
+                    rejected.add(client_id)
+        finally:
+            ib.errorEvent -= on_error
+        logger.error(f"No free IB client ID after {self.max_client_id_attempts} attempts")
+        raise ConnectionError("Could not connect to Interactive Brokers TWS API.")
+
+    def _release(self, connection):
+        with self._lock:
+            connection.users -= 1
+            if connection.users > 0:
+                return
+            self._connections = {key: value for key, value in self._connections.items() if value is not connection}
+        if connection.is_connected():
+            connection._ib.disconnect()
+            logger.info(f"Disconnected IB client ID {connection.client_id}")
+        if connection.client_id is not None:
+            self._free_client_id(connection.host, connection.port, connection.client_id)
+
+    def close(self):
+        """
+        Disconnect every connection.
+        """
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for connection in connections:
+            connection.users = 0
+            if connection.is_connected():
+                connection._ib.disconnect()
+        with self._lock:
+            self._client_ids.clear()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_ib_connection_manager():
+    """
+    Return the process-wide IBConnectionManager, created on first use.
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = IBConnectionManager()
+        return _manager
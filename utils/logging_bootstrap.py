@@ -0,0 +1,133 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+
+_lock = threading.RLock()
+_listener = None
+_queue_handler = None
+
+# Dependency loggers kept at WARNING when LOG_LEVEL lowers the root level, so that
+# e.g. per-frame websockets debug output does not reach the handlers
+QUIET_LOGGERS = ('asyncio', 'websockets', 'urllib3', 'httpx', 'httpcore', 'hpack', 'ib_insync', 'alpaca_trade_api')
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues the record untouched so that %-style formatting runs
+    on the listener thread instead of the thread that emitted the record.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as one JSON object per line.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _file_handler(log_dir, rotation, max_bytes, backup_count, when):
+    os.makedirs(log_dir, exist_ok=True)
+    path = os.path.join(log_dir, 'data_provider.log')
+    if rotation == 'size':
+        return logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, delay=True)
+    if rotation == 'time':
+        return logging.handlers.TimedRotatingFileHandler(path, when=when, backupCount=backup_count, delay=True, utc=True)
+    if rotation == 'none':
+        return logging.FileHandler(path, delay=True)
+    raise ValueError(f"Unsupported log rotation: {rotation}. Supported values are 'size', 'time' and 'none'.")
+
+
+def configure_logging(log_dir=None, rotation=None, max_bytes=None, backup_count=None, when=None,
+                      log_format=None, console_level=None, level=None):
+    """
+    Configure the process-wide log handlers, replacing any earlier configuration.
+
+    Every argument defaults to an environment variable so the bootstrap can be driven from .env:
+    LOG_LEVEL ('DEBUG', applied to the root logger), LOG_DIR ('logs'), LOG_ROTATION ('size', 'time' or 'none'; default 'size'),
+    LOG_MAX_BYTES (50 MB), LOG_BACKUP_COUNT (10), LOG_ROTATE_WHEN ('midnight'),
+    LOG_FORMAT ('text' or 'json') and LOG_CONSOLE_LEVEL ('ERROR').
+    """
+    global _listener, _queue_handler
+    log_dir = log_dir or os.getenv('LOG_DIR', 'logs')
+    rotation = rotation or os.getenv('LOG_ROTATION', 'size')
+    max_bytes = max_bytes or int(os.getenv('LOG_MAX_BYTES', 50 * 1024 * 1024))
+    backup_count = backup_count or int(os.getenv('LOG_BACKUP_COUNT', 10))
+    when = when or os.getenv('LOG_ROTATE_WHEN', 'midnight')
+    log_format = log_format or os.getenv('LOG_FORMAT', 'text')
+    console_level = console_level or os.getenv('LOG_CONSOLE_LEVEL', 'ERROR')
+    level = level or os.getenv('LOG_LEVEL', 'DEBUG')
+
+    if log_format == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    fh = _file_handler(log_dir, rotation, max_bytes, backup_count, when)
+    fh.setLevel(logging.DEBUG)
+    fh.setFormatter(formatter)
+
+    ch = logging.StreamHandler()
+    ch.setLevel(console_level.upper())
+    ch.setFormatter(formatter)
+
+    with _lock:
+        _shutdown()
+        logging.getLogger().setLevel(level.upper())
+        for name in QUIET_LOGGERS:
+            logging.getLogger(name).setLevel(max(logging.WARNING, logging.getLogger().level))
+        log_queue = queue.SimpleQueue()
+        _queue_handler = DeferredQueueHandler(log_queue)
+        logging.getLogger().addHandler(_queue_handler)
+        _listener = logging.handlers.QueueListener(log_queue, fh, ch, respect_handler_level=True)
+        _listener.start()
+
+
+def ensure_logging():
+    """
+    Install the default configuration unless logging was already configured in this process.
+    """
+    with _lock:
+        if _listener is None:
+            configure_logging()
+
+
+def _shutdown():
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+def shutdown_logging():
+    """
+    Flush pending records and close every handler.
+    """
+    with _lock:
+        _shutdown()
+
+
+atexit.register(shutdown_logging)
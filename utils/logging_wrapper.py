@@ -1,42 +1,73 @@
 import logging
-import os
-from datetime import datetime
+import threading
+import time
+from utils.logging_bootstrap import ensure_logging
+
 
 class LoggingWrapper:
-    def __init__(self, name):
-        self.logger = logging.getLogger(name)
-        self.logger.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        
-        # Create logs directory if it doesn't exist
-        if not os.path.exists('logs'):
-            os.makedirs('logs')
-        
-        # Create file handler which logs even debug messages
-        now = datetime.now().strftime('%Y%m%d_%H%M%S')
-        fh = logging.FileHandler(f'logs/log_{now}.log')
-        fh.setLevel(logging.DEBUG)
-        fh.setFormatter(formatter)
-        
-        # Create console handler with a higher log level
-        ch = logging.StreamHandler()
-        ch.setLevel(logging.ERROR)
-        ch.setFormatter(formatter)
-        
-        self.logger.addHandler(fh)
-        self.logger.addHandler(ch)
-    
+    """
+    Thin wrapper around a module logger.
+
+    Wrappers are cached per name and never add handlers or set levels themselves: the
+    process-wide handlers and level are installed once by utils.logging_bootstrap. Records are handed to a
+    queue and written by a background thread, so pass arguments %-style
+    (logger.info("x=%s", x)) to defer formatting off the caller. Per-message paths
+    should use log_every_n / log_rate_limited.
+    """
+    _wrappers = {}
+    _wrappers_lock = threading.Lock()
+
+    def __new__(cls, name):
+        with cls._wrappers_lock:
+            wrapper = cls._wrappers.get(name)
+            if wrapper is None:
+                ensure_logging()
+                wrapper = super().__new__(cls)
+                wrapper.logger = logging.getLogger(name)
+                wrapper._counters = {}
+                wrapper._last_emitted = {}
+                cls._wrappers[name] = wrapper
+            return wrapper
+
+    def is_enabled_for(self, level):
+        """
+        Level guard for callers that need to build expensive log arguments.
+        """
+        return self.logger.isEnabledFor(level)
+
     def debug(self, msg, *args, **kwargs):
         self.logger.debug(msg, *args, **kwargs)
-    
+
     def info(self, msg, *args, **kwargs):
         self.logger.info(msg, *args, **kwargs)
-    
+
     def warning(self, msg, *args, **kwargs):
         self.logger.warning(msg, *args, **kwargs)
-    
+
     def error(self, msg, *args, **kwargs):
         self.logger.error(msg, *args, **kwargs)
-    
+
     def critical(self, msg, *args, **kwargs):
         self.logger.critical(msg, *args, **kwargs)
+
+    def log_every_n(self, level, n, msg, *args, **kwargs):
+        """
+        Log only the 1st, (n+1)th, (2n+1)th... call made with the same message template.
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        count = self._counters.get(msg, 0)
+        self._counters[msg] = count + 1
+        if count % n == 0:
+            self.logger.log(level, msg, *args, **kwargs)
+
+    def log_rate_limited(self, level, interval, msg, *args, **kwargs):
+        """
+        Log at most once every `interval` seconds for the same message template.
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        if now - self._last_emitted.get(msg, float('-inf')) >= interval:
+            self._last_emitted[msg] = now
+            self.logger.log(level, msg, *args, **kwargs)
@@ -0,0 +1,271 @@
+import heapq
+import itertools
+import os
+import random
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from utils.logging_wrapper import LoggingWrapper
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process coordination
+    fcntl = None
+
+logger = LoggingWrapper(__name__)
+
+# Lower values are served first
+PRIORITY_LIVE = 0      # gap repair for a live feed
+PRIORITY_NORMAL = 5
+PRIORITY_BULK = 10     # bulk backfills
+
+# Throttling answers pause the whole bucket, other transient errors only delay the failed request
+THROTTLE_STATUS_CODES = {429, 503}
+RETRY_STATUS_CODES = THROTTLE_STATUS_CODES | {500, 502, 504}
+
+_priority = ContextVar('request_priority', default=PRIORITY_NORMAL)
+
+
+@contextmanager
+def request_priority(priority):
+    """
+    Run the requests issued inside the block (in this thread) at `priority`.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    return _priority.get()
+
+
+class _MemoryState:
+    """
+    Bucket state held in this process.
+    """
+
+    def __init__(self, capacity):
+        self.tokens = float(capacity)
+        self.updated = time.time()
+        self.blocked_until = 0.0
+
+    @contextmanager
+    def locked(self):
+        yield self
+
+    def save(self):
+        pass
+
+
+class _FileState:
+    """
+    Bucket state in a small file locked with flock, shared by every process using the same path.
+    """
+    LAYOUT = struct.Struct('<ddd')
+
+    def __init__(self, path, capacity):
+        if fcntl is None:
+            raise RuntimeError("Cross-process rate limiting requires fcntl (not available on this platform)")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.capacity = capacity
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    @contextmanager
+    def locked(self):
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            data = os.pread(self.fd, self.LAYOUT.size, 0)
+            if len(data) == self.LAYOUT.size:
+                self.tokens, self.updated, self.blocked_until = self.LAYOUT.unpack(data)
+            else:
+                self.tokens, self.updated, self.blocked_until = float(self.capacity), time.time(), 0.0
+            yield self
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def save(self):
+        os.pwrite(self.fd, self.LAYOUT.pack(self.tokens, self.updated, self.blocked_until), 0)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: up to `capacity` requests may burst, refilled at `rate` per second.
+
+    Waiting callers are served in priority order (then first come, first served), so a
+    live-gap repair queued behind a bulk backfill goes next. With `state_path` the bucket
+    state lives in a locked file and the limit is shared by every process using that path.
+    """
+
+    def __init__(self, rate, capacity=None, state_path=None):
+        """
+        :param rate: Tokens added per second.
+        :param capacity: Maximum burst size, defaults to max(1, rate).
+        :param state_path: Optional file that shares the bucket across processes.
+        """
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._state = _FileState(state_path, self.capacity) if state_path else _MemoryState(self.capacity)
+        self._condition = threading.Condition()
+        self._waiters = []
+        self._sequence = itertools.count()
+
+    def _take(self):
+        """
+        Take one token if available.
+
+        :return: 0 on success, otherwise the seconds to wait before trying again.
+        """
+        with self._state.locked() as state:
+            now = time.time()
+            if now < state.blocked_until:
+                return state.blocked_until - now
+            state.tokens = min(self.capacity, state.tokens + (now - state.updated) * self.rate)
+            state.updated = now
+            if state.tokens >= 1:
+                state.tokens -= 1
+                state.save()
+                return 0
+            state.save()
+            return (1 - state.tokens) / self.rate
+
+    def acquire(self, priority=None):
+        """
+        Block until a token is available and it is the caller's turn.
+
+        :param priority: Request priority, defaults to the one set with request_priority().
+        """
+        entry = (current_priority() if priority is None else priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    if self._waiters[0] == entry:
+                        wait = self._take()
+                        if wait <= 0:
+                            return
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+    def pause(self, seconds):
+        """
+        Stop handing out tokens for `seconds`, e.g. after the server answered with Retry-After.
+        """
+        with self._state.locked() as state:
+            state.blocked_until = max(state.blocked_until, time.time() + seconds)
+            state.save()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class RateLimiter(TokenBucket):
+    """
+    Thread-safe limiter that spaces calls so that at most `rate` of them start per second.
+    """
+
+    def __init__(self, rate):
+        super().__init__(rate, capacity=1)
+
+
+def retry_after_seconds(response):
+    """
+    Parse the Retry-After header (seconds or HTTP date) of a response, or None.
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitScheduler:
+    """
+    Process-wide registry of named token buckets (one per provider) and retry policy.
+
+    Every historical and real-time REST call goes through `request`, so instances of
+    the same provider share one limit. Setting RATE_LIMIT_STATE_DIR stores the bucket
+    state in files under that directory, sharing the limits across processes.
+    """
+
+    def __init__(self, state_dir=None, max_retries=3, max_backoff=60.0):
+        """
+        :param state_dir: Directory for cross-process bucket files, defaults to RATE_LIMIT_STATE_DIR.
+        :param max_retries: Retries of a request answered with a throttling or transient server error.
+        :param max_backoff: Upper bound in seconds of the backoff used when there is no Retry-After.
+        """
+        self.state_dir = state_dir
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, name, rate, capacity=None):
+        """
+        Get or create the bucket for `name`. The first registration decides the rate.
+        """
+        with self._lock:
+            bucket = self._buckets.get(name)
+            if bucket is None:
+                # Read lazily so that a value loaded from .env after import is honored
+                state_dir = self.state_dir or os.getenv('RATE_LIMIT_STATE_DIR')
+                state_path = os.path.join(state_dir, f"{name}.bucket") if state_dir else None
+                bucket = self._buckets[name] = TokenBucket(rate, capacity, state_path=state_path)
+                logger.info("Rate limit for %s: %s requests/s, burst %s", name, rate, bucket.capacity)
+            elif bucket.rate != rate:
+                logger.warning("Rate limit for %s already set to %s requests/s, ignoring %s", name, bucket.rate, rate)
+            return bucket
+
+    def request(self, name, send, priority=None):
+        """
+        Call `send()` (which returns a requests.Response) once a token of bucket `name` is
+        available. 429/503 answers pause the whole bucket for their Retry-After (or a
+        jittered exponential backoff); 500/502/504 answers only delay this request. Either
+        way the request is retried up to `max_retries` times.
+
+        :return: The last response.
+        """
+        bucket = self._buckets[name]
+        attempt = 0
+        while True:
+            bucket.acquire(priority)
+            response = send()
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                return response
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = random.uniform(0, min(self.max_backoff, 2 ** attempt))
+            attempt += 1
+            logger.warning("%s answered %d, retrying in %.1fs (attempt %d of %d)",
+                           name, response.status_code, delay, attempt, self.max_retries)
+            if response.status_code in THROTTLE_STATUS_CODES:
+                bucket.pause(delay)
+            else:
+                time.sleep(delay)
+
+
+scheduler = RateLimitScheduler()